@@ -1,6 +1,11 @@
 # Импортируем ModelView из библиотеки sqladmin для создания интерфейсов администрирования моделей.
 from sqladmin import ModelView
 
+# Импортируем индекс подсказок местоположений отелей, который нужно перестраивать после изменений,
+# и версии данных, по которым строятся ETag ответов.
+from app.cache.etag import CATALOG, bump_versions
+from app.cache.suggest import hotel_locations
+
 # Импортируем модели для работы с таблицами бронирования, отелей, номеров и пользователей.
 from app.bookings.models import Bookings
 from app.hotels.models import Hotels
@@ -44,6 +49,16 @@ class HotelsAdmin(ModelView, model=Hotels):
     # Иконка для отображения отелей.
     icon = "fa-solid fa-hotel"
 
+    # После изменения или удаления отеля перестраиваем индекс подсказок местоположений
+    # и меняем ETag ответов с данными отелей.
+    async def after_model_change(self, data, model, is_created):
+        await hotel_locations.invalidate()
+        await bump_versions([CATALOG])
+
+    async def after_model_delete(self, model):
+        await hotel_locations.invalidate()
+        await bump_versions([CATALOG])
+
 
 # Класс для администрирования модели номеров.
 class RoomsAdmin(ModelView, model=Rooms):
@@ -60,6 +75,13 @@ class RoomsAdmin(ModelView, model=Rooms):
     # Иконка для отображения номеров.
     icon = "fa-solid fa-bed"
 
+    # После изменения или удаления номера меняем ETag ответов с данными отелей и номеров.
+    async def after_model_change(self, data, model, is_created):
+        await bump_versions([CATALOG])
+
+    async def after_model_delete(self, model):
+        await bump_versions([CATALOG])
+
 
 # Класс для администрирования модели бронирований.
 class BookingsAdmin(ModelView, model=Bookings):
@@ -75,3 +97,10 @@ class BookingsAdmin(ModelView, model=Bookings):
 
     # Иконка для отображения бронирований.
     icon = "fa-solid fa-book"
+
+    # Бронирования только просматриваются: изменения через ORM обошли бы проверку свободных
+    # номеров, учет занятости в room_inventory_daily, сброс кэша поиска и смену ETag,
+    # которые выполняет BookingDAO. Бронирования создаются и отменяются через API и импорт.
+    can_create = False
+    can_edit = False
+    can_delete = False
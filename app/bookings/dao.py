@@ -1,26 +1,104 @@
 # Импортируем необходимые модули для работы с датами и SQL-запросами.
 from datetime import date
-from sqlalchemy import and_, func, insert, or_, select
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import (
+    Date,
+    Integer,
+    TextClause,
+    bindparam,
+    cast,
+    delete,
+    func,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import SQLAlchemyError
 
 # Импортируем модели и вспомогательные модули из приложения.
 from app.bookings.models import Bookings
+from app.cache.invalidation import invalidate_bookings
 from app.dao.base import BaseDAO
-from app.database import async_session_maker
-from app.exceptions import RoomFullyBooked
+from app.dao.pagination import KeysetPage
+from app.dao.session import get_session
+from app.exceptions import (
+    BookingMustIncludeNight,
+    DateFromCannotBeAfterDateTo,
+    RoomFullyBooked,
+    RoomsOverbooked,
+)
 from app.hotels.rooms.models import Rooms
+from app.inventory.dao import RoomInventoryDAO
 from app.logger import logger
 
 
+@lru_cache(maxsize=None)
+def _add_booking_query() -> TextClause:
+    """
+    Запрос BookingDAO.add с параметрами :user_id, :room_id, :date_from и :date_to.
+
+    SQLAlchemy не кэширует компиляцию INSERT ... ON CONFLICT диалекта PostgreSQL
+    (postgresql.Insert.inherit_cache = False), и сборка этого запроса на каждое
+    бронирование занимала event loop дольше, чем сам запрос в базе. Поэтому запрос
+    компилируется один раз и выполняется как текстовый.
+    """
+    room_id = bindparam("room_id", type_=Integer)
+    date_from = bindparam("date_from", type_=Date)
+    date_to = bindparam("date_to", type_=Date)
+    # CTE, занимающий номер на каждую ночь проживания.
+    reserved_days = RoomInventoryDAO.reserve_days(room_id, date_from, date_to)
+    date_from, date_to = cast(date_from, Date), cast(date_to, Date)
+    reserved_count = select(func.count()).select_from(reserved_days).scalar_subquery()
+
+    # Запрос на вставку бронирования с ценой из таблицы номеров.
+    add_booking = (
+        insert(Bookings)
+        .from_select(
+            ["room_id", "user_id", "date_from", "date_to", "price"],
+            select(
+                Rooms.id,
+                bindparam("user_id", type_=Integer),
+                date_from,
+                date_to,
+                Rooms.price,
+            ).where(Rooms.id == room_id, reserved_count == date_to - date_from),
+        )
+        # Возвращаем информацию о созданном бронировании.
+        .returning(
+            Bookings.id,
+            Bookings.user_id,
+            Bookings.room_id,
+            Bookings.date_from,
+            Bookings.date_to,
+        )
+        # Data-modifying CTE должен находиться на верхнем уровне запроса.
+        .add_cte(reserved_days)
+    )
+    compiled = add_booking.compile(dialect=postgresql.dialect(paramstyle="named"))
+    # Параметры с типами и значениями констант переносятся в текстовый запрос
+    return text(compiled.string).bindparams(
+        *(
+            bindparam(name, bind.value, type_=bind.type, required=bind.required)
+            for bind, name in compiled.bind_names.items()
+        )
+    )
+
+
 # DAO (Data Access Object) для работы с бронированиями.
 class BookingDAO(BaseDAO):
     # Указываем модель для взаимодействия.
     model = Bookings
+    # Период проживания: по нему фильтруется экспорт бронирований.
+    period_columns = ("date_from", "date_to")
 
     # Асинхронный метод для получения всех бронирований пользователя с информацией о номере.
+    # С page возвращается одна страница, отсортированная по date_from, price или id.
     @classmethod
-    async def find_all_with_images(cls, user_id: int):
-        async with async_session_maker() as session:
+    async def find_all_with_images(cls, user_id: int, page: Optional[KeysetPage] = None):
+        async with get_session() as session:
             # Формируем SQL-запрос для получения бронирований и связанных с ними номеров.
             query = (
                 select(
@@ -33,9 +111,16 @@ class BookingDAO(BaseDAO):
                 # Условие фильтрации по user_id для поиска бронирований конкретного пользователя.
                 .where(Bookings.user_id == user_id)
             )
+            if page is not None:
+                # Сортировка по индексам (user_id, <ключ>, id)
+                query = page.apply(
+                    query,
+                    {"date_from": Bookings.date_from, "price": Bookings.price},
+                    Bookings.id,
+                )
             # Выполняем запрос и возвращаем результаты в виде сопоставлений.
-            result = await session.execute(query)
-            return result.mappings().all()
+            result = (await session.execute(query)).mappings().all()
+        return page.split(result) if page is not None else result
 
     # Асинхронный метод для добавления бронирования.
     @classmethod
@@ -47,101 +132,66 @@ class BookingDAO(BaseDAO):
         date_to: date,
     ):
         """
-        Выполняет проверку наличия свободных номеров на указанные даты и добавляет бронирование,
-        если номер доступен.
-
-        SQL-запрос для проверки наличия свободных номеров:
-        WITH booked_rooms AS (
-            SELECT * FROM bookings
-            WHERE room_id = 1 AND
-                (date_from >= '2023-05-15' AND date_from <= '2023-06-20') OR
-                (date_from <= '2023-05-15' AND date_to > '2023-05-15')
+        Добавляет бронирование, если на все ночи проживания есть свободные номера.
+
+        Проверка и вставка выполняются одним запросом, атомарно относительно
+        конкурирующих бронирований того же номера:
+        WITH reserved_days AS (
+            INSERT INTO room_inventory_daily (room_id, day, booked)
+            SELECT rooms.id, '2023-05-15'::date + generate_series(0, 34), 1 FROM rooms
+            WHERE rooms.id = 1 AND rooms.quantity > 0 AND NOT EXISTS (
+                SELECT day FROM room_inventory_daily
+                WHERE room_id = 1 AND day >= '2023-05-15' AND day < '2023-06-19'
+                    AND booked >= rooms.quantity
+            )
+            ON CONFLICT (room_id, day) DO UPDATE
+            SET booked = room_inventory_daily.booked + 1
+            WHERE room_inventory_daily.booked < (SELECT quantity FROM rooms WHERE rooms.id = 1)
+            RETURNING day
         )
-        SELECT rooms.quantity - COUNT(booked_rooms.room_id) FROM rooms
-        LEFT JOIN booked_rooms ON booked_rooms.room_id = rooms.id
-        WHERE rooms.id = 1
-        GROUP BY rooms.quantity, booked_rooms.room_id
+        INSERT INTO bookings (room_id, user_id, date_from, date_to, price)
+        SELECT rooms.id, 1, '2023-05-15', '2023-06-19', rooms.price FROM rooms
+        WHERE rooms.id = 1 AND (SELECT count(*) FROM reserved_days) = 35
+        RETURNING id, user_id, room_id, date_from, date_to
+
+        Если хотя бы на одну ночь мест нет, бронирование не вставляется,
+        а частично занятые дни откатываются вместе с транзакцией.
+        Запрос компилируется один раз (см. _add_booking_query).
+        Бронирование должно включать хотя бы одну ночь: без ночей проверять
+        нечего и свободные номера не проверялись бы вовсе.
         """
+        nights = (date_to - date_from).days
+        if nights < 0:
+            raise DateFromCannotBeAfterDateTo
+        if nights == 0:
+            raise BookingMustIncludeNight
         try:
-            async with async_session_maker() as session:
-                # Формируем CTE (Common Table Expression) для получения уже забронированных номеров.
-                booked_rooms = (
-                    select(Bookings)
-                    .where(
-                        and_(
-                            Bookings.room_id == room_id,
-                            or_(
-                                # Проверяем, что бронирование пересекается с уже существующими бронированиями.
-                                and_(
-                                    Bookings.date_from >= date_from,
-                                    Bookings.date_from <= date_to,
-                                ),
-                                and_(
-                                    Bookings.date_from <= date_from,
-                                    Bookings.date_to > date_from,
-                                ),
-                            ),
-                        )
-                    )
-                    .cte("booked_rooms")  # Создаем CTE подзапрос.
+            async with get_session() as session:
+                # Выполняем запрос на добавление нового бронирования.
+                new_booking = await session.execute(
+                    _add_booking_query(),
+                    {
+                        "user_id": user_id,
+                        "room_id": room_id,
+                        "date_from": date_from,
+                        "date_to": date_to,
+                    },
                 )
+                new_booking = new_booking.mappings().one_or_none()
 
-                # Формируем запрос для проверки оставшихся свободных номеров.
-                get_rooms_left = (
-                    select(
-                        # Вычисляем количество свободных номеров.
-                        (Rooms.quantity - func.count(booked_rooms.c.room_id)).label(
-                            "rooms_left"
-                        )
-                    )
-                    .select_from(Rooms)
-                    # Объединяем таблицы rooms и забронированных номеров через CTE.
-                    .join(booked_rooms, booked_rooms.c.room_id == Rooms.id, isouter=True)
-                    .where(Rooms.id == room_id)
-                    # Группируем результат по количеству номеров.
-                    .group_by(Rooms.quantity, booked_rooms.c.room_id)
-                )
+                logger.debug(f"{new_booking=}")  # Логируем результат бронирования.
 
-                # Выполняем запрос для получения количества оставшихся номеров.
-                rooms_left = await session.execute(get_rooms_left)
-                rooms_left: int = rooms_left.scalar()  # Преобразуем результат в int.
-
-                logger.debug(f"{rooms_left=}")  # Логируем количество оставшихся номеров.
-
-                # Если есть свободные номера, продолжаем создание бронирования.
-                if rooms_left > 0:
-                    # Запрашиваем цену номера.
-                    get_price = select(Rooms.price).filter_by(id=room_id)
-                    price = await session.execute(get_price)
-                    price: int = price.scalar()
-
-                    # Формируем запрос на вставку нового бронирования.
-                    add_booking = (
-                        insert(Bookings)
-                        .values(
-                            room_id=room_id,
-                            user_id=user_id,
-                            date_from=date_from,
-                            date_to=date_to,
-                            price=price,
-                        )
-                        # Возвращаем информацию о созданном бронировании.
-                        .returning(
-                            Bookings.id,
-                            Bookings.user_id,
-                            Bookings.room_id,
-                            Bookings.date_from,
-                            Bookings.date_to,
-                        )
-                    )
-
-                    # Выполняем запрос на добавление нового бронирования.
-                    new_booking = await session.execute(add_booking)
-                    await session.commit()  # Подтверждаем изменения в базе данных.
-                    return new_booking.mappings().one()  # Возвращаем результат.
-                else:
-                    # Если номеров нет, вызываем исключение RoomFullyBooked.
+                # Если бронирование не вставлено, свободных номеров нет.
+                # Выход из сессии без commit откатывает занятые дни.
+                if new_booking is None:
                     raise RoomFullyBooked
+
+                await session.commit()  # Подтверждаем изменения в базе данных.
+            # Сбрасываем закэшированные результаты поиска на дни бронирования.
+            await invalidate_bookings(
+                [(room_id, new_booking["date_from"], new_booking["date_to"])]
+            )
+            return new_booking  # Возвращаем результат.
         except RoomFullyBooked:
             # Если комната полностью забронирована, повторно вызываем исключение.
             raise RoomFullyBooked
@@ -159,3 +209,38 @@ class BookingDAO(BaseDAO):
                 "date_to": date_to,
             }
             logger.error(msg, extra=extra, exc_info=True)
+
+    # Метод для удаления бронирований с освобождением занятых ими дней.
+    @classmethod
+    async def delete(cls, **filter_by):
+        async with get_session() as session:
+            # Удаляем бронирования и получаем их периоды для обновления занятости.
+            query = (
+                delete(Bookings)
+                .filter_by(**filter_by)
+                .returning(Bookings.room_id, Bookings.date_from, Bookings.date_to)
+            )
+            stays = (await session.execute(query)).all()
+            await RoomInventoryDAO.change_occupancy(session, stays, delta=-1)
+            await session.commit()
+        # Освободившиеся дни меняют результаты поиска: сбрасываем их кэш.
+        await invalidate_bookings(stays)
+
+    # Хук массовой вставки: учитываем импортированные бронирования в занятости номеров.
+    # Если номеров не хватает, исключение откатывает транзакцию порции.
+    @classmethod
+    async def _after_bulk_insert(cls, session, rows):
+        overbooked = await RoomInventoryDAO.change_occupancy(
+            session, cls._stays(rows), delta=1, return_overbooked=True
+        )
+        if overbooked:
+            raise RoomsOverbooked
+
+    # После фиксации массовой вставки сбрасываем кэш поиска на затронутые дни.
+    @classmethod
+    async def _after_bulk_commit(cls, rows):
+        await invalidate_bookings(cls._stays(rows))
+
+    @staticmethod
+    def _stays(rows):
+        return [(row["room_id"], row["date_from"], row["date_to"]) for row in rows]
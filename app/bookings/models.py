@@ -1,5 +1,6 @@
 # Импортируем необходимые модули из SQLAlchemy для создания колонок, вычисляемых значений, типов данных и связей.
-from sqlalchemy import Column, Computed, Date, ForeignKey, Integer
+from sqlalchemy import Column, Computed, Date, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import DATERANGE
 from sqlalchemy.orm import relationship
 
 # Импортируем базовый класс модели базы данных.
@@ -10,6 +11,13 @@ from app.database import Base
 class Bookings(Base):
     # Указываем имя таблицы в базе данных.
     __tablename__ = "bookings"
+    # Индексы для постраничного списка бронирований пользователя (см. BookingDAO.find_all_with_images):
+    # следующая страница начинается с поиска по индексу, а не с пропуска предыдущих строк
+    __table_args__ = (
+        Index("ix_bookings_user_id_date_from_id", "user_id", "date_from", "id"),
+        Index("ix_bookings_user_id_price_id", "user_id", "price", "id"),
+        Index("ix_bookings_user_id_id", "user_id", "id"),
+    )
 
     # Определяем колонки для таблицы бронирований.
 
@@ -38,6 +46,11 @@ class Bookings(Base):
     # Вычисляемая колонка, представляющая количество дней бронирования.
     total_days = Column(Integer, Computed("date_to - date_from"))
 
+    # Вычисляемая колонка с периодом проживания [date_from, date_to).
+    # По ней построен GiST индекс (room_id, stay) для поиска пересечений оператором &&
+    # (создается миграцией, так как требует расширения btree_gist).
+    stay = Column(DATERANGE, Computed("daterange(date_from, date_to)"))
+
     # Связь с пользователем. Связывает бронирование с моделью пользователей.
     user = relationship("Users", back_populates="booking")
 
@@ -1,12 +1,20 @@
+from typing import Optional
+
 # Импортируем необходимые модули и зависимости для работы с API маршрутизацией, фоновыми задачами и зависимостями.
-from fastapi import APIRouter, BackgroundTasks, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Response
 from pydantic import parse_obj_as
 
 # Импортируем DAO для взаимодействия с таблицей бронирований и схемы для обработки данных.
 from app.bookings.dao import BookingDAO
 from app.bookings.schemas import SBookingInfo, SNewBooking
+from app.dao.pagination import KeysetPage, set_next_cursor
+from app.responses import fast_json
 # Импортируем собственные исключения и задачи для обработки событий.
-from app.exceptions import RoomCannotBeBooked
+from app.exceptions import (
+    BookingMustIncludeNight,
+    DateFromCannotBeAfterDateTo,
+    RoomCannotBeBooked,
+)
 from app.tasks.tasks import send_booking_confirmation_email
 # Импортируем зависимости для получения текущего пользователя.
 from app.users.dependencies import get_current_user
@@ -20,10 +28,33 @@ router = APIRouter(
 
 
 # Маршрут для получения всех бронирований текущего пользователя.
+# С limit бронирования отдаются страницами, курсор следующей страницы — в заголовке X-Next-Cursor.
+# Выборка вынесена в зависимость: ее же использует страница бронирований (app/pages/router.py).
+async def find_bookings(
+    response: Response,
+    user: Users = Depends(get_current_user),
+    limit: Optional[int] = Query(
+        None, ge=1, le=500, description="Бронирований на странице, без limit — все"
+    ),
+    cursor: Optional[str] = Query(None, description="Заголовок X-Next-Cursor предыдущей страницы"),
+    sort: str = Query(
+        "date_from", regex="^-?(date_from|price|id)$", description="Ключ сортировки, -ключ — по убыванию"
+    ),
+):
+    # Используем DAO для получения страницы бронирований с информацией о номере пользователя.
+    page = KeysetPage(sort, limit, cursor)
+    bookings = await BookingDAO.find_all_with_images(user_id=user.id, page=page)
+    set_next_cursor(response, page.next_cursor)
+    return bookings
+
+
+# Маршрут для получения бронирований текущего пользователя.
 @router.get("")
-async def get_bookings(user: Users = Depends(get_current_user)) -> list[SBookingInfo]:
-    # Используем DAO для получения всех бронирований с информацией о номере пользователя.
-    return await BookingDAO.find_all_with_images(user_id=user.id)
+async def get_bookings(
+    response: Response,
+    bookings=Depends(find_bookings),
+) -> list[SBookingInfo]:
+    return fast_json(bookings, SBookingInfo, response)
 
 
 # Маршрут для добавления нового бронирования.
@@ -33,6 +64,12 @@ async def add_booking(
         background_tasks: BackgroundTasks,  # Фоновые задачи для выполнения после создания бронирования.
         user: Users = Depends(get_current_user),  # Получаем текущего пользователя через зависимость.
 ):
+    # Проверка, что дата заезда не позже даты выезда
+    if booking.date_from > booking.date_to:
+        raise DateFromCannotBeAfterDateTo
+    # Бронирование без ночей не занимает номер ни на один день
+    if booking.date_from == booking.date_to:
+        raise BookingMustIncludeNight
     # Используем DAO для добавления бронирования с указанными параметрами.
     booking = await BookingDAO.add(
         user.id,
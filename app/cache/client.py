@@ -0,0 +1,13 @@
+from redis import asyncio as aioredis
+
+from app.config import settings
+
+# Общий клиент Redis для кэшей приложения (соединения открываются при первом запросе)
+redis_client = aioredis.from_url(
+    f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
+    encoding="utf8",
+    decode_responses=True,
+)
+
+# Канал Redis pub/sub, по которому воркеры сообщают друг другу об удаленных записях кэша
+INVALIDATION_CHANNEL = "cache:invalidate"
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import secrets
+from typing import Iterable, List, Optional
+
+from fastapi import Request, Response
+from redis.exceptions import RedisError
+
+from app.cache.client import redis_client
+from app.exceptions import NotModified
+from app.logger import logger
+
+# Маркеры версий данных, из которых строятся ETag ответов (счетчики в Redis):
+# CATALOG меняется при изменении отелей и номеров, AVAILABILITY — при изменении
+# бронирований неизвестных номеров (импорт CSV), hotel_availability — при изменении
+# бронирований номеров отеля.
+CATALOG = "catalog"
+AVAILABILITY = "availability"
+
+
+def hotel_availability(hotel_id: int) -> str:
+    return f"hotel:{hotel_id}"
+
+
+def _version_key(marker: str) -> str:
+    return f"etag:version:{marker}"
+
+
+def _initial_version() -> int:
+    # Счетчики, пропавшие из Redis (перезапуск без сохранения, FLUSHALL, вытеснение),
+    # создаются заново со случайного значения, а не с нуля: иначе версии повторили бы
+    # уже выданные, и клиент со старым If-None-Match получил бы 304 на измененные данные
+    return secrets.randbits(52)
+
+
+def _create_missing(pipe, keys: List[str]):
+    for key in keys:
+        pipe.set(key, _initial_version(), nx=True)
+
+
+async def get_versions(markers: List[str]) -> Optional[List[int]]:
+    """Текущие версии маркеров или None, если Redis недоступен (тогда ETag не отдается)."""
+    keys = [_version_key(marker) for marker in markers]
+    try:
+        values = await redis_client.mget(keys)
+        missing = [key for key, value in zip(keys, values) if value is None]
+        if missing:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                _create_missing(pipe, missing)
+                pipe.mget(keys)
+                values = (await pipe.execute())[-1]
+    except (RedisError, OSError):
+        logger.warning("Cannot read ETag versions", exc_info=True)
+        return None
+    return [int(value) for value in values]
+
+
+async def bump_versions(markers: Iterable[str]):
+    """
+    Увеличивает версии маркеров: ETag ответов, построенных по ним, меняются.
+    Вызывается после фиксации транзакции, как и сброс кэша поиска.
+    """
+    keys = sorted({_version_key(marker) for marker in markers})
+    if not keys:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            _create_missing(pipe, keys)
+            for key in keys:
+                pipe.incr(key)
+            await pipe.execute()
+    except (RedisError, OSError):
+        logger.warning("Cannot bump ETag versions", extra={"keys": keys}, exc_info=True)
+
+
+def make_etag(*parts) -> str:
+    """Сильный ETag: хэш частей, сериализуемых в JSON."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return '"' + hashlib.blake2b(payload.encode(), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Совпадает ли etag с заголовком If-None-Match (сравнение без учета W/, RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in header.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def raise_if_not_modified(request: Request, response: Response):
+    """
+    Отвечает 304 (исключением NotModified), если ETag, уже выставленный в response,
+    совпадает с If-None-Match. Ответ 304 повторяет заголовки ETag и Cache-Control.
+    """
+    etag = response.headers.get("etag")
+    if etag is not None and etag_matches(request, etag):
+        headers = {"ETag": etag}
+        if "cache-control" in response.headers:
+            headers["Cache-Control"] = response.headers["cache-control"]
+        raise NotModified(headers)
+
+
+async def check_not_modified(
+    request: Request, response: Response, markers: List[str], cache_control: str
+):
+    """
+    Выставляет Cache-Control и ETag по версиям маркеров и URL запроса и отвечает 304,
+    если у клиента та же версия. Вызывается до запроса к базе: при совпадении
+    ни запрос DAO, ни сериализация не выполняются.
+    """
+    response.headers["Cache-Control"] = cache_control
+    versions = await get_versions(markers)
+    if versions is None:
+        return
+    response.headers["ETag"] = make_etag(
+        request.url.path, sorted(request.query_params.multi_items()), markers, versions
+    )
+    raise_if_not_modified(request, response)
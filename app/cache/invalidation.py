@@ -0,0 +1,78 @@
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+from app.cache.client import INVALIDATION_CHANNEL, redis_client
+from app.cache.etag import AVAILABILITY, bump_versions, hotel_availability
+from app.cache.search import SearchCache, hotels_search_cache
+from app.hotels.rooms.dao import RoomDAO
+from app.inventory.dao import RoomInventoryDAO
+from app.logger import logger
+
+
+def day_tags(date_from: date, date_to: date) -> List[str]:
+    """Теги дней, на которые влияет период: те же дни, что проверяются при бронировании."""
+    if isinstance(date_from, datetime):
+        date_from, date_to = date_from.date(), date_to.date()
+    first_day, last_day = RoomInventoryDAO.stay_days(date_from, date_to)
+    return [
+        f"day:{first_day + timedelta(days=shift)}"
+        for shift in range((last_day - first_day).days + 1)
+    ]
+
+
+async def invalidate_bookings(stays: Iterable[Tuple[int, date, date]]):
+    """
+    Удаляет результаты поиска, затронутые изменением бронирований (room_id, date_from, date_to),
+    и меняет версии доступности их отелей (ETag списка номеров).
+    Вызывается после фиксации транзакции, чтобы поиск не закэшировал старые данные заново.
+    room_id=None означает бронирования любых номеров (импорт CSV).
+    """
+    stays = list(stays)
+    tags = set()
+    for _, date_from, date_to in stays:
+        tags.update(day_tags(date_from, date_to))
+    await hotels_search_cache.invalidate_tags(sorted(tags))
+    await bump_versions(await _availability_markers({room_id for room_id, _, _ in stays}))
+
+
+async def _availability_markers(room_ids: Set[Optional[int]]) -> List[str]:
+    if not room_ids:
+        return []
+    if None not in room_ids:
+        try:
+            hotel_ids = await RoomDAO.find_hotel_ids(room_ids)
+            return [hotel_availability(hotel_id) for hotel_id in hotel_ids]
+        except Exception:
+            logger.warning("Cannot find hotels of booked rooms", exc_info=True)
+    # Отели неизвестны: меняем версию доступности всех отелей
+    return [AVAILABILITY]
+
+
+async def listen_invalidations(caches: List[SearchCache]):
+    """
+    Слушает INVALIDATION_CHANNEL и удаляет из памяти процесса записи, удаленные
+    другими воркерами. Запускается при старте приложения в каждом воркере.
+    """
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                data = json.loads(message["data"])
+                for cache in caches:
+                    if cache.name == data["cache"]:
+                        cache.drop_local(data["keys"])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("Cache invalidation listener failed", exc_info=True)
+            # Пока подписки нет, сообщения теряются: сбрасываем кэш процесса
+            for cache in caches:
+                cache.clear_local()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.close()
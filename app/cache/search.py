@@ -0,0 +1,326 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from redis.exceptions import RedisError, WatchError
+
+from app.cache.client import INVALIDATION_CHANNEL, redis_client
+from app.dao.session import detach_request_session
+from app.logger import logger
+from app.prometheus.metrics import (
+    CACHE_COALESCED,
+    CACHE_HITS,
+    CACHE_MISSES,
+    CACHE_STALE,
+)
+
+# Запись кэша: значение, время окончания свежести и время окончания хранения (unix time)
+Entry = Tuple[Any, float, float]
+
+
+class SearchCache:
+    """
+    Двухуровневый кэш результатов поиска: LRU в памяти процесса перед общим Redis.
+
+    - одинаковые одновременные промахи в одном процессе ждут одну загрузку из базы;
+    - в течение stale_ttl после истечения ttl отдаются устаревшие данные,
+      а запись обновляется в фоне (stale-while-revalidate) одним воркером;
+    - недоступность Redis не ломает запросы: кэш работает только в памяти;
+    - записи помечаются тегами, по которым их можно удалить во всех воркерах
+      (invalidate_tags, invalidate_keys), поэтому ttl может быть длинным.
+    С shared=False значения в Redis не сохраняются (только в памяти процесса),
+    а Redis используется лишь для рассылки сброса по ключам; теги при этом не работают.
+    Значения должны сериализоваться в JSON.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float = 30,
+        stale_ttl: float = 60,
+        max_entries: int = 1024,
+        shared: bool = True,
+    ):
+        self.name = name
+        self.shared = shared
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._local: "OrderedDict[str, Entry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._refreshing: Set[asyncio.Task] = set()
+        # Ключи, удаленные во время загрузки: загруженное значение уже может быть устаревшим
+        self._dirty: Set[str] = set()
+
+    def key(self, *parts) -> str:
+        return ":".join(["cache", self.name, *map(str, parts)])
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        tags: Iterable[str] = (),
+    ) -> Any:
+        """
+        Возвращает значение из кэша или загружает его через loader().
+        Загруженная запись помечается тегами tags.
+        """
+        tags = list(tags)
+        tier = "local"
+        entry = self._local_get(key)
+        if entry is None:
+            tier = "redis"
+            entry = await self._redis_get(key)
+            if entry is not None:
+                self._local_set(key, entry)
+
+        if entry is not None:
+            value, fresh_until, _ = entry
+            if time.time() < fresh_until:
+                CACHE_HITS.labels(self.name, tier).inc()
+            else:
+                CACHE_STALE.labels(self.name).inc()
+                self._refresh_in_background(key, loader, tags)
+            return value
+
+        CACHE_MISSES.labels(self.name).inc()
+        return await self._load(key, loader, tags)
+
+    async def invalidate_tags(self, tags: Iterable[str]):
+        """
+        Удаляет записи с любым из тегов из Redis и из памяти всех воркеров:
+        список удаленных ключей публикуется в INVALIDATION_CHANNEL.
+        """
+        tags = list(tags)
+        tag_keys = [self.key("tag", tag) for tag in tags]
+        if not tag_keys:
+            return
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                # Поколение тегов меняется до выборки ключей: загрузка, начатая до изменения
+                # данных и не успевшая попасть в множества тегов, уже не сохранит результат
+                for generation_key in self._generation_keys(tags):
+                    pipe.incr(generation_key)
+                    pipe.expire(generation_key, self._generation_expire())
+                pipe.sunion(tag_keys)
+                keys = sorted((await pipe.execute())[-1])
+        except (RedisError, OSError):
+            # Без Redis неизвестно, какие записи затронуты: сбрасываем весь кэш процесса
+            logger.warning("Cache invalidation failed", extra={"cache": self.name}, exc_info=True)
+            self.clear_local()
+            return
+        await self._invalidate(keys, tag_keys)
+
+    async def invalidate_keys(self, keys: Iterable[str]):
+        """Удаляет записи с указанными ключами из Redis и из памяти всех воркеров."""
+        await self._invalidate(list(keys), [])
+
+    def drop_local(self, keys: List[str]):
+        """Удаляет записи из памяти процесса (вызывается и по сообщениям других воркеров)."""
+        for key in keys:
+            self._local.pop(key, None)
+            if key in self._inflight:
+                self._dirty.add(key)
+
+    def clear_local(self):
+        """Удаляет все записи из памяти процесса."""
+        self.drop_local(list(self._local) + list(self._inflight))
+
+    async def clear(self):
+        """Удаляет все записи кэша в памяти процесса и в Redis."""
+        self.clear_local()
+        try:
+            keys = [key async for key in redis_client.scan_iter(match=self.key("*"))]
+            if keys:
+                await redis_client.delete(*keys)
+        except (RedisError, OSError):
+            logger.warning("Cache clear failed", extra={"cache": self.name}, exc_info=True)
+
+    async def _invalidate(self, keys: List[str], tag_keys: List[str]):
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                if keys:
+                    pipe.delete(*keys)
+                    # Из множеств тегов удаляются только найденные ключи: записи,
+                    # добавленные после выборки, остаются доступными для сброса
+                    for tag_key in tag_keys:
+                        pipe.srem(tag_key, *keys)
+                    message = json.dumps({"cache": self.name, "keys": keys})
+                    pipe.publish(INVALIDATION_CHANNEL, message)
+                await pipe.execute()
+        except (RedisError, OSError):
+            # Другие воркеры не получат сообщение, но этот процесс сбрасывает все
+            logger.warning("Cache invalidation failed", extra={"cache": self.name}, exc_info=True)
+            self.clear_local()
+            return
+        self.drop_local(keys)
+
+    async def _load(
+        self, key: str, loader: Callable[[], Awaitable[Any]], tags: List[str]
+    ) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fill(key, loader, tags))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            CACHE_COALESCED.labels(self.name).inc()
+        # Отмена одного из ожидающих запросов не должна отменять загрузку для остальных
+        return await asyncio.shield(task)
+
+    async def _fill(
+        self, key: str, loader: Callable[[], Awaitable[Any]], tags: List[str]
+    ) -> Any:
+        # Загрузка может пережить запрос, который ее начал, поэтому не использует его сессию
+        detach_request_session()
+        self._dirty.discard(key)
+        # Поколения тегов запоминаются до загрузки: если за время загрузки их сбросили
+        # (ключа еще нет в множествах тегов, и invalidate_tags его не найдет),
+        # результат может быть устаревшим
+        generations = await self._generations(tags)
+        value = await loader()
+        if key in self._dirty:
+            # Данные изменились во время загрузки: отдаем результат, но не кэшируем его
+            self._dirty.discard(key)
+            return value
+        now = time.time()
+        entry = (value, now + self.ttl, now + self.ttl + self.stale_ttl)
+        if await self._redis_set(key, entry, tags, generations):
+            self._local_set(key, entry)
+        return value
+
+    def _refresh_in_background(
+        self, key: str, loader: Callable[[], Awaitable[Any]], tags: List[str]
+    ):
+        if key in self._inflight:
+            return
+        task = asyncio.ensure_future(self._refresh(key, loader, tags))
+        # Храним ссылку на задачу, иначе ее может удалить сборщик мусора
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+
+    async def _refresh(
+        self, key: str, loader: Callable[[], Awaitable[Any]], tags: List[str]
+    ):
+        try:
+            # Устаревшую запись обновляет только тот воркер, который первым взял блокировку
+            if await self._acquire_refresh_lock(key):
+                await self._load(key, loader, tags)
+                return
+            # Остальные забирают из Redis запись, если ее уже обновили
+            entry = await self._redis_get(key)
+            if entry is not None and entry[1] > time.time():
+                self._local_set(key, entry)
+        except Exception:
+            logger.warning("Cache refresh failed", extra={"cache": self.name}, exc_info=True)
+
+    def _local_get(self, key: str) -> Optional[Entry]:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= time.time():
+            del self._local[key]
+            return None
+        self._local.move_to_end(key)
+        return entry
+
+    def _local_set(self, key: str, entry: Entry):
+        self._local[key] = entry
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    async def _redis_get(self, key: str) -> Optional[Entry]:
+        if not self.shared:
+            return None
+        try:
+            raw = await redis_client.get(key)
+        except (RedisError, OSError):
+            logger.warning("Cache read failed", extra={"cache": self.name}, exc_info=True)
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return data["value"], data["fresh_until"], data["stale_until"]
+
+    def _generation_keys(self, tags: List[str]) -> List[str]:
+        return [self.key("gen", tag) for tag in tags]
+
+    def _generation_expire(self) -> int:
+        # Поколение нужно помнить, пока идут загрузки, начатые до сброса;
+        # исчезновение счетчика тоже считается изменением
+        return max(1, int(self.ttl + self.stale_ttl))
+
+    async def _generations(self, tags: List[str]) -> Optional[List[Optional[str]]]:
+        """Текущие поколения тегов или None (нет тегов, кэш не общий или Redis недоступен)."""
+        if not self.shared or not tags:
+            return None
+        try:
+            return await redis_client.mget(self._generation_keys(tags))
+        except (RedisError, OSError):
+            logger.warning("Cache read failed", extra={"cache": self.name}, exc_info=True)
+            return None
+
+    async def _redis_set(
+        self,
+        key: str,
+        entry: Entry,
+        tags: List[str],
+        generations: Optional[List[Optional[str]]] = None,
+    ) -> bool:
+        """
+        Сохраняет запись в Redis вместе с тегами. С generations запись сохраняется,
+        только если поколения тегов не изменились (атомарно, через WATCH);
+        иначе возвращает False и запись не кэшируется нигде.
+        """
+        if not self.shared:
+            return True
+        value, fresh_until, stale_until = entry
+        raw = json.dumps(
+            {"value": value, "fresh_until": fresh_until, "stale_until": stale_until},
+            default=str,
+        )
+        expire = max(1, int(stale_until - time.time()))
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                if generations is not None:
+                    generation_keys = self._generation_keys(tags)
+                    await pipe.watch(*generation_keys)
+                    if await pipe.mget(generation_keys) != generations:
+                        return False
+                    pipe.multi()
+                pipe.set(key, raw, ex=expire)
+                for tag in tags:
+                    # Записи одного кэша живут одинаково долго, поэтому множество ключей
+                    # с тегом продлевается до срока последней добавленной записи
+                    pipe.sadd(self.key("tag", tag), key)
+                    pipe.expire(self.key("tag", tag), expire)
+                await pipe.execute()
+        except WatchError:
+            # Теги сброшены между проверкой поколений и записью
+            return False
+        except (RedisError, OSError):
+            logger.warning("Cache write failed", extra={"cache": self.name}, exc_info=True)
+        return True
+
+    async def _acquire_refresh_lock(self, key: str) -> bool:
+        if not self.shared:
+            return True
+        try:
+            return bool(
+                await redis_client.set(f"{key}:refresh", 1, nx=True, ex=max(1, int(self.ttl)))
+            )
+        except (RedisError, OSError):
+            return True
+
+
+# Кэш поиска отелей по локации и датам. Изменения бронирований удаляют записи сразу,
+# ttl ограничивает только изменения в обход DAO (админка, ручные правки в базе)
+hotels_search_cache = SearchCache("hotels", ttl=300, stale_ttl=60)
+
+# Сжатые тела страниц поиска отелей по их ETag и кодировке: ключ зависит
+# от содержимого страницы, поэтому записи не нужно сбрасывать при изменениях.
+# Хранятся только в памяти процесса (значения — байты).
+compressed_pages = SearchCache("compressed_pages", ttl=300, stale_ttl=60, shared=False)
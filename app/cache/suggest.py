@@ -0,0 +1,138 @@
+import asyncio
+import json
+import time
+from bisect import bisect_left
+from typing import Awaitable, Callable, Iterable, List, Optional, Set
+
+from redis.exceptions import RedisError
+
+from app.cache.client import INVALIDATION_CHANNEL, redis_client
+from app.dao.session import detach_request_session
+from app.logger import logger
+
+
+def normalize(text: str) -> str:
+    """Строка для сравнения без учета регистра и лишних пробелов."""
+    return " ".join(text.lower().split())
+
+
+class PrefixIndex:
+    """
+    Индекс строк в памяти процесса для подсказок по мере ввода: строка находится
+    по началу любого своего слова без учета регистра («алт» → «Республика Алтай, ...»).
+
+    Индекс строится загрузчиком целиком (один запрос к базе) и затем обслуживает
+    подсказки без обращений к базе. После invalidate() (во всех воркерах через
+    INVALIDATION_CHANNEL) или через max_age секунд индекс перестраивается в фоне,
+    а до окончания перестройки подсказки идут по прежнему индексу.
+    Совместим с listen_invalidations (name, drop_local, clear_local).
+    """
+
+    def __init__(self, name: str, max_age: float = 300):
+        self.name = name
+        self.max_age = max_age
+        # Отсортированные ключи (нормализованная строка с начала каждого слова) и строки для них
+        self._keys: List[str] = []
+        self._values: List[str] = []
+        self._built_at: Optional[float] = None
+        self._stale = False
+        self._rebuilding: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def build(self, values: Iterable[str]):
+        entries = set()
+        for value in values:
+            text = normalize(value)
+            for start, char in enumerate(text):
+                # Слово начинается с буквы или цифры после разделителя
+                if char.isalnum() and (start == 0 or not text[start - 1].isalnum()):
+                    entries.add((text[start:], value))
+        entries = sorted(entries)
+        self._keys = [key for key, _ in entries]
+        self._values = [value for _, value in entries]
+        self._built_at = time.monotonic()
+
+    def find(self, query: str, limit: int = 10) -> List[str]:
+        """Строки, в которых есть слово, начинающееся с query (без учета регистра)."""
+        query = normalize(query)
+        if not query:
+            return []
+        found: List[str] = []
+        position = bisect_left(self._keys, query)
+        while position < len(self._keys) and self._keys[position].startswith(query):
+            value = self._values[position]
+            if value not in found:
+                found.append(value)
+                if len(found) == limit:
+                    break
+            position += 1
+        return found
+
+    async def suggest(
+        self, query: str, loader: Callable[[], Awaitable[Iterable[str]]], limit: int = 10
+    ) -> List[str]:
+        """
+        Подсказки для query. Загрузчик вызывается только для первой постройки индекса
+        в процессе и для фоновой перестройки устаревшего индекса.
+        """
+        if self._built_at is None:
+            await self._rebuild(loader)
+        elif self._stale or time.monotonic() - self._built_at > self.max_age:
+            self._rebuild_in_background(loader)
+        return self.find(query, limit)
+
+    async def invalidate(self):
+        """Помечает индекс устаревшим в этом процессе и во всех воркерах."""
+        self._stale = True
+        try:
+            message = json.dumps({"cache": self.name, "keys": []})
+            await redis_client.publish(INVALIDATION_CHANNEL, message)
+        except (RedisError, OSError):
+            # Другие воркеры перестроят индекс по max_age
+            logger.warning("Index invalidation failed", extra={"cache": self.name}, exc_info=True)
+
+    def drop_local(self, keys: List[str]):
+        self._stale = True
+
+    def clear_local(self):
+        self._stale = True
+
+    async def _rebuild(self, loader: Callable[[], Awaitable[Iterable[str]]]):
+        if self._rebuilding is None:
+            self._rebuilding = asyncio.ensure_future(self._load(loader))
+            self._rebuilding.add_done_callback(lambda _: setattr(self, "_rebuilding", None))
+        # Отмена одного из ожидающих запросов не должна отменять загрузку для остальных
+        await asyncio.shield(self._rebuilding)
+
+    def _rebuild_in_background(self, loader: Callable[[], Awaitable[Iterable[str]]]):
+        if self._rebuilding is not None:
+            return
+        task = asyncio.ensure_future(self._rebuild(loader))
+        # Храним ссылку на задачу, иначе ее может удалить сборщик мусора
+        self._tasks.add(task)
+        task.add_done_callback(self._on_background_done)
+
+    def _on_background_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                "Index rebuild failed", extra={"cache": self.name}, exc_info=task.exception()
+            )
+
+    async def _load(self, loader: Callable[[], Awaitable[Iterable[str]]]):
+        # Загрузка может пережить запрос, который ее начал, поэтому не использует его сессию
+        detach_request_session()
+        # Изменения во время загрузки снова пометят индекс устаревшим
+        self._stale = False
+        try:
+            values = await loader()
+        except BaseException:
+            self._stale = True
+            raise
+        self.build(values)
+
+
+# Местоположения отелей для подсказок поиска (/hotels/suggest).
+# Изменения отелей через DAO, импорт и админку перестраивают индекс сразу,
+# max_age ограничивает только ручные правки в базе
+hotel_locations = PrefixIndex("hotel_locations", max_age=300)
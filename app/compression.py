@@ -0,0 +1,175 @@
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli необязателен: без него ответы сжимаются только gzip
+    brotli = None
+
+# Уровни сжатия для ответов, формируемых на каждый запрос: почти тот же размер,
+# что и на максимальных уровнях, за долю процессорного времени
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Кодировки в порядке предпочтения сервера при равных q в Accept-Encoding
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Типы ответов, которые имеет смысл сжимать (изображения уже сжаты)
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Кодировка ответа по заголовку Accept-Encoding: поддерживаемая кодировка
+    с наибольшим q (q=0 запрещает кодировку, * означает любую) или None.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return content_type is not None and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class Compressor:
+    """Потоковое сжатие в кодировке encoding ("gzip" или "br")."""
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._compress, self._flush, self._finish = (
+                compressor.process, compressor.flush, compressor.finish
+            )
+        else:
+            compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._compress = compressor.compress
+            self._flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = compressor.flush
+
+    def chunk(self, data: bytes) -> bytes:
+        """Сжимает часть потока и выталкивает ее, чтобы клиент получил данные сразу."""
+        return self._compress(data) + self._flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compress(data) + self._finish()
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    return Compressor(encoding).finish(body)
+
+
+def weak_etag(etag: str) -> str:
+    """Сжатое тело отличается побайтно от исходного, поэтому сильный ETag становится слабым."""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware, сжимающее ответы в кодировке, выбранной по Accept-Encoding
+    (brotli, если установлен, или gzip). Сжимаются только текстовые типы
+    (COMPRESSIBLE_TYPES) не меньше minimum_size байт; потоковые ответы сжимаются
+    по частям. Ответы, уже сжатые приложением (заголовок Content-Encoding,
+    например готовые страницы поиска из кэша), передаются как есть.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        start: Optional[Message] = None
+        compressor: Optional[Compressor] = None
+        passthrough = False
+        buffered = b""
+
+        async def send_compressed(message: Message):
+            nonlocal start, compressor, passthrough, buffered
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                compressible = is_compressible(headers.get("content-type"))
+                if encoding is not None and "etag" in headers and (
+                    compressible or message["status"] == 304
+                ):
+                    # Клиенту, принимающему сжатие, ETag отдается слабым независимо
+                    # от размера ответа, чтобы 304 (без Content-Type) и 200 повторяли один ETag
+                    headers["ETag"] = weak_etag(headers["etag"])
+                if "content-encoding" in headers or not compressible:
+                    passthrough = True
+                    await send(message)
+                    return
+                # Ответ зависит от Accept-Encoding, даже если сейчас не сжимается
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is None:
+                    passthrough = True
+                    await send(message)
+                    return
+                # Заголовки отправляются вместе с первой частью тела, когда известен ее размер
+                start = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                # Начало тела накапливается, пока не станет ясно, достигнет ли ответ
+                # minimum_size: потоковые ответы (в том числе через BaseHTTPMiddleware)
+                # могут приходить мелкими частями
+                buffered += body
+                if more_body and len(buffered) < self.minimum_size:
+                    return
+                body, buffered = buffered, b""
+                headers = MutableHeaders(raw=start["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    # Маленький ответ сжатие не уменьшит заметно
+                    passthrough = True
+                    await send(start)
+                    await send({**message, "body": body})
+                    return
+                compressor = Compressor(encoding)
+                headers["Content-Encoding"] = encoding
+                del headers["Content-Length"]
+                if not more_body:
+                    body = compressor.finish(body)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({**message, "body": body})
+                    return
+                await send(start)
+                start = None
+            data = compressor.chunk(body) if more_body else compressor.finish(body)
+            await send({**message, "body": data})
+
+        await self.app(scope, receive, send_compressed)
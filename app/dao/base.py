@@ -1,9 +1,29 @@
 # Импортируем необходимые функции для работы с запросами SQLAlchemy.
-from sqlalchemy import delete, insert, select
+import asyncio
+from datetime import date
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    JSON,
+    Text,
+    bindparam,
+    cast,
+    delete,
+    insert,
+    literal_column,
+    or_,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, insert as pg_insert
+from sqlalchemy.engine import Result, RowMapping
 from sqlalchemy.exc import SQLAlchemyError
 
-# Импортируем асинхронный менеджер сессий и логгер для записи ошибок.
+# Импортируем менеджер сессий (сессия запроса или отдельная) и логгер для записи ошибок.
+from app.config import settings
+from app.dao.loader import get_loader
+from app.dao.session import get_session
 from app.database import async_session_maker
+from app.exceptions import UpsertIsNotSupported
 from app.logger import logger
 
 
@@ -11,34 +31,96 @@ from app.logger import logger
 # для взаимодействия с базой данных.
 class BaseDAO:
     model = None  # Атрибут, который должен быть определен в дочерних классах (модель таблицы).
+    # Колонки естественного ключа (уникальное ограничение) для upsert. None — upsert недоступен.
+    natural_key = None
+    # Колонки начала и конца периода записи для фильтра по датам. None — фильтр недоступен.
+    period_columns: Optional[Tuple[str, str]] = None
 
     # Метод для поиска одной записи по указанным фильтрам или возвращения None, если запись не найдена.
     @classmethod
     async def find_one_or_none(cls, **filter_by):
-        async with async_session_maker() as session:
+        if filter_by.keys() == {"id"}:
+            # Поиски по id внутри запроса объединяются в один запрос (см. app/dao/loader.py)
+            loader = get_loader(cls)
+            if loader is not None:
+                return await loader.load(filter_by["id"])
+        async with get_session(read_only=True) as session:
             # Создаем SQL-запрос на выборку данных с фильтрацией по переданным аргументам.
             query = select(cls.model.__table__.columns).filter_by(**filter_by)
             result = await session.execute(query)
             # Возвращаем одну запись или None, если запись не найдена.
             return result.mappings().one_or_none()
 
+    # Метод для загрузки записей по списку id одним запросом.
+    @classmethod
+    async def load_many(cls, ids: Sequence) -> List[Optional[RowMapping]]:
+        """
+        Загружает записи по id одним запросом WHERE id = ANY(:ids).
+        Возвращает записи в порядке ids (None для отсутствующих id);
+        повторяющиеся id запрашиваются один раз.
+        """
+        unique = list(dict.fromkeys(ids))
+        if not unique:
+            return []
+        table = cls.model.__table__
+        ids_param = bindparam("ids", unique, type_=ARRAY(table.c.id.type))
+        async with get_session(read_only=True) as session:
+            query = select(table.columns).where(table.c.id == ids_param.any_())
+            rows = {row["id"]: row for row in (await session.execute(query)).mappings()}
+        return [rows.get(id_) for id_ in ids]
+
     # Метод для поиска всех записей по указанным фильтрам.
     @classmethod
     async def find_all(cls, **filter_by):
-        async with async_session_maker() as session:
+        async with get_session(read_only=True) as session:
             # Создаем SQL-запрос на выборку всех данных с фильтрацией по переданным аргументам.
             query = select(cls.model.__table__.columns).filter_by(**filter_by)
             result = await session.execute(query)
             # Возвращаем все найденные записи.
             return result.mappings().all()
 
+    # Метод для потокового чтения всех записей порциями (например, для экспорта таблицы).
+    @classmethod
+    async def stream_all(
+        cls, *where, columns: Optional[Sequence] = None, chunk_size: int = 1000
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        """
+        Возвращает записи, удовлетворяющие условиям where, порциями по chunk_size,
+        упорядоченные по id. Строки читаются через курсор на стороне сервера
+        (session.stream с yield_per), поэтому в памяти находится одна порция,
+        а первая порция доступна до того, как запрос прочитает всю таблицу.
+        Сессия занята, пока генератор не будет исчерпан или закрыт.
+        """
+        table = cls.model.__table__
+        query = (
+            select(*(columns if columns is not None else table.columns))
+            .where(*where)
+            .order_by(table.c.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        async with get_session(read_only=True) as session:
+            result = await session.stream(query)
+            async for partition in result.mappings().partitions():
+                yield partition
+
+    # Условия для записей, период которых пересекается с [date_from, date_to] (границы необязательны).
+    @classmethod
+    def period_filter(cls, date_from: Optional[date] = None, date_to: Optional[date] = None):
+        start, end = (cls.model.__table__.c[name] for name in cls.period_columns)
+        conditions = []
+        if date_from is not None:
+            conditions.append(end >= date_from)
+        if date_to is not None:
+            conditions.append(start <= date_to)
+        return conditions
+
     # Метод для добавления новой записи в базу данных.
     @classmethod
     async def add(cls, **data):
         try:
             # Формируем SQL-запрос для вставки новой записи и возврата её ID.
             query = insert(cls.model).values(**data).returning(cls.model.id)
-            async with async_session_maker() as session:
+            async with get_session() as session:
                 # Выполняем запрос и коммитим изменения в базу.
                 result = await session.execute(query)
                 await session.commit()
@@ -58,7 +140,7 @@ class BaseDAO:
     # Метод для удаления записей, удовлетворяющих указанным условиям.
     @classmethod
     async def delete(cls, **filter_by):
-        async with async_session_maker() as session:
+        async with get_session() as session:
             # Формируем SQL-запрос на удаление данных с фильтрацией по переданным аргументам.
             query = delete(cls.model).filter_by(**filter_by)
             # Выполняем запрос и коммитим изменения в базу.
@@ -67,17 +149,52 @@ class BaseDAO:
 
     # Метод для массового добавления нескольких записей в базу данных.
     @classmethod
-    async def add_bulk(cls, *data):
-        # Метод принимает список данных и добавляет их в базу данных через позиционные аргументы (*data).
+    async def add_bulk(
+        cls, *data, chunk_size: Optional[int] = None, concurrency: int = 1
+    ) -> List[int]:
+        """
+        Вставляет записи (по одной или списками, с одинаковым набором колонок)
+        и возвращает id всех вставленных записей в порядке переданных данных.
+
+        Записи отправляются порциями по chunk_size (по умолчанию DB_BULK_INSERT_CHUNK_SIZE)
+        через executemany: SQLAlchemy (insertmanyvalues) собирает каждую порцию в несколько
+        INSERT ... VALUES ... RETURNING, не превышающих лимит параметров Postgres.
+        concurrency=1 — все порции в одной транзакции (сессия запроса, если она открыта).
+        concurrency > 1 — до concurrency порций одновременно, каждая в своей транзакции
+        на отдельном соединении: при ошибке зафиксированные порции остаются, а исключение
+        передается после завершения всех порций.
+        Ошибки логируются и передаются вызывающему коду.
+        """
+        # Записи можно передать как по одной, так и списками.
+        rows = [row for item in data for row in (item if isinstance(item, list) else [item])]
+        if not rows:
+            return []
+        chunk_size = chunk_size or settings.DB_BULK_INSERT_CHUNK_SIZE
+        chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
         try:
-            # Формируем SQL-запрос для массовой вставки данных и возврата ID.
-            query = insert(cls.model).values(*data).returning(cls.model.id)
-            async with async_session_maker() as session:
-                # Выполняем запрос и коммитим изменения.
-                result = await session.execute(query)
-                await session.commit()
-                # Возвращаем первую запись (ID первой добавленной записи).
-                return result.mappings().first()
+            if concurrency <= 1 or len(chunks) == 1:
+                async with get_session() as session:
+                    ids = [await cls._insert_chunk(session, chunk) for chunk in chunks]
+                    await session.commit()
+                await cls._after_bulk_commit(rows)
+            else:
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def insert_separately(chunk):
+                    async with semaphore, async_session_maker() as session:
+                        chunk_ids = await cls._insert_chunk(session, chunk)
+                        await session.commit()
+                    await cls._after_bulk_commit(chunk)
+                    return chunk_ids
+
+                # Дожидаемся всех порций, чтобы к моменту исключения в вызывающем коде
+                # ни одна порция уже не фиксировалась в фоне
+                ids = await asyncio.gather(
+                    *(insert_separately(chunk) for chunk in chunks), return_exceptions=True
+                )
+                for result in ids:
+                    if isinstance(result, BaseException):
+                        raise result
         except (SQLAlchemyError, Exception) as e:
             # Обработка исключений при массовом добавлении данных.
             if isinstance(e, SQLAlchemyError):
@@ -88,4 +205,115 @@ class BaseDAO:
 
             # Логируем ошибку с указанием таблицы и информации об исключении.
             logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
-            return None
+            raise
+        return [id_ for chunk_ids in ids for id_ in chunk_ids]
+
+    @classmethod
+    async def _insert_chunk(cls, session, rows) -> List[int]:
+        # Список параметров вместо .values(rows): executemany с RETURNING.
+        # sort_by_parameter_order возвращает id в порядке переданных строк
+        table = cls.model.__table__
+        query = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+        result = await session.execute(query, rows)
+        ids = result.scalars().all()
+        await cls._after_bulk_insert(session, rows)
+        return ids
+
+    # Метод для идемпотентной массовой загрузки: вставляет новые записи, обновляет
+    # изменившиеся и пропускает (без записи в базу) совпадающие по естественному ключу.
+    @classmethod
+    async def upsert_bulk(cls, *data, chunk_size: Optional[int] = None) -> Dict[str, int]:
+        """
+        Загружает записи (по одной или списками, с одинаковым набором колонок) в одной
+        транзакции порциями по chunk_size (по умолчанию DB_BULK_INSERT_CHUNK_SIZE),
+        чтобы не превысить лимит параметров Postgres, и возвращает счетчики
+        inserted, updated и skipped. Ошибки логируются и передаются вызывающему коду.
+        """
+        if cls.natural_key is None:
+            raise UpsertIsNotSupported
+        counts = {"inserted": 0, "updated": 0, "skipped": 0}
+        rows = [row for item in data for row in (item if isinstance(item, list) else [item])]
+        if not rows:
+            return counts
+        # ON CONFLICT не может обновить одну строку дважды за запрос: оставляем последнюю
+        unique = list(
+            {tuple(row[column] for column in cls.natural_key): row for row in rows}.values()
+        )
+        chunk_size = chunk_size or settings.DB_BULK_INSERT_CHUNK_SIZE
+        query = cls.upsert_query(list(rows[0]))
+        try:
+            async with get_session() as session:
+                for i in range(0, len(unique), chunk_size):
+                    chunk = unique[i:i + chunk_size]
+                    # executemany: SQLAlchemy (insertmanyvalues) собирает порцию в несколько
+                    # INSERT ... VALUES ... RETURNING в пределах лимита параметров
+                    result = await session.execute(query, chunk)
+                    for key, value in cls.upsert_counts(result, len(chunk)).items():
+                        counts[key] += value
+                await session.commit()
+        except (SQLAlchemyError, Exception) as e:
+            if isinstance(e, SQLAlchemyError):
+                msg = "Database Exc"
+            elif isinstance(e, Exception):
+                msg = "Unknown Exc"
+            msg += ": Cannot upsert data into table"
+
+            logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
+            raise
+        # Повторы естественного ключа в данных не загружаются
+        counts["skipped"] += len(rows) - len(unique)
+        return counts
+
+    @classmethod
+    def upsert_query(cls, columns: Sequence[str]):
+        """
+        INSERT ... ON CONFLICT (natural_key) DO UPDATE для колонок columns.
+        Строка обновляется, только если значение хотя бы одной колонки изменилось,
+        поэтому повторная загрузка тех же данных не пишет в таблицу.
+        Возвращает колонку inserted для каждой вставленной или обновленной строки.
+        Значения задаются через .values() или .from_select().
+        """
+        table = cls.model.__table__
+        query = pg_insert(table)
+        updated: List[str] = [column for column in columns if column not in cls.natural_key]
+        if updated:
+            changed = []
+            for column in updated:
+                current, new = table.c[column], query.excluded[column]
+                if isinstance(current.type, JSON) and not isinstance(current.type, JSONB):
+                    # У типа json (в отличие от jsonb) нет оператора сравнения. Сравниваем текст: json хранится
+                    # как есть, поэтому повторная загрузка того же файла дает тот же текст
+                    # (другое форматирование того же значения лишь обновит строку)
+                    current, new = cast(current, Text), cast(new, Text)
+                changed.append(current.is_distinct_from(new))
+            query = query.on_conflict_do_update(
+                index_elements=list(cls.natural_key),
+                set_={column: query.excluded[column] for column in updated},
+                where=or_(*changed),
+            )
+        else:
+            query = query.on_conflict_do_nothing(index_elements=list(cls.natural_key))
+        # xmax = 0 только у строк, вставленных этим запросом, а не обновленных
+        return query.returning(literal_column("xmax = 0").label("inserted"))
+
+    @staticmethod
+    def upsert_counts(result: Result, total: int) -> Dict[str, int]:
+        """Подсчет вставленных, обновленных и пропущенных строк по результату upsert_query."""
+        flags = result.scalars().all()
+        inserted = sum(flags)
+        return {
+            "inserted": inserted,
+            "updated": len(flags) - inserted,
+            "skipped": total - len(flags),
+        }
+
+    # Хук, вызываемый после вставки каждой порции add_bulk в той же транзакции.
+    # Дочерние DAO переопределяют его, чтобы поддерживать производные таблицы.
+    @classmethod
+    async def _after_bulk_insert(cls, session, rows):
+        pass
+
+    # Хук, вызываемый после фиксации массовой вставки (например, для сброса кэшей).
+    @classmethod
+    async def _after_bulk_commit(cls, rows):
+        pass
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Any, Dict, Optional, Set
+
+from app.dao.session import _request_session
+
+
+class DataLoader:
+    """
+    Собирает поиски записей одного DAO по id, сделанные за одну итерацию event loop
+    (например, в asyncio.gather или в соседних зависимостях), и выполняет их одним
+    запросом через BaseDAO.load_many. Повторяющиеся id загружаются один раз.
+    Результаты не кэшируются: следующий поиск того же id снова идет в базу.
+    """
+
+    def __init__(self, dao):
+        self.dao = dao
+        # Ожидающие загрузки id текущей порции и их результаты
+        self.pending: Dict[Any, asyncio.Future] = {}
+        # Ссылки на выполняющиеся загрузки, чтобы их не удалил сборщик мусора
+        self.dispatching: Set[asyncio.Task] = set()
+
+    async def load(self, id_):
+        future = self.pending.get(id_)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self.pending:
+                # Порция отправляется, когда все готовые к выполнению задачи добавят свои id
+                loop.call_soon(self._dispatch)
+            future = self.pending[id_] = loop.create_future()
+        # Отмена одного из ожидающих не должна отменять общий результат
+        return await asyncio.shield(future)
+
+    def _dispatch(self):
+        batch, self.pending = self.pending, {}
+        task = asyncio.ensure_future(self._load_batch(batch))
+        self.dispatching.add(task)
+        task.add_done_callback(self.dispatching.discard)
+
+    async def _load_batch(self, batch: Dict[Any, asyncio.Future]):
+        try:
+            rows = await self.dao.load_many(list(batch))
+        except Exception as error:
+            for future in batch.values():
+                future.set_exception(error)
+            return
+        for future, row in zip(batch.values(), rows):
+            future.set_result(row)
+
+
+def get_loader(dao) -> Optional[DataLoader]:
+    """
+    Возвращает загрузчик DAO для сессии текущего запроса или None вне запроса
+    и во вложенных вызовах DAO (задача уже владеет сессией запроса, и загрузчик
+    ждал бы ее освобождения).
+    """
+    scoped = _request_session.get()
+    if scoped is None or scoped.owner is asyncio.current_task():
+        return None
+    loader = scoped.loaders.get(dao)
+    if loader is None:
+        loader = scoped.loaders[dao] = DataLoader(dao)
+    return loader
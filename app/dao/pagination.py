@@ -0,0 +1,91 @@
+import base64
+import binascii
+import json
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import Response
+from sqlalchemy import Date, Select, tuple_
+from sqlalchemy.sql import ColumnElement
+
+from app.exceptions import IncorrectPageCursor
+
+
+class KeysetPage:
+    """
+    Страница выборки с пагинацией по ключу (keyset): вместо OFFSET следующая страница
+    начинается со строк, идущих после последней строки предыдущей по ключу сортировки,
+    поэтому (при индексе по ключу) дальние страницы выбираются так же быстро, как первая.
+
+    sort — имя ключа сортировки, с префиксом "-" — по убыванию. К ключу добавляется id,
+    чтобы порядок строк с одинаковым значением ключа был однозначным.
+    cursor — непрозрачная строка из next_cursor предыдущей страницы.
+    Без limit выборка не делится на страницы: возвращаются все строки после курсора.
+    """
+
+    def __init__(
+        self, sort: str = "id", limit: Optional[int] = None, cursor: Optional[str] = None
+    ):
+        self.descending = sort.startswith("-")
+        self.key = sort.lstrip("-")
+        self.sort = sort
+        self.limit = limit
+        self.cursor = cursor
+        # Курсор следующей страницы (None — страница последняя), заполняет split
+        self.next_cursor: Optional[str] = None
+        self._names: List[str] = []
+
+    def apply(self, query: Select, sort_keys: Dict[str, ColumnElement], id_column) -> Select:
+        """
+        Добавляет к запросу условие по курсору, сортировку и LIMIT (если задан limit).
+        sort_keys — колонки запроса, по которым разрешена сортировка (по именам в результате).
+        """
+        if self.key not in sort_keys and self.key != "id":
+            raise ValueError(f"Unknown sort key {self.key!r}")
+        columns = [id_column] if self.key == "id" else [sort_keys[self.key], id_column]
+        self._names = [self.key, "id"][:len(columns)]
+
+        if self.cursor is not None:
+            values = self._decode(columns)
+            key, after = tuple_(*columns), tuple_(*values)
+            query = query.where(key < after if self.descending else key > after)
+        order = [column.desc() if self.descending else column.asc() for column in columns]
+        query = query.order_by(*order)
+        if self.limit is None:
+            return query
+        # Лишняя строка показывает, есть ли следующая страница
+        return query.limit(self.limit + 1)
+
+    def split(self, rows: Sequence) -> List:
+        """Отрезает лишнюю строку и запоминает курсор следующей страницы."""
+        rows = list(rows)
+        if self.limit is None or len(rows) <= self.limit:
+            self.next_cursor = None
+            return rows
+        rows = rows[:self.limit]
+        self.next_cursor = self._encode([rows[-1][name] for name in self._names])
+        return rows
+
+    def _encode(self, values: List[Any]) -> str:
+        payload = json.dumps({"sort": self.sort, "after": values}, default=str)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _decode(self, columns) -> List[Any]:
+        try:
+            padded = self.cursor + "=" * (-len(self.cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            # Курсор действителен только для той сортировки, в которой он получен
+            if payload["sort"] != self.sort or len(payload["after"]) != len(columns):
+                raise ValueError
+            return [
+                date.fromisoformat(value) if isinstance(column.type, Date) else int(value)
+                for value, column in zip(payload["after"], columns)
+            ]
+        except (binascii.Error, UnicodeDecodeError, KeyError, TypeError, ValueError):
+            raise IncorrectPageCursor
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    """Передает курсор следующей страницы в заголовке X-Next-Cursor (если она есть)."""
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
@@ -0,0 +1,161 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Dict, Optional
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.database import async_session_maker, replica_router
+from app.logger import logger
+
+if TYPE_CHECKING:
+    from app.dao.loader import DataLoader
+
+
+class RequestSession:
+    """
+    Сессия, общая для всех DAO в рамках одного HTTP запроса.
+    Блокировка не дает нескольким задачам одного запроса (например, asyncio.gather)
+    одновременно выполнять запросы через одну сессию.
+    """
+
+    def __init__(self):
+        self.session = async_session_maker()
+        self.lock = asyncio.Lock()
+        self.owner: Optional[asyncio.Task] = None
+        # Сессия реплики открывается при первом запросе на чтение
+        self.replica: Optional[AsyncSession] = None
+        self.replica_checked = False
+        # После записи запрос читает из основной БД, чтобы видеть свои изменения
+        self.wrote = False
+        # Загрузчики записей по id для каждого DAO (см. app/dao/loader.py)
+        self.loaders: Dict[type, "DataLoader"] = {}
+
+    async def pick(self, read_only: bool) -> AsyncSession:
+        if not read_only or self.wrote:
+            self.wrote = self.wrote or not read_only
+            return self.session
+        if not self.replica_checked:
+            self.replica_checked = True
+            self.replica = await open_replica_session()
+        return self.replica or self.session
+
+    async def close(self):
+        await self.session.close()
+        if self.replica is not None:
+            await self.replica.close()
+
+
+# Сессия текущего запроса. Вне запроса (Celery, скрипты, тесты DAO) не установлена.
+_request_session: ContextVar[Optional[RequestSession]] = ContextVar(
+    "request_session", default=None
+)
+
+
+async def open_replica_session() -> Optional[AsyncSession]:
+    """
+    Открывает сессию на первой доступной реплике. Возвращает None, если реплики
+    не настроены или ни к одной не удалось подключиться, — тогда читаем из основной БД.
+    """
+    if replica_router is None:
+        return None
+    for index in replica_router.candidates():
+        session = replica_router.session_makers[index]()
+        try:
+            # Подключаемся сразу, чтобы ошибка реплики не всплыла посреди запроса DAO
+            await session.connection()
+        except (DBAPIError, OSError):
+            await session.close()
+            replica_router.mark_unhealthy(index)
+            logger.warning("Replica is unavailable", extra={"replica": index}, exc_info=True)
+            continue
+        return session
+    return None
+
+
+@asynccontextmanager
+async def _call_session(read_only: bool):
+    # Отдельная сессия на время одного вызова DAO
+    session = await open_replica_session() if read_only else None
+    if session is None:
+        session = async_session_maker()
+    async with session:
+        yield session
+
+
+@asynccontextmanager
+async def get_session(read_only: bool = False):
+    """
+    Возвращает сессию запроса, если она открыта, иначе открывает отдельную сессию
+    на время вызова. Именно ее используют все методы DAO.
+    С read_only=True запрос может быть направлен на реплику для чтения.
+    """
+    scoped = _request_session.get()
+    if scoped is None:
+        async with _call_session(read_only) as session:
+            yield session
+        return
+
+    task = asyncio.current_task()
+    if scoped.owner is task:
+        # Вложенный вызов DAO внутри другого: сессия уже захвачена этой задачей
+        yield await scoped.pick(read_only)
+        return
+
+    async with scoped.lock:
+        scoped.owner = task
+        try:
+            session = await scoped.pick(read_only)
+            try:
+                yield session
+            except BaseException:
+                # Откатываем транзакцию, чтобы следующие вызовы DAO в этом запросе
+                # не работали с прерванной транзакцией и не зафиксировали ее частично
+                await session.rollback()
+                raise
+        finally:
+            scoped.owner = None
+
+
+@asynccontextmanager
+async def request_session():
+    """
+    Открывает сессию на время запроса: все вызовы DAO внутри используют
+    одно соединение из пула и не более одной транзакции
+    (плюс одно соединение с репликой, если запрос читает из нее).
+    Незафиксированная транзакция откатывается при закрытии.
+    """
+    scoped = RequestSession()
+    token = _request_session.set(scoped)
+    try:
+        yield scoped.session
+    finally:
+        _request_session.reset(token)
+        await scoped.close()
+
+
+class DBSessionMiddleware:
+    """
+    ASGI middleware, открывающее сессию запроса. Сессия закрывается только после
+    отправки всего ответа, поэтому ее можно использовать и в потоковых ответах.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        async with request_session():
+            await self.app(scope, receive, send)
+
+
+def detach_request_session():
+    """
+    Отвязывает текущую задачу от сессии запроса. Вызывается в задачах, которые
+    могут пережить запрос (например, фоновое обновление кэша): они открывают свои сессии.
+    """
+    _request_session.set(None)
@@ -1,9 +1,37 @@
+import json  # Импорт модуля json для сериализации JSON параметров запросов
+import time  # Импорт модуля time для измерения времени получения соединения
+from functools import partial  # Импорт partial для настройки json.dumps
+from itertools import count  # Импорт счетчика для выбора реплик по кругу
+from typing import List, Optional  # Импорт типов для аннотаций
+
 from sqlalchemy import NullPool  # Импорт NullPool для отключения пула соединений
+from sqlalchemy.pool import AsyncAdaptedQueuePool  # Импорт пула соединений для асинхронных драйверов
 from sqlalchemy.ext.asyncio import create_async_engine  # Импорт функции для создания асинхронного движка базы данных
 from sqlalchemy.orm import DeclarativeBase  # Импорт базового класса для декларативного объявления моделей
 from sqlalchemy.ext.asyncio import async_sessionmaker  # Импорт функции для создания асинхронных сессий
 
 from app.config import settings  # Импорт настроек приложения
+from app.prometheus.metrics import (  # Импорт метрик пула соединений
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, замеряющий время выдачи соединения: ожидание свободного слота
+    при исчерпанном пуле и установку нового подключения.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
 
 # Определяем URL базы данных и параметры в зависимости от режима работы приложения
 if settings.MODE == "TEST":
@@ -14,15 +42,86 @@ if settings.MODE == "TEST":
 else:
     # В остальных режимах используем основную базу данных
     DATABASE_URL = settings.DATABASE_URL
-    DATABASE_PARAMS = {}  # Без дополнительных параметров пула соединений
+    # Параметры пула соединений задаются через настройки (переменные окружения)
+    DATABASE_PARAMS = {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,  # Постоянно открытые соединения
+        "max_overflow": settings.DB_MAX_OVERFLOW,  # Дополнительные соединения при пиковой нагрузке
+        "pool_timeout": settings.DB_POOL_TIMEOUT,  # Сколько секунд ждать свободное соединение
+        "pool_recycle": settings.DB_POOL_RECYCLE,  # Переоткрывать соединения старше N секунд
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,  # Проверять соединение перед выдачей
+    }
+
+# JSON/JSONB параметры сериализуются без экранирования \uXXXX: так они короче, и их
+# принимает jsonb в базе с любой кодировкой сервера (escape-последовательности
+# выше U+007F jsonb принимает только в UTF8)
+DATABASE_PARAMS["json_serializer"] = partial(json.dumps, ensure_ascii=False)
+
+if settings.DB_PGBOUNCER:
+    # pgbouncer в режиме transaction может выдать другое серверное соединение в каждой
+    # транзакции, поэтому подготовленные выражения нельзя кэшировать между запросами.
+    # statement_cache_size отключает кэш asyncpg, prepared_statement_cache_size — кэш SQLAlchemy.
+    DATABASE_PARAMS["connect_args"] = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+    }
 
 # Создаем асинхронный движок базы данных с использованием заданного URL и параметров
 engine = create_async_engine(DATABASE_URL, **DATABASE_PARAMS)
 
+# Экспортируем состояние пула в Prometheus (у NullPool в тестах счетчиков нет)
+if isinstance(engine.pool, InstrumentedPool):
+    DB_POOL_CHECKED_OUT.set_function(engine.pool.checkedout)
+    DB_POOL_OVERFLOW.set_function(engine.pool.overflow)
+    DB_POOL_SIZE.set_function(engine.pool.size)
+
 # Во 2.0 версии SQLAlchemy был добавлен async_sessionmaker для работы с асинхронными сессиями.
 # Создаем фабрику асинхронных сессий, которая будет использовать движок
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+
+class ReplicaRouter:
+    """
+    Набор реплик для чтения. Реплики выбираются по кругу (round-robin);
+    реплика, к которой не удалось подключиться, пропускается retry_after секунд.
+    """
+
+    def __init__(self, urls: List[str], retry_after: float = 30, **params):
+        self.engines = [create_async_engine(url, **params) for url in urls]
+        self.session_makers = [
+            async_sessionmaker(replica, expire_on_commit=False) for replica in self.engines
+        ]
+        self.retry_after = retry_after
+        self._counter = count()
+        self._unhealthy_until = [0.0] * len(self.engines)
+
+    def candidates(self) -> List[int]:
+        """Номера доступных реплик в порядке, в котором их следует пробовать."""
+        if not self.engines:
+            return []
+        total = len(self.engines)
+        start = next(self._counter) % total
+        now = time.monotonic()
+        order = [(start + shift) % total for shift in range(total)]
+        return [i for i in order if self._unhealthy_until[i] <= now]
+
+    def mark_unhealthy(self, index: int):
+        self._unhealthy_until[index] = time.monotonic() + self.retry_after
+
+    async def dispose(self):
+        for replica in self.engines:
+            await replica.dispose()
+
+
+# Реплики используются только вне тестов: в тестах все запросы идут в тестовую БД
+replica_router: Optional[ReplicaRouter] = None
+if settings.MODE != "TEST" and settings.REPLICA_DATABASE_URLS:
+    replica_router = ReplicaRouter(
+        settings.REPLICA_DATABASE_URLS,
+        retry_after=settings.REPLICA_RETRY_AFTER,
+        **DATABASE_PARAMS,
+    )
+
 # Определяем базовый класс для всех моделей, использующих декларативный стиль
 class Base(DeclarativeBase):
     pass  # Класс не содержит дополнительной логики, служит основой для других моделей
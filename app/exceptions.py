@@ -1,3 +1,5 @@
+from typing import Dict, List, Optional
+
 from fastapi import HTTPException, status  # Импортируем класс HTTPException и статусы HTTP из FastAPI
 
 
@@ -68,6 +70,12 @@ class DateFromCannotBeAfterDateTo(BookingException):
     detail = "Дата заезда не может быть позже даты выезда"  # Подробности об ошибке
 
 
+# Исключение для бронирования с совпадающими датами заезда и выезда (без ночей проживания)
+class BookingMustIncludeNight(BookingException):
+    status_code = status.HTTP_400_BAD_REQUEST  # Код состояния 400: неверный запрос
+    detail = "Бронирование должно включать хотя бы одну ночь"  # Подробности об ошибке
+
+
 # Исключение для бронирования отеля на слишком длительный срок
 class CannotBookHotelForLongPeriod(BookingException):
     status_code = status.HTTP_400_BAD_REQUEST  # Код состояния 400: неверный запрос
@@ -84,3 +92,89 @@ class CannotAddDataToDatabase(BookingException):
 class CannotProcessCSV(BookingException):
     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR  # Код состояния 500: ошибка сервера
     detail = "Не удалось обработать CSV файл"  # Подробности об ошибке
+
+
+# Исключение для некорректного значения в CSV файле (с номером строки и колонкой)
+class IncorrectCSVValue(BookingException):
+    status_code = status.HTTP_400_BAD_REQUEST  # Код состояния 400: неверный запрос
+    detail = "Некорректное значение в CSV файле"  # Подробности об ошибке
+
+    def __init__(self, line: int, column: Optional[str], value: Optional[str]):
+        self.line = line  # Номер строки в файле (заголовок — строка 1)
+        self.column = column  # Колонка или None, если не совпало число ячеек
+        if column is None:
+            self.detail = f"Строка {line}: число значений не совпадает с заголовком"
+        else:
+            self.detail = f"Строка {line}, колонка {column}: некорректное значение {value!r}"
+        super().__init__()
+
+
+# Исключение для отсутствующей задачи импорта (или задачи другого пользователя)
+class ImportJobNotFound(BookingException):
+    status_code = status.HTTP_404_NOT_FOUND  # Код состояния 404: не найдено
+    detail = "Задача импорта не найдена"  # Подробности об ошибке
+
+
+# Исключение для повторного запуска задачи импорта, которая не завершилась ошибкой
+class ImportJobCannotBeResumed(BookingException):
+    status_code = status.HTTP_409_CONFLICT  # Код состояния 409: конфликт
+    detail = "Продолжить можно только задачу импорта, завершившуюся ошибкой"  # Подробности об ошибке
+
+
+# Исключение для импорта в режиме upsert в таблицу без естественного ключа
+class UpsertIsNotSupported(BookingException):
+    status_code = status.HTTP_400_BAD_REQUEST  # Код состояния 400: неверный запрос
+    detail = "Для этой таблицы импорт в режиме upsert недоступен"  # Подробности об ошибке
+
+
+# Исключение для массового добавления бронирований, для которых не хватает номеров
+class RoomsOverbooked(BookingException):
+    status_code = status.HTTP_409_CONFLICT  # Код состояния 409: конфликт
+    detail = "Для бронирований не хватает свободных номеров"  # Подробности об ошибке
+
+
+# Исключение для импорта бронирований из CSV файла, для которых не хватает номеров
+class RoomsOverbookedInCSV(RoomsOverbooked):
+    status_code = status.HTTP_409_CONFLICT  # Код состояния 409: конфликт
+    detail = "Для бронирований из CSV файла не хватает свободных номеров"  # Подробности об ошибке
+
+    def __init__(self, lines: Optional[List[int]] = None):
+        self.lines = lines or []  # Номера строк файла с нарушающими бронированиями
+        if self.lines:
+            shown = ", ".join(map(str, self.lines[:10]))
+            more = f" и еще {len(self.lines) - 10}" if len(self.lines) > 10 else ""
+            self.detail = f"Не хватает свободных номеров для строк {shown}{more}"
+        super().__init__()
+
+
+# Исключение для поврежденного курсора страницы или курсора другой сортировки
+class IncorrectPageCursor(BookingException):
+    status_code = status.HTTP_400_BAD_REQUEST  # Код состояния 400: неверный запрос
+    detail = "Некорректный курсор страницы"  # Подробности об ошибке
+
+
+# Исключение для фильтра по датам при экспорте таблицы без периода (отели, номера)
+class ExportPeriodIsNotSupported(BookingException):
+    status_code = status.HTTP_400_BAD_REQUEST  # Код состояния 400: неверный запрос
+    detail = "Для этой таблицы фильтр по датам недоступен"  # Подробности об ошибке
+
+
+# Исключение для загружаемого изображения больше IMAGE_UPLOAD_MAX_SIZE
+class ImageTooLarge(BookingException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE  # Код состояния 413: слишком большой запрос
+    detail = "Изображение слишком большое"  # Подробности об ошибке
+
+
+# Исключение для загружаемого файла, который не является изображением JPEG, PNG или WebP
+class UnsupportedImageType(BookingException):
+    status_code = status.HTTP_415_UNSUPPORTED_MEDIA_TYPE  # Код состояния 415: неподдерживаемый тип
+    detail = "Поддерживаются только изображения JPEG, PNG и WebP"  # Подробности об ошибке
+
+
+# Ответ 304 на условный запрос: у клиента уже есть актуальная версия ресурса
+class NotModified(BookingException):
+    status_code = status.HTTP_304_NOT_MODIFIED  # Код состояния 304: не изменено
+
+    def __init__(self, headers: Dict[str, str]):
+        super().__init__()
+        self.headers = headers  # ETag и Cache-Control повторяются в ответе 304
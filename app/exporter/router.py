@@ -0,0 +1,46 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from app.exceptions import DateFromCannotBeAfterDateTo, ExportPeriodIsNotSupported
+from app.exporter.writers import stream_export
+from app.importer.utils import TABLE_MODEL_MAP
+from app.users.dependencies import get_current_user
+
+# Создание экземпляра маршрутизатора FastAPI с префиксом "/export" и тегом "Экспорт данных из БД"
+router = APIRouter(
+    prefix="/export",
+    tags=["Экспорт данных из БД"],
+)
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+@router.get(
+    "/{table_name}",
+    dependencies=[Depends(get_current_user)],  # Зависимость для проверки текущего пользователя
+)
+async def export_table(
+        table_name: Literal["hotels", "rooms", "bookings"],  # Название таблицы для экспорта
+        format: Literal["csv", "ndjson"] = "csv",  # Формат файла
+        date_from: Optional[date] = Query(None, description="Записи с периодом, заканчивающимся не раньше"),
+        date_to: Optional[date] = Query(None, description="Записи с периодом, начинающимся не позже"),
+):
+    ModelDAO = TABLE_MODEL_MAP[table_name]  # Получение соответствующего DAO для указанной таблицы
+    where = []
+    if date_from is not None or date_to is not None:
+        if ModelDAO.period_columns is None:
+            raise ExportPeriodIsNotSupported  # Даты есть только у бронирований
+        if date_from is not None and date_to is not None and date_from > date_to:
+            raise DateFromCannotBeAfterDateTo
+        where = ModelDAO.period_filter(date_from, date_to)
+
+    # Строки читаются курсором на стороне сервера и отправляются порциями по мере чтения.
+    # Сессия запроса закрывается только после отправки всего ответа (DBSessionMiddleware).
+    return StreamingResponse(
+        stream_export(ModelDAO, format, where),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table_name}.{format}"'},
+    )
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import Any, AsyncIterator, Iterable, List, Sequence
+
+import orjson
+from sqlalchemy import Column
+from sqlalchemy.engine import RowMapping
+
+from app.logger import logger
+
+# Сколько строк читается из курсора и кодируется за один раз
+CHUNK_SIZE = 1000
+
+
+def export_columns(model) -> List[Column]:
+    """
+    Колонки таблицы для экспорта — без вычисляемых (total_cost, stay и т.д.):
+    их нельзя загрузить обратно через /import/{table_name}.
+    """
+    return [column for column in model.__table__.columns if column.computed is None]
+
+
+def _csv_value(value: Any) -> Any:
+    # Значения в том же виде, в каком их принимает импорт CSV
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def encode_csv(lines: Iterable[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, delimiter=";", lineterminator="\n").writerows(lines)
+    return buffer.getvalue().encode()
+
+
+def encode_ndjson(names: Sequence[str], rows: Sequence[RowMapping]) -> bytes:
+    return b"".join(orjson.dumps({name: row[name] for name in names}) + b"\n" for row in rows)
+
+
+async def stream_export(dao, export_format: str, where: Sequence = ()) -> AsyncIterator[bytes]:
+    """
+    Тело ответа экспорта: строки таблицы dao порциями по CHUNK_SIZE в CSV
+    (разделитель ";", как у импорта) или NDJSON. Заголовок CSV отправляется
+    до выполнения запроса, затем каждая порция из курсора кодируется и отправляется
+    сразу, поэтому память не зависит от размера таблицы.
+    """
+    columns = export_columns(dao.model)
+    names = [column.name for column in columns]
+    if export_format == "csv":
+        yield encode_csv([names])
+    exported = 0
+    try:
+        async for rows in dao.stream_all(*where, columns=columns, chunk_size=CHUNK_SIZE):
+            if export_format == "csv":
+                yield encode_csv([_csv_value(row[name]) for name in names] for row in rows)
+            else:
+                yield encode_ndjson(names, rows)
+            exported += len(rows)
+    except Exception:
+        # Заголовки уже отправлены: прерываем ответ, клиент получит неполное тело
+        logger.error(
+            "Cannot export table",
+            extra={"table": dao.model.__tablename__, "exported": exported},
+            exc_info=True,
+        )
+        raise
+    logger.info("Table is exported", extra={"table": dao.model.__tablename__, "rows": exported})
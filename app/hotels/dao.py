@@ -1,47 +1,100 @@
 from datetime import date
+from typing import List, Optional
 
-from sqlalchemy import and_, func, or_, select
+from sqlalchemy import and_, distinct, func, or_, select
+from sqlalchemy.dialects.postgresql import array
 
-from app.bookings.models import Bookings
+from app.cache.etag import CATALOG, bump_versions
+from app.cache.suggest import hotel_locations
 from app.dao.base import BaseDAO
-from app.database import async_session_maker, engine
+from app.dao.pagination import KeysetPage
+from app.dao.session import get_session
+from app.database import engine
 from app.hotels.models import Hotels
 from app.hotels.rooms.models import Rooms
+from app.inventory.dao import RoomInventoryDAO
 from app.logger import logger
 
 
+def escape_like(value: str) -> str:
+    """Экранирует спецсимволы LIKE, чтобы строка поиска совпадала буквально."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def services_filter(column, services: List[str], match_all: bool = True):
+    """
+    Условие по списку услуг в колонке JSONB: есть все услуги из services (@>)
+    или хотя бы одна из них (?|). Оба оператора используют GIN индекс по колонке.
+    """
+    if match_all:
+        return column.contains(services)
+    return column.has_any(array(services))
+
+
 class HotelDAO(BaseDAO):
     model = Hotels
+    natural_key = ("name", "location")
+
+    @classmethod
+    async def find_locations(cls) -> List[str]:
+        """Все различные местоположения отелей (для индекса подсказок hotel_locations)."""
+        async with get_session(read_only=True) as session:
+            result = await session.execute(select(distinct(Hotels.location)))
+            return result.scalars().all()
+
+    # Изменения отелей перестраивают индекс подсказок во всех воркерах
+    # и меняют ETag ответов с данными отелей.
+    @classmethod
+    async def add(cls, **data):
+        hotel = await super().add(**data)
+        if hotel is not None:
+            await cls._catalog_changed()
+        return hotel
+
+    @classmethod
+    async def delete(cls, **filter_by):
+        await super().delete(**filter_by)
+        await cls._catalog_changed()
+
+    @classmethod
+    async def upsert_bulk(cls, *data, chunk_size: Optional[int] = None):
+        counts = await super().upsert_bulk(*data, chunk_size=chunk_size)
+        await cls._catalog_changed()
+        return counts
+
+    @classmethod
+    async def _after_bulk_commit(cls, rows):
+        await cls._catalog_changed()
+
+    @staticmethod
+    async def _catalog_changed():
+        await hotel_locations.invalidate()
+        await bump_versions([CATALOG])
 
     @classmethod
-    async def find_all(cls, location: str, date_from: date, date_to: date):
+    async def find_all(
+        cls,
+        location: str,
+        date_from: date,
+        date_to: date,
+        page: Optional[KeysetPage] = None,
+        services: Optional[List[str]] = None,
+        services_match_all: bool = True,
+    ):
         """
         Этот метод находит все доступные отели по заданной локации и датам.
 
         Использует CTE (Common Table Expression) для подсчета количества забронированных номеров:
-        1. booked_rooms - выбирает идентификаторы комнат и подсчитывает количество забронированных комнат
+        1. booked_rooms - максимальная посуточная занятость каждого номера из room_inventory_daily
         2. booked_hotels - подсчитывает количество доступных комнат в каждом отеле.
 
         Затем выбирает отели с оставшимися комнатами и подходящим местоположением.
+        С page возвращается одна страница, отсортированная по id или rooms_left.
+        services оставляет отели со всеми (services_match_all=True) или хотя бы одной из услуг.
         """
-        # CTE для получения количества забронированных комнат
-        booked_rooms = (
-            select(Bookings.room_id, func.count(Bookings.room_id).label("rooms_booked"))
-            .select_from(Bookings)
-            .where(
-                or_(
-                    and_(
-                        Bookings.date_from >= date_from,
-                        Bookings.date_from <= date_to,
-                    ),
-                    and_(
-                        Bookings.date_from <= date_from,
-                        Bookings.date_to > date_from,
-                    ),
-                ),
-            )
-            .group_by(Bookings.room_id)
-            .cte("booked_rooms")
+        # CTE с максимальной занятостью каждого номера за запрошенные дни
+        booked_rooms = RoomInventoryDAO.booked_rooms(date_from, date_to).cte(
+            "booked_rooms"
         )
 
         # CTE для подсчета оставшихся комнат в отелях
@@ -56,6 +109,7 @@ class HotelDAO(BaseDAO):
         )
 
         # Запрос для получения отелей с оставшимися комнатами
+        pattern = f"%{escape_like(location)}%"
         get_hotels_with_rooms = (
             select(
                 Hotels.__table__.columns,  # Получаем все столбцы модели Hotels
@@ -65,14 +119,27 @@ class HotelDAO(BaseDAO):
             .where(
                 and_(
                     booked_hotels.c.rooms_left > 0,  # Условие: оставшиеся комнаты должны быть больше 0
-                    Hotels.location.like(f"%{location}%"),  # Фильтр по местоположению
+                    # Фильтр по местоположению или названию без учета регистра
+                    # (ILIKE '%...%' использует триграммные индексы pg_trgm)
+                    or_(
+                        Hotels.location.ilike(pattern, escape="\\"),
+                        Hotels.name.ilike(pattern, escape="\\"),
+                    ),
                 )
             )
         )
+        if services:
+            get_hotels_with_rooms = get_hotels_with_rooms.where(
+                services_filter(Hotels.services, services, services_match_all)
+            )
+        if page is not None:
+            get_hotels_with_rooms = page.apply(
+                get_hotels_with_rooms, {"rooms_left": booked_hotels.c.rooms_left}, Hotels.id
+            )
 
-        async with async_session_maker() as session:
+        async with get_session(read_only=True) as session:
             # Логирование скомпилированного запроса для отладки (при необходимости)
             # logger.debug(get_hotels_with_rooms.compile(engine, compile_kwargs={"literal_binds": True}))
             # Выполняем запрос и возвращаем результаты
-            hotels_with_rooms = await session.execute(get_hotels_with_rooms)
-            return hotels_with_rooms.mappings().all()
+            hotels_with_rooms = (await session.execute(get_hotels_with_rooms)).mappings().all()
+        return page.split(hotels_with_rooms) if page is not None else hotels_with_rooms
@@ -1,4 +1,5 @@
-from sqlalchemy import JSON, Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -6,11 +7,19 @@ from app.database import Base
 
 class Hotels(Base):
     __tablename__ = "hotels"  # Указывает имя таблицы в базе данных
+    # Естественный ключ отеля: по нему импорт в режиме upsert находит существующие записи
+    # GIN индекс по услугам — для фильтров поиска services @> ... и services ?| ...
+    __table_args__ = (
+        UniqueConstraint("name", "location", name="uq_hotels_name_location"),
+        Index("ix_hotels_services", "services", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True)  # Уникальный идентификатор отеля
+    # По name и location построены триграммные GIN индексы для поиска ILIKE '%...%'
+    # (создаются миграцией, так как требуют расширения pg_trgm)
     name = Column(String, nullable=False)  # Название отеля, не может быть пустым
     location = Column(String, nullable=False)  # Расположение отеля, не может быть пустым
-    services = Column(JSON)  # Услуги, предоставляемые отелем (хранится в формате JSON)
+    services = Column(JSONB)  # Услуги, предоставляемые отелем (хранится в формате JSONB)
     rooms_quantity = Column(Integer, nullable=False)  # Общее количество номеров в отеле
     image_id = Column(Integer)  # Идентификатор изображения отеля
 
@@ -1,43 +1,76 @@
 from datetime import date
-from sqlalchemy import and_, func, or_, select
+from typing import Iterable, List, Optional
 
-from app.bookings.models import Bookings
+from sqlalchemy import Integer, bindparam, distinct, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.cache.etag import CATALOG, bump_versions
 from app.dao.base import BaseDAO
-from app.database import async_session_maker
+from app.dao.session import get_session
+from app.hotels.dao import services_filter
 from app.hotels.rooms.models import Rooms
+from app.inventory.dao import RoomInventoryDAO
 from app.logger import logger
 
 
 class RoomDAO(BaseDAO):
     model = Rooms
+    natural_key = ("hotel_id", "name")
+
+    @classmethod
+    async def find_hotel_ids(cls, room_ids: Iterable[int]) -> List[int]:
+        """Отели, которым принадлежат номера room_ids."""
+        async with get_session(read_only=True) as session:
+            result = await session.execute(
+                select(distinct(Rooms.hotel_id)).where(
+                    Rooms.id == bindparam("room_ids", list(room_ids), type_=ARRAY(Integer)).any_()
+                )
+            )
+            return result.scalars().all()
+
+    # Изменения номеров меняют ETag ответов с данными отелей и номеров.
+    @classmethod
+    async def add(cls, **data):
+        room = await super().add(**data)
+        if room is not None:
+            await bump_versions([CATALOG])
+        return room
+
+    @classmethod
+    async def delete(cls, **filter_by):
+        await super().delete(**filter_by)
+        await bump_versions([CATALOG])
+
+    @classmethod
+    async def upsert_bulk(cls, *data, chunk_size: Optional[int] = None):
+        counts = await super().upsert_bulk(*data, chunk_size=chunk_size)
+        await bump_versions([CATALOG])
+        return counts
 
     @classmethod
-    async def find_all(cls, hotel_id: int, date_from: date, date_to: date):
+    async def _after_bulk_commit(cls, rows):
+        await bump_versions([CATALOG])
+
+    @classmethod
+    async def find_all(
+        cls,
+        hotel_id: int,
+        date_from: date,
+        date_to: date,
+        services: Optional[List[str]] = None,
+        services_match_all: bool = True,
+    ):
         """
         Получить доступные номера в отеле на указанные даты.
+        services оставляет номера со всеми (services_match_all=True) или хотя бы одной из услуг.
 
-        Используется CTE (Common Table Expression) для определения забронированных номеров,
+        Используется CTE (Common Table Expression) с посуточной занятостью номеров,
         а затем возвращается список доступных номеров с подсчетом оставшихся мест.
         """
 
-        # Создание CTE для получения количества забронированных номеров
-        booked_rooms = (
-            select(Bookings.room_id, func.count(Bookings.room_id).label("rooms_booked"))
-            .select_from(Bookings)  # Выбор из таблицы бронирований
-            .where(
-                or_(
-                    and_(
-                        Bookings.date_from >= date_from,  # Начало бронирования после запрашиваемых дат
-                        Bookings.date_from <= date_to,  # Конец бронирования до запрашиваемых дат
-                    ),
-                    and_(
-                        Bookings.date_from <= date_from,  # Начало бронирования до запрашиваемых дат
-                        Bookings.date_to > date_from,  # Конец бронирования после начала запрашиваемых дат
-                    ),
-                ),
-            )
-            .group_by(Bookings.room_id)  # Группировка по ID номера
-            .cte("booked_rooms")  # Создание CTE с именем "booked_rooms"
+        # Создание CTE с максимальной занятостью каждого номера за запрошенные дни
+        booked_rooms = RoomInventoryDAO.booked_rooms(date_from, date_to).cte(
+            "booked_rooms"
         )
 
         # Запрос для получения информации о доступных номерах в отеле
@@ -52,9 +85,12 @@ class RoomDAO(BaseDAO):
                 Rooms.hotel_id == hotel_id  # Фильтрация по ID отеля
             )
         )
+        if services:
+            # Номера одного отеля уже выбраны по индексу (hotel_id, name): отдельный GIN не нужен
+            get_rooms = get_rooms.where(services_filter(Rooms.services, services, services_match_all))
 
         # Открытие асинхронной сессии для выполнения запроса
-        async with async_session_maker() as session:
+        async with get_session(read_only=True) as session:
             # Для отладки можно вывести SQL-запрос в лог
             # logger.debug(get_rooms.compile(engine, compile_kwargs={"literal_binds": True}))
             rooms = await session.execute(get_rooms)  # Выполнение запроса
@@ -1,4 +1,5 @@
-from sqlalchemy import JSON, Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -6,6 +7,12 @@ from app.database import Base
 
 class Rooms(Base):
     __tablename__ = "rooms"  # Название таблицы в базе данных
+    # Естественный ключ номера: по нему импорт в режиме upsert находит существующие записи
+    # GIN индекс по услугам — для фильтров services @> ... и services ?| ... в поиске номеров
+    __table_args__ = (
+        UniqueConstraint("hotel_id", "name", name="uq_rooms_hotel_id_name"),
+        Index("ix_rooms_services", "services", postgresql_using="gin"),
+    )
 
     # Основные поля таблицы
     id = Column(Integer, primary_key=True, nullable=False)  # Уникальный идентификатор номера
@@ -13,7 +20,7 @@ class Rooms(Base):
     name = Column(String, nullable=False)  # Название номера
     description = Column(String, nullable=True)  # Описание номера
     price = Column(Integer, nullable=False)  # Цена за ночь
-    services = Column(JSON, nullable=True)  # Список услуг (в формате JSON)
+    services = Column(JSONB, nullable=True)  # Список услуг (в формате JSONB)
     quantity = Column(Integer, nullable=False)  # Количество доступных номеров данного типа
     image_id = Column(Integer)  # Идентификатор изображения номера (если имеется)
 
@@ -1,21 +1,48 @@
 from datetime import date, datetime, timedelta
-from typing import List
+from typing import List, Optional
 
-from fastapi import Query
+from fastapi import Depends, Query, Request, Response
 
+from app.cache.etag import AVAILABILITY, CATALOG, check_not_modified, hotel_availability
 from app.hotels.rooms.dao import RoomDAO
 from app.hotels.rooms.schemas import SRoomInfo
 from app.hotels.router import router
+from app.responses import fast_json
 
 
-@router.get("/{hotel_id}/rooms")
+# Поиск номеров вынесен в зависимость: ее же использует страница номеров (app/pages/router.py).
+async def search_rooms(
+    hotel_id: int,
+    date_from: date = Query(..., description=f"Например, {datetime.now().date()}"),  # Дата начала поиска
+    date_to: date = Query(..., description=f"Например, {(datetime.now() + timedelta(days=14)).date()}"),  # Дата окончания поиска
+    services: Optional[List[str]] = Query(None, description="Услуги, например Wi-Fi"),  # Фильтр по услугам
+    services_match: str = Query(
+        "all", regex="^(all|any)$", description="all — все услуги, any — хотя бы одна"
+    ),  # Нужны все перечисленные услуги или хотя бы одна
+):
+    # Получение доступных номеров через DAO (фильтр по услугам выполняется в базе)
+    rooms = await RoomDAO.find_all(
+        hotel_id, date_from, date_to,
+        services=services, services_match_all=services_match == "all",
+    )
+    return rooms  # Возврат списка найденных номеров
+
+
+# Условный запрос свободных номеров: ETag строится по версии доступности отеля,
+# которая меняется после каждого изменения его бронирований, поэтому 304 отдается
+# до запроса к базе. Клиенты, опрашивающие доступность, всегда проверяют актуальность.
+async def rooms_not_modified(hotel_id: int, request: Request, response: Response):
+    await check_not_modified(
+        request, response, [CATALOG, AVAILABILITY, hotel_availability(hotel_id)], "no-cache"
+    )
+
+
+@router.get("/{hotel_id}/rooms", dependencies=[Depends(rooms_not_modified)])
 # Этот эндпоинт предоставляет информацию о доступных номерах в указанном отеле
 # по заданным датам. Кэширование можно применять, но оно не реализовано в этом
 # курсе, чтобы можно было сравнить производительность между эндпоинтами.
 async def get_rooms_by_time(
-    hotel_id: int,
-    date_from: date = Query(..., description=f"Например, {datetime.now().date()}"),  # Дата начала поиска
-    date_to: date = Query(..., description=f"Например, {(datetime.now() + timedelta(days=14)).date()}"),  # Дата окончания поиска
+    response: Response,
+    rooms=Depends(search_rooms),
 ) -> List[SRoomInfo]:  # Возвращает список информации о номерах
-    rooms = await RoomDAO.find_all(hotel_id, date_from, date_to)  # Получение доступных номеров через DAO
-    return rooms  # Возврат списка найденных номеров
+    return fast_json(rooms, SRoomInfo, response)
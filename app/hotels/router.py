@@ -1,35 +1,128 @@
 from datetime import date, datetime, timedelta
 from typing import List, Optional
 
-from fastapi import APIRouter, Query
-from fastapi_cache.decorator import cache
+from fastapi import APIRouter, Depends, Query, Request, Response
 
+from app.cache.etag import CATALOG, check_not_modified, make_etag, raise_if_not_modified
+from app.cache.invalidation import day_tags
+from app.cache.search import compressed_pages, hotels_search_cache
+from app.compression import choose_encoding, compress
+from app.config import settings
+from app.cache.suggest import hotel_locations
+from app.dao.pagination import KeysetPage, set_next_cursor
 from app.exceptions import CannotBookHotelForLongPeriod, DateFromCannotBeAfterDateTo
 from app.hotels.dao import HotelDAO
 from app.hotels.schemas import SHotel, SHotelInfo
+from app.responses import encoded_json, fast_json, render_json
 
 router = APIRouter(prefix="/hotels", tags=["Отели"])  # Создание маршрутизатора для эндпоинтов отелей
 
 
-@router.get("/{location}")
-@cache(expire=30)  # Кэширование результата запроса на 30 секунд
-async def get_hotels_by_location_and_time(
+# Маршрут объявлен до /{location}, иначе "suggest" был бы принят за местоположение.
+@router.get("/suggest")
+async def suggest_locations(
+    q: str = Query(..., min_length=1, max_length=100, description="Начало слова местоположения"),
+    limit: int = Query(10, ge=1, le=50),
+) -> List[str]:
+    # Подсказки берутся из индекса в памяти воркера, без запросов к базе
+    return await hotel_locations.suggest(q, HotelDAO.find_locations, limit=limit)
+
+
+# Поиск отелей вынесен в зависимость: ее же используют страницы фронтенда (app/pages/router.py).
+async def search_hotels(
     location: str,
+    response: Response,
     date_from: date = Query(..., description=f"Например, {datetime.now().date()}"),
     date_to: date = Query(..., description=f"Например, {(datetime.now() + timedelta(days=14)).date()}"),
-) -> List[SHotelInfo]:
+    limit: Optional[int] = Query(
+        None, ge=1, le=500, description="Отелей на странице, без limit — все"
+    ),
+    cursor: Optional[str] = Query(None, description="Заголовок X-Next-Cursor предыдущей страницы"),
+    sort: str = Query(
+        "id", regex="^-?(id|rooms_left)$", description="Ключ сортировки, -ключ — по убыванию"
+    ),
+    services: Optional[List[str]] = Query(None, description="Услуги, например Wi-Fi"),
+    services_match: str = Query(
+        "all", regex="^(all|any)$", description="all — все услуги, any — хотя бы одна"
+    ),
+) -> List[dict]:
     # Проверка, что дата начала не позже даты окончания
     if date_from > date_to:
         raise DateFromCannotBeAfterDateTo
     # Проверка, что период бронирования не превышает 31 день
     if (date_to - date_from).days > 31:
         raise CannotBookHotelForLongPeriod
-    # Получение всех отелей по локации и датам
-    hotels = await HotelDAO.find_all(location, date_from, date_to)
-    return hotels
+    # Получение страницы отелей по локации и датам из базы (при промахе кэша)
+    async def load_hotels():
+        page = KeysetPage(sort, limit, cursor)
+        hotels = await HotelDAO.find_all(
+            location, date_from, date_to, page=page,
+            services=services, services_match_all=services_match == "all",
+        )
+        hotels = [dict(hotel) for hotel in hotels]
+        # ETag считается один раз при загрузке и хранится вместе со страницей в кэше
+        return {
+            "hotels": hotels,
+            "next_cursor": page.next_cursor,
+            "etag": make_etag(hotels, page.next_cursor),
+        }
+
+    # Результат кэшируется и помечается днями периода: изменение бронирований
+    # на любой из этих дней удаляет запись (см. app/cache/invalidation.py)
+    result = await hotels_search_cache.get_or_load(
+        hotels_search_cache.key(
+            location, date_from, date_to, sort, limit, cursor,
+            services_match, ",".join(sorted(set(services or []))),
+        ),
+        load_hotels,
+        tags=day_tags(date_from, date_to),
+    )
+    set_next_cursor(response, result["next_cursor"])
+    # Записи, сохраненные до появления ETag, хэшируются при чтении
+    response.headers["ETag"] = result.get("etag") or make_etag(
+        result["hotels"], result["next_cursor"]
+    )
+    return result["hotels"]
+
+
+@router.get("/{location}")
+async def get_hotels_by_location_and_time(
+    request: Request,
+    response: Response,
+    hotels: List[dict] = Depends(search_hotels),
+) -> List[SHotelInfo]:
+    # Страница берется из кэша поиска вместе с ETag: при совпадении с If-None-Match
+    # отвечаем 304 без сериализации. Свободные номера меняются, поэтому браузер
+    # может использовать ответ без проверки лишь несколько секунд.
+    response.headers["Cache-Control"] = "public, max-age=15, must-revalidate"
+    raise_if_not_modified(request, response)
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    if encoding is None:
+        # Строки получены нашим же запросом DAO: их можно отдать без повторной проверки схемой
+        return fast_json(hotels, SHotelInfo, response)
+
+    # Сжатое тело страницы готовится один раз на ETag и кодировку и берется из кэша,
+    # а не сжимается CompressionMiddleware заново на каждый запрос
+    async def load_body():
+        body = render_json(hotels, SHotelInfo)
+        if len(body) < settings.COMPRESSION_MINIMUM_SIZE:
+            return body, None
+        return compress(body, encoding), encoding
+
+    body, body_encoding = await compressed_pages.get_or_load(
+        compressed_pages.key(response.headers["etag"], encoding, settings.FAST_JSON_RESPONSES),
+        load_body,
+    )
+    return encoded_json(body, body_encoding, response)
+
+
+# Условный запрос данных отеля: ETag зависит только от версии каталога отелей и номеров,
+# поэтому 304 отдается до запроса к базе. Данные отеля меняются редко.
+async def hotel_not_modified(hotel_id: int, request: Request, response: Response):
+    await check_not_modified(request, response, [CATALOG], "public, max-age=300")
 
 
-@router.get("/id/{hotel_id}", include_in_schema=True)
+@router.get("/id/{hotel_id}", include_in_schema=True, dependencies=[Depends(hotel_not_modified)])
 # Этот эндпоинт используется для фронтенда, чтобы отобразить информацию о номерах в отеле
 # и информацию о самом отеле.
 async def get_hotel_by_id(
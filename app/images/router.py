@@ -1,23 +1,31 @@
-import shutil
 from fastapi import APIRouter, UploadFile
+
+from app.images.upload import UploadSizeLimitRoute, save_image
 from app.tasks.tasks import process_pic
 
+# Каталог изображений отелей, из которого их отдает /static
+IMAGES_DIR = "app/static/images"
+
 # Создание экземпляра маршрутизатора FastAPI с префиксом "/images" и тегом "Загрузка картинок"
 router = APIRouter(
     prefix="/images",
-    tags=["Загрузка картинок"]
+    tags=["Загрузка картинок"],
+    route_class=UploadSizeLimitRoute,  # Тело запроса больше IMAGE_UPLOAD_MAX_SIZE отклоняется с 413
 )
 
 
 @router.post("/hotels")
 async def add_hotel_image(name: int, file: UploadFile):
     # Формируем путь для сохранения изображения, используя переданное имя (id) отеля
-    im_path = f"app/static/images/{name}.webp"
+    im_path = f"{IMAGES_DIR}/{name}.webp"
 
-    # Открываем файл для записи в бинарном режиме
-    with open(im_path, "wb+") as file_object:
-        # Сохраняем загруженный файл в локальное хранилище (обычно используется удаленное хранилище в реальных приложениях)
-        shutil.copyfileobj(file.file, file_object)
+    # Сохраняем загруженный файл в локальное хранилище (обычно используется удаленное хранилище
+    # в реальных приложениях) порциями в пуле потоков, не блокируя event loop. Файл появляется
+    # под именем im_path только целиком и только если это изображение допустимого размера.
+    try:
+        await save_image(file.file, im_path)
+    finally:
+        file.file.close()  # Закрытие файла после чтения
 
     # Отправляем задачу на обработку изображения в фоновый режим с использованием Celery
     process_pic.delay(im_path)
@@ -0,0 +1,99 @@
+import os
+from typing import BinaryIO, Callable, Optional
+from uuid import uuid4
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Message, Receive
+
+from app.config import settings
+from app.exceptions import ImageTooLarge, UnsupportedImageType
+
+CHUNK_SIZE = 1024 * 1024
+# Запас на заголовки multipart сверх размера самого изображения
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """Тип изображения по сигнатуре в начале файла (заголовку Content-Type клиента не доверяем)."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _save(file: BinaryIO, path: str, max_size: int) -> str:
+    # Пишем во временный файл рядом с целевым: переименование в пределах
+    # одной файловой системы атомарно, поэтому неполный файл никто не увидит
+    part_path = f"{path}.{uuid4().hex}.part"
+    try:
+        with open(part_path, "wb") as saved:
+            head = file.read(CHUNK_SIZE)
+            image_type = sniff_image_type(head)
+            if image_type is None:
+                raise UnsupportedImageType
+            size = 0
+            chunk = head
+            while chunk:
+                size += len(chunk)
+                if size > max_size:
+                    raise ImageTooLarge
+                saved.write(chunk)
+                chunk = file.read(CHUNK_SIZE)
+        os.replace(part_path, path)
+    except BaseException:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise
+    return image_type
+
+
+async def save_image(file: BinaryIO, path: str) -> str:
+    """
+    Сохраняет загруженное изображение в path порциями в пуле потоков, не блокируя
+    event loop, и возвращает его тип. Файл не больше IMAGE_UPLOAD_MAX_SIZE байт
+    (иначе ImageTooLarge) и должен быть JPEG, PNG или WebP (иначе UnsupportedImageType);
+    в обоих случаях path не изменяется.
+    """
+    return await run_in_threadpool(_save, file, path, settings.IMAGE_UPLOAD_MAX_SIZE)
+
+
+def _limit_body(receive: Receive, max_size: int) -> Receive:
+    received = 0
+
+    async def limited_receive() -> Message:
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_size:
+                raise ImageTooLarge
+        return message
+
+    return limited_receive
+
+
+class UploadSizeLimitRoute(APIRoute):
+    """
+    Маршрут, ограничивающий размер тела запроса IMAGE_UPLOAD_MAX_SIZE (плюс заголовки
+    multipart): запрос с большим Content-Length отклоняется сразу, а тело без него
+    прерывается, как только превысит ограничение, — до разбора формы во временный файл.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Response]:
+        handler = super().get_route_handler()
+
+        async def limited_handler(request: Request) -> Response:
+            max_size = settings.IMAGE_UPLOAD_MAX_SIZE + MULTIPART_OVERHEAD
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > max_size:
+                raise ImageTooLarge
+            return await handler(Request(request.scope, _limit_body(request.receive, max_size)))
+
+        return limited_handler
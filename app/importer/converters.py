@@ -0,0 +1,113 @@
+import json
+from datetime import date
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import JSON, Date, Integer, String
+
+from app.exceptions import CannotProcessCSV, IncorrectCSVValue
+
+Converter = Callable[[str], object]
+
+# Сколько различных значений JSON и дат запоминается для каждой колонки
+CACHE_SIZE = 4096
+
+
+def _to_json(value: str):
+    # В файлах курса списки записаны в нотации Python: ['Wi-Fi', 'Парковка']
+    return json.loads(value.replace("'", '"'))
+
+
+def _to_json_text(value: str) -> str:
+    # Для COPY нужен текст JSON: проверяем его, но не сериализуем повторно
+    text = value.replace("'", '"')
+    json.loads(text)
+    return text
+
+
+def _column_type(column):
+    # У колонки, заданной только внешним ключом, тип берется из колонки, на которую она ссылается
+    for foreign_key in column.foreign_keys:
+        return foreign_key.column.type
+    return column.type
+
+
+def _converter(column, for_copy: bool) -> Optional[Converter]:
+    """Функция преобразования одной ячейки или None, если строка не меняется."""
+    column_type = _column_type(column)
+    if isinstance(column_type, Integer):
+        return int
+    if isinstance(column_type, Date):
+        # Даты и списки услуг в файле повторяются, поэтому разбираются один раз
+        return lru_cache(maxsize=CACHE_SIZE)(date.fromisoformat)
+    if isinstance(column_type, JSON):
+        # Результат json.loads изменяемый, поэтому кэшируется только проверенный текст
+        return lru_cache(maxsize=CACHE_SIZE)(_to_json_text) if for_copy else _to_json
+    if isinstance(column_type, String):
+        return None
+    raise CannotProcessCSV
+
+
+class CSVRowConverter:
+    """
+    Преобразует строки CSV в значения для PostgreSQL по типам колонок модели.
+    Функции преобразования выбираются один раз для заголовка файла
+    и применяются к порции строк по колонкам.
+    for_copy=True оставляет JSON текстом, как его принимает COPY.
+    """
+
+    def __init__(self, model, columns: Sequence[str], for_copy: bool = False):
+        table_columns = model.__table__.columns
+        if not columns or any(
+            column not in table_columns or table_columns[column].computed is not None
+            for column in columns
+        ):
+            raise CannotProcessCSV
+        self.columns: List[str] = list(columns)
+        self.converters: List[Optional[Converter]] = [
+            _converter(table_columns[column], for_copy) for column in columns
+        ]
+        self.nullable: List[bool] = [table_columns[column].nullable for column in columns]
+
+    def convert_batch(self, rows: List[List[str]], first_line: int = 2) -> List[tuple]:
+        """
+        Преобразует порцию строк (списков ячеек) в кортежи значений в порядке колонок.
+        first_line — номер первой строки порции в файле (для сообщений об ошибках).
+        """
+        width = len(self.columns)
+        for index, row in enumerate(rows):
+            if len(row) != width:
+                raise IncorrectCSVValue(first_line + index, None, None)
+        if not rows:
+            return []
+
+        converted = []
+        for position, cells in enumerate(zip(*rows)):
+            converted.append(self._convert_column(position, cells, first_line))
+        return list(zip(*converted))
+
+    def convert_dicts(self, rows: List[List[str]], first_line: int = 2) -> List[Dict]:
+        return [dict(zip(self.columns, row)) for row in self.convert_batch(rows, first_line)]
+
+    def _convert_column(self, position: int, cells: Sequence[str], first_line: int):
+        convert = self.converters[position]
+        if convert is None:
+            return cells
+        try:
+            # Быстрый путь: map без обертки на Python, пока в колонке нет пустых ячеек
+            return list(map(convert, cells))
+        except ValueError:
+            pass
+
+        # Пустая ячейка в необязательной колонке означает NULL
+        nullable = self.nullable[position]
+        values = []
+        for index, value in enumerate(cells):
+            if not value and nullable:
+                values.append(None)
+                continue
+            try:
+                values.append(convert(value))
+            except ValueError:
+                raise IncorrectCSVValue(first_line + index, self.columns[position], value)
+        return values
@@ -0,0 +1,231 @@
+import codecs
+import csv
+from collections import Counter
+from itertools import islice
+from typing import Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import column, literal_column, select, table as table_clause, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from starlette.concurrency import run_in_threadpool
+
+from app.bookings.models import Bookings
+from app.hotels.models import Hotels
+from app.hotels.rooms.models import Rooms
+from app.cache.etag import CATALOG, bump_versions
+from app.cache.invalidation import invalidate_bookings
+from app.cache.suggest import hotel_locations
+from app.database import engine
+from app.exceptions import (
+    CannotAddDataToDatabase,
+    CannotProcessCSV,
+    IncorrectCSVValue,
+    RoomsOverbookedInCSV,
+)
+from app.importer.converters import CSVRowConverter
+from app.inventory.capacity import check_capacity
+from app.inventory.dao import RoomInventoryDAO
+from app.logger import logger
+
+# Сколько строк читается из файла и отправляется в базу за один COPY
+CHUNK_SIZE = 10_000
+
+
+class CSVChunkReader:
+    """
+    Читает CSV файл порциями по chunk_size строк и преобразует строки в кортежи
+    значений в порядке колонок заголовка, как их ожидает COPY.
+    """
+
+    def __init__(self, file: BinaryIO, model, chunk_size: Optional[int] = None):
+        self.reader = csv.reader(codecs.iterdecode(file, "utf-8"), delimiter=";")
+        self.chunk_size = chunk_size or CHUNK_SIZE
+        columns = next(self.reader, [])
+        # Функции преобразования выбираются один раз по типам колонок модели
+        self.converter = CSVRowConverter(model, columns, for_copy=True)
+        self.columns: List[str] = self.converter.columns
+        # Номер следующей строки в файле (заголовок — строка 1)
+        self.line = 2
+
+    def skip(self, rows: int):
+        """Пропускает уже импортированные строки без преобразования."""
+        self.line += sum(1 for _ in islice(self.reader, rows))
+
+    def read_chunk(self) -> List[tuple]:
+        rows = list(islice(self.reader, self.chunk_size))
+        records = self.converter.convert_batch(rows, first_line=self.line)
+        self.line += len(rows)
+        return records
+
+
+async def copy_csv_to_table(
+    model,
+    file: BinaryIO,
+    atomic: bool = True,
+    skip_rows: int = 0,
+    on_chunk: Optional[Callable[[AsyncConnection, int], Awaitable[None]]] = None,
+    upsert_dao=None,
+) -> Dict[str, int]:
+    """
+    Потоково импортирует CSV файл в таблицу модели через COPY FROM STDIN порциями
+    по CHUNK_SIZE строк, не загружая файл в память целиком. Возвращает словарь
+    с числом строк файла, импортированных к концу работы (rows, включая skip_rows).
+
+    atomic=True — весь файл в одной транзакции (ошибка откатывает весь импорт),
+    atomic=False — каждая порция фиксируется отдельно (ошибка оставляет уже
+    импортированные порции).
+    skip_rows — сколько первых строк файла уже импортировано (продолжение импорта).
+    on_chunk(conn, imported) вызывается в транзакции каждой порции до ее фиксации.
+    upsert_dao — DAO с natural_key: строки загружаются через upsert (повторный импорт
+    не создает дубликатов), в результат добавляются счетчики inserted, updated и skipped.
+    Для бронирований в той же транзакции проверяется, хватает ли номеров на всю
+    порцию (с учетом уже занятых), и обновляется занятость номеров. Если номеров
+    не хватает, порция не импортируется, а RoomsOverbookedInCSV перечисляет строки файла.
+    """
+    try:
+        # Чтение и разбор файла выполняются в потоке, чтобы не блокировать event loop
+        reader = await run_in_threadpool(CSVChunkReader, file, model)
+        if upsert_dao is not None and not set(upsert_dao.natural_key) <= set(reader.columns):
+            # Без колонок естественного ключа нельзя найти существующие записи
+            raise CannotProcessCSV
+        if skip_rows:
+            await run_in_threadpool(reader.skip, skip_rows)
+    except (CannotProcessCSV, IncorrectCSVValue):
+        raise
+    except Exception:
+        logger.error("Cannot read CSV header", exc_info=True)
+        raise CannotProcessCSV
+
+    table = model.__tablename__
+    imported = skip_rows
+    counts = Counter()
+    # Период затронутых бронированиями дней, еще не сброшенный в кэше поиска
+    stays_span: Optional[Tuple[None, object, object]] = None
+
+    async with engine.connect() as conn:
+        driver_connection = (await conn.get_raw_connection()).driver_connection
+        while True:
+            try:
+                records = await run_in_threadpool(reader.read_chunk)
+            except IncorrectCSVValue as error:
+                logger.warning(
+                    "Incorrect value in CSV",
+                    extra={"table": table, "line": error.line, "column": error.column},
+                )
+                raise
+            except Exception:
+                logger.error(
+                    "Cannot convert CSV into DB format",
+                    extra={"table": table, "imported": imported},
+                    exc_info=True,
+                )
+                raise CannotProcessCSV
+            if not records:
+                break
+
+            try:
+                # Первый запрос начинает транзакцию, в которой затем выполняется COPY;
+                # таймаут снимаем, чтобы крупная порция не прервалась на сервере
+                await conn.execute(text("SET LOCAL statement_timeout = 0"))
+                if model is Bookings:
+                    stays = _stays(reader.columns, records)
+                    await _check_capacity(conn, stays, first_line=reader.line - len(records))
+                if upsert_dao is None:
+                    await driver_connection.copy_records_to_table(
+                        table, records=records, columns=reader.columns
+                    )
+                else:
+                    chunk_counts = await _upsert_chunk(
+                        conn, driver_connection, upsert_dao, reader.columns, records
+                    )
+                if model is Bookings:
+                    # Повторная проверка под блокировкой строк занятости: между
+                    # check_capacity и COPY номера могли занять параллельные бронирования
+                    if await RoomInventoryDAO.change_occupancy(
+                        conn, stays, delta=1, return_overbooked=True
+                    ):
+                        raise RoomsOverbookedInCSV()
+                    stays_span = _merge_span(stays_span, stays)
+                if on_chunk is not None:
+                    await on_chunk(conn, imported + len(records))
+                if not atomic:
+                    await conn.commit()
+            except RoomsOverbookedInCSV as error:
+                logger.warning(
+                    "Rooms are overbooked by CSV",
+                    extra={"table": table, "lines": error.lines[:10], "imported": imported},
+                )
+                raise
+            except Exception:
+                logger.error(
+                    "Cannot copy CSV into table",
+                    extra={"table": table, "imported": skip_rows if atomic else imported},
+                    exc_info=True,
+                )
+                raise CannotAddDataToDatabase
+            imported += len(records)
+            if upsert_dao is not None:
+                counts.update(chunk_counts)
+
+            if not atomic and stays_span:
+                await invalidate_bookings([stays_span])
+                stays_span = None
+            if not atomic and model is Hotels:
+                await hotel_locations.invalidate()
+            if not atomic and model in (Hotels, Rooms):
+                await bump_versions([CATALOG])
+
+        await conn.commit()
+
+    if stays_span:
+        await invalidate_bookings([stays_span])
+    if atomic and model is Hotels and imported > skip_rows:
+        # Новые местоположения появятся в подсказках поиска
+        await hotel_locations.invalidate()
+    if atomic and model in (Hotels, Rooms) and imported > skip_rows:
+        # Изменились данные отелей и номеров: меняем их ETag
+        await bump_versions([CATALOG])
+    if upsert_dao is not None:
+        return {"rows": imported, "inserted": 0, "updated": 0, "skipped": 0, **counts}
+    return {"rows": imported}
+
+
+async def _upsert_chunk(conn: AsyncConnection, driver_connection, dao, columns, records):
+    # COPY не поддерживает ON CONFLICT: порция загружается во временную таблицу
+    # и переносится в основную одним INSERT ... SELECT ... ON CONFLICT
+    column_list = ", ".join(columns)  # Имена колонок уже проверены по модели
+    await conn.execute(text("DROP TABLE IF EXISTS pg_temp.import_chunk"))
+    await conn.execute(text(
+        f"CREATE TEMP TABLE import_chunk ON COMMIT DROP AS "
+        f"SELECT {column_list} FROM {dao.model.__tablename__} WITH NO DATA"
+    ))
+    await driver_connection.copy_records_to_table(
+        "import_chunk", records=records, columns=columns
+    )
+    chunk = table_clause("import_chunk", *(column(name) for name in columns))
+    key = [chunk.c[name] for name in dao.natural_key]
+    # Из повторяющихся в порции ключей берется последняя строка файла
+    source = select(*chunk.c).distinct(*key).order_by(*key, literal_column("ctid").desc())
+    result = await conn.execute(dao.upsert_query(columns).from_select(columns, source))
+    return dao.upsert_counts(result, len(records))
+
+
+def _stays(columns: List[str], records: List[tuple]):
+    room_id, date_from, date_to = (
+        columns.index("room_id"), columns.index("date_from"), columns.index("date_to")
+    )
+    return [(record[room_id], record[date_from], record[date_to]) for record in records]
+
+
+async def _check_capacity(conn: AsyncConnection, stays, first_line: int):
+    overbooked = await check_capacity(conn, stays)
+    if overbooked:
+        raise RoomsOverbookedInCSV([first_line + index for index in overbooked])
+
+
+def _merge_span(span, stays):
+    # Сбрасываем кэш поиска одним периодом от самого раннего заезда до самого позднего выезда
+    date_from = min(stay[1] for stay in stays)
+    date_to = max(stay[2] for stay in stays)
+    if span is not None:
+        date_from, date_to = min(span[1], date_from), max(span[2], date_to)
+    return None, date_from, date_to
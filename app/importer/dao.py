@@ -0,0 +1,83 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import RowMapping, func, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.dao.base import BaseDAO
+from app.dao.session import get_session
+from app.database import engine
+from app.importer.models import ImportJobs
+
+# Первый ключ рекомендательной блокировки задачи импорта (второй — id задачи),
+# чтобы не пересекаться с другими блокировками по числовым id
+IMPORT_JOB_LOCK_CLASS = 7001
+
+
+class ImportJobDAO(BaseDAO):
+    """
+    Data Access Object для фоновых задач импорта CSV (import_jobs).
+    """
+
+    model = ImportJobs
+
+    @classmethod
+    @asynccontextmanager
+    async def claim(cls, job_id: int) -> AsyncIterator[Optional[RowMapping]]:
+        """
+        Захватывает задачу на время блока async with и переводит ее в статус running.
+        Задача, прерванная вместе с воркером, запускается повторно и продолжает
+        с rows_processed. Выдает None, если задача завершена или отсутствует либо ее
+        уже выполняет другой воркер (например, при повторной доставке сообщения Celery).
+
+        Захват — рекомендательная блокировка PostgreSQL в транзакции отдельного соединения:
+        она снимается по выходе из блока или при разрыве соединения, если воркер упал,
+        и работает через pgbouncer в режиме transaction.
+        """
+        async with engine.connect() as lock_conn, lock_conn.begin():
+            locked = await lock_conn.scalar(
+                select(func.pg_try_advisory_xact_lock(IMPORT_JOB_LOCK_CLASS, job_id))
+            )
+            yield await cls._start(job_id) if locked else None
+
+    @classmethod
+    async def _start(cls, job_id: int) -> Optional[RowMapping]:
+        jobs = ImportJobs.__table__
+        query = (
+            update(jobs)
+            .where(jobs.c.id == job_id, jobs.c.status != "done")
+            .values(
+                status="running",
+                error=None,
+                started_at=func.coalesce(jobs.c.started_at, func.now()),
+                finished_at=None,
+            )
+            .returning(*jobs.columns)
+        )
+        async with get_session() as session:
+            result = await session.execute(query)
+            await session.commit()
+            return result.mappings().one_or_none()
+
+    @classmethod
+    async def finish(cls, job_id: int, status: str, error: str = None):
+        query = (
+            update(ImportJobs)
+            .where(ImportJobs.id == job_id)
+            .values(status=status, error=error, finished_at=func.now())
+        )
+        async with get_session() as session:
+            await session.execute(query)
+            await session.commit()
+
+    @staticmethod
+    async def set_progress(conn: AsyncConnection, job_id: int, rows_processed: int):
+        """
+        Сохраняет число импортированных строк в транзакции импорта порции:
+        прогресс фиксируется ровно вместе с данными.
+        """
+        await conn.execute(
+            update(ImportJobs)
+            .where(ImportJobs.id == job_id)
+            .values(rows_processed=rows_processed)
+        )
@@ -0,0 +1,79 @@
+import os
+import shutil
+from typing import BinaryIO
+from uuid import uuid4
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.importer.copy import copy_csv_to_table
+from app.importer.dao import ImportJobDAO
+from app.importer.utils import TABLE_MODEL_MAP
+from app.logger import logger
+
+
+def _spool(file: BinaryIO) -> str:
+    os.makedirs(settings.IMPORT_SPOOL_DIR, exist_ok=True)
+    path = os.path.join(settings.IMPORT_SPOOL_DIR, f"{uuid4().hex}.csv")
+    with open(path, "wb") as spooled:
+        shutil.copyfileobj(file, spooled, length=1024 * 1024)
+    return path
+
+
+async def spool_upload(file: BinaryIO) -> str:
+    """
+    Сохраняет загруженный файл в IMPORT_SPOOL_DIR (каталог, общий для приложения
+    и воркеров Celery) и возвращает путь к нему.
+    """
+    return await run_in_threadpool(_spool, file)
+
+
+async def run_import_job(job_id: int):
+    """
+    Выполняет задачу импорта: читает сохраненный файл с первой незафиксированной
+    строки и фиксирует каждую порцию вместе с прогрессом задачи.
+    Файл удаляется после успешного импорта; после ошибки он остается для повторного запуска.
+    Задача выполняется не более чем одним воркером одновременно.
+    """
+    async with ImportJobDAO.claim(job_id) as job:
+        if job is None:
+            logger.warning(
+                "Import job is already done, missing or running in another worker",
+                extra={"job_id": job_id},
+            )
+            return
+        await _import(job)
+
+
+async def _import(job):
+    job_id = job["id"]
+    model = TABLE_MODEL_MAP[job["table_name"]].model
+
+    async def save_progress(conn, imported: int):
+        await ImportJobDAO.set_progress(conn, job_id, imported)
+
+    try:
+        with open(job["file_path"], "rb") as file:
+            result = await copy_csv_to_table(
+                model,
+                file,
+                atomic=False,
+                skip_rows=job["rows_processed"],
+                on_chunk=save_progress,
+            )
+    except HTTPException as error:
+        # Ошибки данных (CannotProcessCSV, IncorrectCSVValue и т.д.) сохраняются в задаче
+        await ImportJobDAO.finish(job_id, "failed", error=error.detail)
+        return
+    except Exception as error:
+        logger.error("Import job failed", extra={"job_id": job_id}, exc_info=True)
+        await ImportJobDAO.finish(job_id, "failed", error=str(error) or type(error).__name__)
+        return
+
+    await ImportJobDAO.finish(job_id, "done")
+    logger.info("Import job is done", extra={"job_id": job_id, "rows": result["rows"]})
+    try:
+        os.remove(job["file_path"])
+    except OSError:
+        logger.warning("Cannot remove import file", extra={"job_id": job_id}, exc_info=True)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
+
+from app.database import Base
+
+
+class ImportJobs(Base):
+    """
+    Фоновый импорт CSV файла. Файл сохраняется на диск, импорт выполняет задача Celery,
+    фиксируя каждую порцию строк вместе с rows_processed, поэтому прерванный импорт
+    продолжается с первой незафиксированной строки.
+    """
+
+    __tablename__ = "import_jobs"  # Название таблицы в базе данных
+
+    id = Column(Integer, primary_key=True)  # Уникальный идентификатор задачи
+    user_id = Column(ForeignKey("users.id"), nullable=False)  # Пользователь, загрузивший файл
+    table_name = Column(String, nullable=False)  # Таблица, в которую импортируются данные
+    file_path = Column(String, nullable=False)  # Путь к сохраненному файлу
+    status = Column(String, nullable=False, default="queued")  # queued, running, done, failed
+    rows_processed = Column(Integer, nullable=False, default=0)  # Зафиксированные строки файла
+    error = Column(String)  # Описание ошибки для статуса failed
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at = Column(DateTime(timezone=True))  # Начало первого запуска
+    finished_at = Column(DateTime(timezone=True))  # Завершение (успешное или с ошибкой)
+
+    def __str__(self):
+        return f"Импорт #{self.id} в {self.table_name}"
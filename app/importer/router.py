@@ -1,12 +1,23 @@
-import codecs
-import csv
-from typing import Literal
+import os
+from typing import Dict, Literal
 
 from fastapi import APIRouter, Depends, UploadFile
 
-from app.exceptions import CannotAddDataToDatabase, CannotProcessCSV
-from app.importer.utils import TABLE_MODEL_MAP, convert_csv_to_postgres_format
+from app.exceptions import (
+    CannotAddDataToDatabase,
+    CannotProcessCSV,
+    ImportJobCannotBeResumed,
+    ImportJobNotFound,
+    UpsertIsNotSupported,
+)
+from app.importer.copy import copy_csv_to_table
+from app.importer.dao import ImportJobDAO
+from app.importer.jobs import spool_upload
+from app.importer.schemas import SImportJob
+from app.importer.utils import TABLE_MODEL_MAP
+from app.tasks.tasks import import_csv
 from app.users.dependencies import get_current_user
+from app.users.schemas import SUser
 
 # Создание экземпляра маршрутизатора FastAPI с префиксом "/import" и тегом "Импорт данных в БД"
 router = APIRouter(
@@ -23,25 +34,68 @@ router = APIRouter(
 async def import_data_to_table(
         file: UploadFile,  # Файл, который будет загружен
         table_name: Literal["hotels", "rooms", "bookings"],  # Название таблицы для импорта данных
-):
+        atomic: bool = True,  # Весь файл в одной транзакции или каждая порция строк отдельно
+        upsert: bool = False,  # Обновлять существующие записи по естественному ключу вместо вставки
+) -> Dict[str, int]:
     ModelDAO = TABLE_MODEL_MAP[table_name]  # Получение соответствующего DAO для указанной таблицы
+    if upsert and ModelDAO.natural_key is None:
+        raise UpsertIsNotSupported  # У бронирований нет естественного ключа
 
-    # Декодирование загружаемого CSV файла и создание словаря для чтения данных
+    # Файл читается и записывается в базу порциями через COPY, не загружаясь в память целиком.
     # Внутри переменной file хранятся атрибуты:
     # file - сам файл, filename - название файла, size - размер файла.
-    csvReader = csv.DictReader(codecs.iterdecode(file.file, 'utf-8'), delimiter=";")
+    try:
+        result = await copy_csv_to_table(
+            ModelDAO.model, file.file, atomic=atomic, upsert_dao=ModelDAO if upsert else None
+        )
+    finally:
+        file.file.close()  # Закрытие файла после чтения
+
+    rows = result.pop("rows")
+    if not rows:
+        raise CannotProcessCSV  # Исключение, если в файле не оказалось данных
+
+    # Количество импортированных строк по таблицам,
+    # в режиме upsert также inserted, updated и skipped
+    return {table_name: rows, **result}
 
-    # Преобразование данных из формата CSV в формат, подходящий для PostgreSQL
-    data = convert_csv_to_postgres_format(csvReader)
 
-    # Закрытие файла после чтения
-    file.file.close()
+@router.post("/{table_name}/jobs", status_code=202)
+async def create_import_job(
+        file: UploadFile,  # Файл, который будет загружен
+        table_name: Literal["hotels", "rooms", "bookings"],  # Название таблицы для импорта данных
+        user: SUser = Depends(get_current_user),
+) -> SImportJob:
+    # Большие файлы импортируются в фоне: файл сохраняется на диск,
+    # а импорт выполняет задача Celery. Прогресс доступен по GET /import/jobs/{job_id}
+    try:
+        file_path = await spool_upload(file.file)
+    finally:
+        file.file.close()
+    job = await ImportJobDAO.add(user_id=user.id, table_name=table_name, file_path=file_path)
+    if not job:
+        os.remove(file_path)
+        raise CannotAddDataToDatabase
+    import_csv.delay(job["id"])
+    return await ImportJobDAO.find_one_or_none(id=job["id"])
+
 
-    if not data:
-        raise CannotProcessCSV  # Исключение, если данные не были обработаны
+@router.get("/jobs/{job_id}")
+async def get_import_job(job_id: int, user: SUser = Depends(get_current_user)) -> SImportJob:
+    job = await ImportJobDAO.find_one_or_none(id=job_id, user_id=user.id)
+    if not job:
+        raise ImportJobNotFound
+    return job
 
-    # Пакетное добавление данных в базу данных через DAO
-    added_data = await ModelDAO.add_bulk(data)
 
-    if not added_data:
-        raise CannotAddDataToDatabase  # Исключение, если добавление данных в БД не удалось
+@router.post("/jobs/{job_id}/resume", status_code=202)
+async def resume_import_job(job_id: int, user: SUser = Depends(get_current_user)) -> SImportJob:
+    # Задача, завершившаяся ошибкой (например, недоступна база), продолжается
+    # с первой незафиксированной строки того же файла
+    job = await ImportJobDAO.find_one_or_none(id=job_id, user_id=user.id)
+    if not job:
+        raise ImportJobNotFound
+    if job["status"] != "failed":
+        raise ImportJobCannotBeResumed
+    import_csv.delay(job_id)
+    return job
@@ -0,0 +1,29 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from pydantic import BaseModel, validator
+
+
+class SImportJob(BaseModel):
+    id: int  # Идентификатор задачи импорта
+    table_name: str  # Таблица, в которую импортируются данные
+    status: str  # queued, running, done или failed
+    rows_processed: int  # Импортированные (зафиксированные) строки файла
+    error: Optional[str]  # Описание ошибки для статуса failed
+    created_at: datetime  # Время загрузки файла
+    started_at: Optional[datetime]  # Начало импорта
+    finished_at: Optional[datetime]  # Завершение импорта
+    rows_per_second: Optional[float]  # Средняя скорость импорта
+
+    @validator("rows_per_second", always=True)
+    def count_rows_per_second(cls, value, values):
+        started_at = values.get("started_at")
+        if started_at is None:
+            return None
+        # Для незавершенной задачи скорость считается на текущий момент
+        finished_at = values.get("finished_at") or datetime.now(timezone.utc)
+        elapsed = (finished_at - started_at).total_seconds()
+        return round(values["rows_processed"] / elapsed, 1) if elapsed > 0 else None
+
+    class Config:
+        orm_mode = True  # Включение режима совместимости с ORM для Pydantic
@@ -0,0 +1,119 @@
+from datetime import date
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Integer, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.hotels.rooms.models import Rooms
+from app.inventory.models import RoomInventoryDaily
+
+
+def _days(dates: Sequence[date]) -> np.ndarray:
+    return np.array(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def find_overbooked(
+    room_ids: np.ndarray,
+    days_from: np.ndarray,
+    days_to: np.ndarray,
+    occupancy: np.ndarray,
+    quantities: np.ndarray,
+) -> np.ndarray:
+    """
+    Возвращает индексы бронирований (room_id, [day_from, day_to)), которые вместе
+    с уже занятыми номерами превышают их количество хотя бы в один из своих дней.
+
+    Дни передаются целыми числами, occupancy — массив строк (room_id, day, booked),
+    quantities — массив строк (room_id, quantity).
+    Проверка выполняется одной развёрткой (sweep line) по всем номерам сразу:
+    каждое бронирование дает событие +1 в день заезда и -1 в день выезда,
+    каждая строка занятости — +booked в свой день и -booked на следующий.
+    Накопленная сумма событий, упорядоченных по (номер, день), равна занятости
+    номера от дня события до следующего события.
+    """
+    # Бронирования без ночей не занимают номер (как и в change_occupancy)
+    valid = np.flatnonzero(days_to > days_from)
+    if not len(valid):
+        return valid
+    room_ids, days_from, days_to = room_ids[valid], days_from[valid], days_to[valid]
+    booked_rooms, booked_days, booked = occupancy.T
+
+    first_day = min(days_from.min(), booked_days.min(initial=days_from.min()))
+    last_day = max(days_to.max(), booked_days.max(initial=days_to.max() - 1) + 1)
+    # Ключ события: номер и день в одном int64, чтобы сортировать один массив
+    span = last_day - first_day + 1
+
+    def keys(rooms: np.ndarray, days: np.ndarray) -> np.ndarray:
+        return rooms * span + (days - first_day)
+
+    starts, ends = keys(room_ids, days_from), keys(room_ids, days_to)
+    ones = np.ones(len(room_ids), dtype=np.int64)
+    event_keys = np.concatenate([
+        starts, ends, keys(booked_rooms, booked_days), keys(booked_rooms, booked_days + 1),
+    ])
+    deltas = np.concatenate([ones, -ones, booked, -booked])
+
+    # Суммируем события в одной точке и накапливаем: события каждого номера
+    # в сумме дают 0, поэтому общая накопленная сумма не переходит между номерами
+    points, inverse = np.unique(event_keys, return_inverse=True)
+    levels = np.cumsum(np.bincount(inverse.ravel(), weights=deltas)).round().astype(np.int64)
+
+    # Количество номеров в каждой точке; у номеров, которых нет в quantities, — 0
+    point_rooms = points // span
+    capacity = np.zeros(len(points), dtype=np.int64)
+    if len(quantities):
+        quantities = quantities[np.argsort(quantities[:, 0])]
+        position = np.minimum(np.searchsorted(quantities[:, 0], point_rooms), len(quantities) - 1)
+        found = quantities[position, 0] == point_rooms
+        capacity[found] = quantities[position[found], 1]
+    overbooked = levels > capacity
+
+    # Бронирование нарушает ограничение, если среди точек [заезд, выезд) есть превышение
+    overbooked_before = np.concatenate([[0], np.cumsum(overbooked)])
+    first, last = np.searchsorted(points, starts), np.searchsorted(points, ends)
+    return valid[overbooked_before[last] - overbooked_before[first] > 0]
+
+
+async def check_capacity(
+    conn: AsyncConnection, stays: List[Tuple[int, date, date]]
+) -> List[int]:
+    """
+    Проверяет, хватает ли номеров для порции бронирований (room_id, date_from, date_to)
+    с учетом занятости в room_inventory_daily. Возвращает индексы нарушающих бронирований.
+    """
+    if not stays:
+        return []
+    room_ids, dates_from, dates_to = zip(*stays)
+    rooms = np.array(room_ids, dtype=np.int64)
+    days_from, days_to = _days(dates_from), _days(dates_to)
+    unique_rooms = np.unique(rooms).tolist()
+    rooms_param = bindparam("room_ids", unique_rooms, type_=ARRAY(Integer))
+
+    quantities = (await conn.execute(
+        select(Rooms.id, Rooms.quantity).where(Rooms.id == rooms_param.any_())
+    )).all()
+    occupancy = (await conn.execute(
+        select(RoomInventoryDaily.room_id, RoomInventoryDaily.day, RoomInventoryDaily.booked)
+        .where(
+            RoomInventoryDaily.room_id == rooms_param.any_(),
+            RoomInventoryDaily.day >= min(dates_from),
+            RoomInventoryDaily.day < max(dates_to),
+            RoomInventoryDaily.booked > 0,
+        )
+    )).all()
+
+    occupancy_array = np.empty((len(occupancy), 3), dtype=np.int64)
+    if occupancy:
+        occupied_rooms, occupied_days, booked = zip(*occupancy)
+        occupancy_array[:, 0] = occupied_rooms
+        occupancy_array[:, 1] = _days(occupied_days)
+        occupancy_array[:, 2] = booked
+    quantities_array = np.array(quantities, dtype=np.int64).reshape(-1, 2)
+    # Бронирования несуществующих номеров не проверяем: их отклонит внешний ключ
+    known = np.flatnonzero(np.isin(rooms, quantities_array[:, 0]))
+    overbooked = find_overbooked(
+        rooms[known], days_from[known], days_to[known], occupancy_array, quantities_array
+    )
+    return known[overbooked].tolist()
@@ -0,0 +1,52 @@
+"""
+Проверка согласованности room_inventory_daily с таблицей bookings.
+
+Запуск:
+    python -m app.inventory.check          # только вывести расхождения
+    python -m app.inventory.check --fix    # пересобрать таблицу занятости
+    python -m app.inventory.check --date-from 2023-06-01 --date-to 2023-07-01
+                                           # проверить только указанный период
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date
+
+from app.bookings.models import Bookings  # noqa
+from app.hotels.models import Hotels  # noqa
+from app.hotels.rooms.models import Rooms  # noqa
+from app.inventory.dao import RoomInventoryDAO
+from app.users.models import Users  # noqa
+
+
+async def check(fix: bool = False, date_from: date = None, date_to: date = None) -> int:
+    mismatches = await RoomInventoryDAO.find_mismatches(date_from, date_to)
+    for row in mismatches:
+        print(
+            f"room_id={row['room_id']} day={row['day']} "
+            f"expected={row['expected']} actual={row['actual']}"
+        )
+    print(f"Найдено расхождений: {len(mismatches)}")
+
+    if mismatches and fix:
+        await RoomInventoryDAO.rebuild(date_from, date_to)
+        print("Таблица room_inventory_daily пересобрана")
+        return 0
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--fix", action="store_true", help="Пересобрать занятость по таблице bookings"
+    )
+    parser.add_argument(
+        "--date-from", type=date.fromisoformat, help="Начало периода (включительно)"
+    )
+    parser.add_argument(
+        "--date-to", type=date.fromisoformat, help="Конец периода (не включительно)"
+    )
+    args = parser.parse_args()
+    if (args.date_from is None) != (args.date_to is None):
+        parser.error("--date-from и --date-to задаются вместе")
+    sys.exit(asyncio.run(check(args.fix, args.date_from, args.date_to)))
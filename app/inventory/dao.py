@@ -0,0 +1,264 @@
+from datetime import date, timedelta
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import (
+    Date,
+    Integer,
+    bindparam,
+    cast,
+    delete,
+    func,
+    literal,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, DATERANGE, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bookings.models import Bookings
+from app.dao.base import BaseDAO
+from app.dao.session import get_session
+from app.hotels.rooms.models import Rooms
+from app.inventory.models import RoomInventoryDaily
+
+
+class RoomInventoryDAO(BaseDAO):
+    """
+    Data Access Object для посуточной занятости номеров (room_inventory_daily).
+    """
+
+    model = RoomInventoryDaily
+
+    @staticmethod
+    def stay_days(date_from: date, date_to: date) -> Tuple[date, date]:
+        """
+        Возвращает первый и последний день проживания для запрошенного периода.
+        День выезда не занимает номер, но для нулевой длительности проверяем день заезда.
+        """
+        return date_from, max(date_from, date_to - timedelta(days=1))
+
+    @classmethod
+    def booked_rooms(cls, date_from: date, date_to: date):
+        """
+        Запрос максимального количества занятых номеров каждого типа за указанные дни.
+        Используется вместо пересчета пересечений по всей таблице bookings.
+        """
+        first_day, last_day = cls.stay_days(date_from, date_to)
+        return (
+            select(
+                RoomInventoryDaily.room_id,
+                func.max(RoomInventoryDaily.booked).label("rooms_booked"),
+            )
+            .where(RoomInventoryDaily.day.between(first_day, last_day))
+            .group_by(RoomInventoryDaily.room_id)
+        )
+
+    @staticmethod
+    def _occupancy(stays, date_from: date = None, date_to: date = None):
+        """
+        Раскладывает периоды бронирований (подзапрос с колонками room_id, date_from, date_to)
+        на дни и считает занятость по (room_id, day), при необходимости только за период
+        [date_from, date_to).
+        """
+        days = (
+            select(
+                stays.c.room_id,
+                (
+                    stays.c.date_from
+                    + func.generate_series(
+                        0, stays.c.date_to - stays.c.date_from - 1, type_=Integer
+                    )
+                ).label("day"),
+            )
+            .where(stays.c.room_id.isnot(None))
+            .subquery("days")
+        )
+        query = select(
+            days.c.room_id,
+            days.c.day,
+            func.count().label("booked"),
+        ).group_by(days.c.room_id, days.c.day)
+        if date_from is not None:
+            query = query.where(days.c.day >= date_from, days.c.day < date_to)
+        return query
+
+    @classmethod
+    async def change_occupancy(
+        cls,
+        session: AsyncSession,
+        stays: Iterable[Tuple[int, date, date]],
+        delta: int,
+        return_overbooked: bool = False,
+    ) -> List[Tuple[int, date]]:
+        """
+        Увеличивает (delta=1) или уменьшает (delta=-1) занятость номеров для переданных
+        бронирований (room_id, date_from, date_to) в рамках транзакции вызывающего кода.
+
+        С return_overbooked=True возвращает дни (room_id, day), в которые занятость
+        после изменения превысила количество номеров. Проверяются значения, записанные
+        этим же запросом под блокировкой строк, поэтому учитываются и конкурирующие
+        бронирования, зафиксированные до него.
+        """
+        stays = list(stays)
+        if not stays:
+            return []
+        room_ids, dates_from, dates_to = zip(*stays)
+
+        # Передаем бронирования массивами, чтобы обойтись одним запросом для любого их числа.
+        unnested = select(
+            func.unnest(
+                cast(bindparam("room_ids", list(room_ids)), ARRAY(Integer)),
+                type_=Integer,
+            ).label("room_id"),
+            func.unnest(
+                cast(bindparam("dates_from", list(dates_from)), ARRAY(Date)),
+                type_=Date,
+            ).label("date_from"),
+            func.unnest(
+                cast(bindparam("dates_to", list(dates_to)), ARRAY(Date)),
+                type_=Date,
+            ).label("date_to"),
+        ).subquery("stays")
+
+        occupancy = cls._occupancy(unnested).subquery("occupancy")
+
+        query = insert(RoomInventoryDaily).from_select(
+            ["room_id", "day", "booked"],
+            select(occupancy.c.room_id, occupancy.c.day, occupancy.c.booked * delta),
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[RoomInventoryDaily.room_id, RoomInventoryDaily.day],
+            set_={"booked": RoomInventoryDaily.booked + query.excluded.booked},
+        )
+        if not return_overbooked:
+            await session.execute(query)
+            return []
+
+        changed = query.returning(
+            RoomInventoryDaily.room_id, RoomInventoryDaily.day, RoomInventoryDaily.booked
+        ).cte("changed")
+        overbooked = (
+            select(changed.c.room_id, changed.c.day)
+            .join(Rooms, Rooms.id == changed.c.room_id)
+            .where(changed.c.booked > Rooms.quantity)
+        )
+        return [tuple(row) for row in await session.execute(overbooked)]
+
+    @classmethod
+    def reserve_days(cls, room_id, date_from, date_to):
+        """
+        CTE, который занимает по одному номеру на каждую ночь проживания и возвращает
+        занятые дни. День, на который свободных номеров нет, не обновляется и не возвращается.
+        Аргументы — значения или SQL-выражения (например, bindparam), даты приводятся к DATE.
+
+        ON CONFLICT DO UPDATE блокирует строку дня и проверяет условие на последней
+        подтвержденной версии, поэтому конкурирующие бронирования не превышают rooms.quantity.
+        Если уже по снимку базы хотя бы один день занят полностью, строки не вставляются
+        и не блокируются: заведомо неудачное бронирование не задерживает остальные
+        до отката своей транзакции (ON CONFLICT блокирует строку, даже если условие ложно).
+        """
+        date_from, date_to = cast(date_from, Date), cast(date_to, Date)
+        full_day = select(RoomInventoryDaily.day).where(
+            RoomInventoryDaily.room_id == room_id,
+            RoomInventoryDaily.day >= date_from,
+            RoomInventoryDaily.day < date_to,
+            RoomInventoryDaily.booked >= Rooms.quantity,
+        )
+        days = select(
+            Rooms.id,
+            (
+                date_from
+                + func.generate_series(0, date_to - date_from - 1, type_=Integer)
+            ).label("day"),
+            literal(1),
+        ).where(Rooms.id == room_id, Rooms.quantity > 0, ~full_day.exists())
+
+        query = insert(RoomInventoryDaily).from_select(
+            ["room_id", "day", "booked"], days
+        )
+        quantity = select(Rooms.quantity).where(Rooms.id == room_id).scalar_subquery()
+        query = query.on_conflict_do_update(
+            index_elements=[RoomInventoryDaily.room_id, RoomInventoryDaily.day],
+            set_={"booked": RoomInventoryDaily.booked + 1},
+            where=RoomInventoryDaily.booked < quantity,
+        )
+        return query.returning(RoomInventoryDaily.day).cte("reserved_days")
+
+    @classmethod
+    def expected_occupancy(cls, date_from: date = None, date_to: date = None):
+        """
+        Занятость номеров, вычисленная напрямую по таблице bookings.
+        Если задан период, бронирования отбираются оператором && по колонке stay,
+        что позволяет использовать GiST индекс вместо полного сканирования.
+        """
+        stays = select(Bookings.room_id, Bookings.date_from, Bookings.date_to)
+        if date_from is not None:
+            stays = stays.where(
+                Bookings.stay.overlaps(
+                    func.daterange(
+                        cast(date_from, Date), cast(date_to, Date), type_=DATERANGE
+                    )
+                )
+            )
+        return cls._occupancy(stays.subquery("stays"), date_from, date_to)
+
+    @classmethod
+    def _actual_occupancy(cls, date_from: date = None, date_to: date = None):
+        query = select(RoomInventoryDaily)
+        if date_from is not None:
+            query = query.where(
+                RoomInventoryDaily.day >= date_from, RoomInventoryDaily.day < date_to
+            )
+        return query
+
+    @classmethod
+    async def rebuild(cls, date_from: date = None, date_to: date = None):
+        """
+        Пересобирает room_inventory_daily по таблице bookings: полностью
+        или только за период [date_from, date_to).
+        """
+        stale = delete(RoomInventoryDaily)
+        if date_from is not None:
+            stale = stale.where(
+                RoomInventoryDaily.day >= date_from, RoomInventoryDaily.day < date_to
+            )
+        async with get_session() as session:
+            await session.execute(stale)
+            await session.execute(
+                insert(RoomInventoryDaily).from_select(
+                    ["room_id", "day", "booked"],
+                    cls.expected_occupancy(date_from, date_to),
+                )
+            )
+            await session.commit()
+
+    @classmethod
+    async def find_mismatches(cls, date_from: date = None, date_to: date = None):
+        """
+        Сравнивает room_inventory_daily с таблицей bookings (полностью или за период
+        [date_from, date_to)) и возвращает расхождения.
+        """
+        expected = cls.expected_occupancy(date_from, date_to).subquery("expected")
+        actual = cls._actual_occupancy(date_from, date_to)
+        actual = actual.where(RoomInventoryDaily.booked != 0).subquery("actual")
+        query = (
+            select(
+                func.coalesce(expected.c.room_id, actual.c.room_id).label("room_id"),
+                func.coalesce(expected.c.day, actual.c.day).label("day"),
+                func.coalesce(expected.c.booked, 0).label("expected"),
+                func.coalesce(actual.c.booked, 0).label("actual"),
+            )
+            .select_from(expected)
+            .join(
+                actual,
+                (actual.c.room_id == expected.c.room_id)
+                & (actual.c.day == expected.c.day),
+                full=True,
+            )
+            .where(
+                func.coalesce(expected.c.booked, 0) != func.coalesce(actual.c.booked, 0)
+            )
+            .order_by("room_id", "day")
+        )
+        async with get_session() as session:
+            result = await session.execute(query)
+            return result.mappings().all()
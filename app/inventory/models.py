@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer
+
+from app.database import Base
+
+
+class RoomInventoryDaily(Base):
+    """
+    Посуточная занятость номеров: сколько номеров данного типа занято в каждый день.
+    Поддерживается в той же транзакции, что и вставка/удаление бронирований,
+    поэтому проверка свободных номеров не требует сканирования таблицы bookings.
+    """
+
+    __tablename__ = "room_inventory_daily"  # Название таблицы в базе данных
+
+    # Идентификатор номера. Занятость удаленного номера удаляется вместе с ним
+    # (в том числе нулевые строки, остающиеся после отмены бронирований)
+    room_id = Column(ForeignKey("rooms.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)  # День проживания (ночь с day на day + 1)
+    booked = Column(Integer, nullable=False, default=0)  # Количество забронированных номеров
+
+    def __str__(self):
+        return f"Занятость номера #{self.room_id} на {self.day}"
@@ -1,3 +1,4 @@
+import asyncio  # Импортируем asyncio для фоновой задачи сброса кэша
 import time  # Импортируем модуль time для измерения времени обработки запросов
 
 import sentry_sdk  # Импортируем Sentry SDK для мониторинга и отслеживания ошибок
@@ -15,14 +16,21 @@ from sqladmin import Admin  # Импортируем административ
 from app.admin.auth import authentication_backend
 from app.admin.views import BookingsAdmin, HotelsAdmin, RoomsAdmin, UsersAdmin
 from app.bookings.router import router as router_bookings
+from app.cache.invalidation import listen_invalidations
+from app.cache.search import hotels_search_cache
+from app.cache.suggest import hotel_locations
+from app.compression import CompressionMiddleware
 from app.config import settings
+from app.dao.session import DBSessionMiddleware
 from app.database import engine
+from app.exporter.router import router as router_export
 from app.hotels.router import router as router_hotels
 from app.images.router import router as router_images
 from app.importer.router import router as router_import
 from app.logger import logger
 from app.pages.router import router as router_pages
 from app.prometheus.router import router as router_prometheus
+from app.users.cache import users_cache
 from app.users.router import router_auth, router_users
 
 # Создаем экземпляр приложения FastAPI
@@ -50,6 +58,7 @@ app.include_router(router_bookings)  # Роутер для управления
 app.include_router(router_images)  # Роутер для работы с изображениями
 app.include_router(router_prometheus)  # Роутер для метрик Prometheus
 app.include_router(router_import)  # Роутер для импорта данных
+app.include_router(router_export)  # Роутер для экспорта данных
 
 # Конфигурация CORS, чтобы разрешить запросы из браузера
 origins = [
@@ -87,6 +96,17 @@ def startup():
     redis = aioredis.from_url(f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}", encoding="utf8", decode_responses=True)
     FastAPICache.init(RedisBackend(redis), prefix="cache")  # Инициализация кэширования
 
+@app.on_event("startup")
+async def start_cache_invalidation_listener():
+    # Каждый воркер подписывается на сообщения о сброшенных записях кэшей
+    app.state.cache_invalidation_listener = asyncio.create_task(
+        listen_invalidations([hotels_search_cache, users_cache, hotel_locations])
+    )
+
+@app.on_event("shutdown")
+async def stop_cache_invalidation_listener():
+    app.state.cache_invalidation_listener.cancel()  # Останавливаем подписку при завершении воркера
+
 # Подключение эндпоинта для отображения метрик, собираемых Prometheus
 instrumentator = Instrumentator(
     should_group_status_codes=False,  # Не группируем статус-коды
@@ -115,4 +135,11 @@ async def add_process_time_header(request: Request, call_next):
     })
     return response  # Возвращаем ответ
 
+# Сжатие ответов (gzip или brotli по Accept-Encoding) для всех эндпоинтов и страниц
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# Одна сессия БД на запрос: зависимости и DAO используют одно соединение из пула.
+# Подключаем последним, чтобы middleware был внешним и сессия охватывала весь запрос.
+app.add_middleware(DBSessionMiddleware)
+
 # Примечание: конфигурация FastAPI происходит в одном файле, что может усложнить поддержку.
@@ -15,6 +15,8 @@ from app.hotels.models import Hotels  # noqa
 from app.hotels.rooms.models import Rooms  # noqa
 from app.bookings.models import Bookings  # noqa
 from app.users.models import Users  # noqa
+from app.inventory.models import RoomInventoryDaily  # noqa
+from app.importer.models import ImportJobs  # noqa
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
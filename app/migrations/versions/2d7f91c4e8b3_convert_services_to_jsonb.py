@@ -0,0 +1,45 @@
+"""Convert hotels and rooms services to jsonb
+
+Revision ID: 2d7f91c4e8b3
+Revises: e3a9d4b6f210
+Create Date: 2026-10-18 17:12:40.551902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '2d7f91c4e8b3'
+down_revision = 'e3a9d4b6f210'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Таблицы переписываются целиком (ALTER TYPE берет эксклюзивную блокировку)
+    for table in ('hotels', 'rooms'):
+        op.alter_column(
+            table,
+            'services',
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            postgresql_using='services::jsonb',
+        )
+    # Оператор по умолчанию jsonb_ops поддерживает и @> (все услуги), и ?| (любая из услуг)
+    op.create_index('ix_hotels_services', 'hotels', ['services'], postgresql_using='gin')
+    op.create_index('ix_rooms_services', 'rooms', ['services'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rooms_services', table_name='rooms')
+    op.drop_index('ix_hotels_services', table_name='hotels')
+    for table in ('hotels', 'rooms'):
+        op.alter_column(
+            table,
+            'services',
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            postgresql_using='services::json',
+        )
@@ -0,0 +1,27 @@
+"""Add bookings pagination indexes
+
+Revision ID: 5b2e8c0d7a41
+Revises: c1425a897c40
+Create Date: 2026-10-18 16:05:12.418305
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e8c0d7a41'
+down_revision = 'c1425a897c40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_bookings_user_id_date_from_id', 'bookings', ['user_id', 'date_from', 'id'])
+    op.create_index('ix_bookings_user_id_price_id', 'bookings', ['user_id', 'price', 'id'])
+    op.create_index('ix_bookings_user_id_id', 'bookings', ['user_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_user_id_id', table_name='bookings')
+    op.drop_index('ix_bookings_user_id_price_id', table_name='bookings')
+    op.drop_index('ix_bookings_user_id_date_from_id', table_name='bookings')
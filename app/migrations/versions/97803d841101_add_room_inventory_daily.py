@@ -0,0 +1,40 @@
+"""Add room_inventory_daily
+
+Revision ID: 97803d841101
+Revises: 9dfdefe4b317
+Create Date: 2026-10-18 10:12:41.512305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '97803d841101'
+down_revision = '9dfdefe4b317'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('room_inventory_daily',
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('booked', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('room_id', 'day')
+    )
+    # Заполняем занятость по уже существующим бронированиям
+    op.execute(
+        """
+        INSERT INTO room_inventory_daily (room_id, day, booked)
+        SELECT room_id, date_from + generate_series(0, date_to - date_from - 1), count(*)
+        FROM bookings
+        WHERE room_id IS NOT NULL
+        GROUP BY 1, 2
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('room_inventory_daily')
@@ -0,0 +1,27 @@
+"""Add hotels and rooms natural keys
+
+Revision ID: c1425a897c40
+Revises: 7f8143021c79
+Create Date: 2026-10-18 13:20:36.904187
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1425a897c40'
+down_revision = '7f8143021c79'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Если в базе уже есть дубликаты (например, после повторного импорта),
+    # миграция завершится ошибкой: их нужно удалить вручную до обновления
+    op.create_unique_constraint('uq_hotels_name_location', 'hotels', ['name', 'location'])
+    op.create_unique_constraint('uq_rooms_hotel_id_name', 'rooms', ['hotel_id', 'name'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_rooms_hotel_id_name', 'rooms', type_='unique')
+    op.drop_constraint('uq_hotels_name_location', 'hotels', type_='unique')
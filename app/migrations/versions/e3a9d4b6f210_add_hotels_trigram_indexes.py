@@ -0,0 +1,39 @@
+"""Add hotels trigram indexes
+
+Revision ID: e3a9d4b6f210
+Revises: 5b2e8c0d7a41
+Create Date: 2026-10-18 16:41:53.770214
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a9d4b6f210'
+down_revision = '5b2e8c0d7a41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Триграммный GIN индекс используется для ILIKE '%...%' (поиск по подстроке без учета регистра)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_hotels_location_trgm',
+        'hotels',
+        ['location'],
+        postgresql_using='gin',
+        postgresql_ops={'location': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_hotels_name_trgm',
+        'hotels',
+        ['name'],
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hotels_name_trgm', table_name='hotels')
+    op.drop_index('ix_hotels_location_trgm', table_name='hotels')
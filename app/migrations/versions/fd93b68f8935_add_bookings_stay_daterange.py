@@ -0,0 +1,39 @@
+"""Add bookings stay daterange with GiST index
+
+Revision ID: fd93b68f8935
+Revises: 97803d841101
+Create Date: 2026-10-18 11:03:27.904113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'fd93b68f8935'
+down_revision = '97803d841101'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # btree_gist нужен, чтобы включить целочисленный room_id в GiST индекс
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column('bookings', sa.Column(
+        'stay',
+        postgresql.DATERANGE(),
+        sa.Computed('daterange(date_from, date_to)', ),
+        nullable=True,
+    ))
+    op.create_index(
+        'ix_bookings_room_id_stay',
+        'bookings',
+        ['room_id', 'stay'],
+        postgresql_using='gist',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_room_id_stay', table_name='bookings')
+    op.drop_column('bookings', 'stay')
@@ -4,9 +4,9 @@ from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
-from app.bookings.router import add_booking, get_bookings
-from app.hotels.rooms.router import get_rooms_by_time
-from app.hotels.router import get_hotel_by_id, get_hotels_by_location_and_time
+from app.bookings.router import add_booking, find_bookings
+from app.hotels.rooms.router import search_rooms
+from app.hotels.router import get_hotel_by_id, search_hotels
 from app.utils import format_number_thousand_separator, get_month_days
 
 # Создание экземпляра APIRouter для управления маршрутами фронтенда
@@ -35,7 +35,7 @@ async def get_hotels_page(
     location: str,
     date_to: date,
     date_from: date,
-    hotels=Depends(get_hotels_by_location_and_time),  # Зависимость для получения отелей
+    hotels=Depends(search_hotels),  # Зависимость для получения отелей
 ):
     dates = get_month_days()  # Получаем дни месяца для отображения
     if date_from > date_to:  # Проверяем, чтобы дата заезда не была позже даты выезда
@@ -62,7 +62,7 @@ async def get_rooms_page(
     request: Request,
     date_from: date,
     date_to: date,
-    rooms=Depends(get_rooms_by_time),  # Зависимость для получения номеров
+    rooms=Depends(search_rooms),  # Зависимость для получения номеров
     hotel=Depends(get_hotel_by_id),  # Зависимость для получения информации об отеле
 ):
     date_from_formatted = date_from.strftime("%d.%m.%Y")  # Форматируем дату заезда
@@ -97,7 +97,7 @@ async def get_successful_booking_page(
 @router.get("/bookings", response_class=HTMLResponse)
 async def get_bookings_page(
     request: Request,
-    bookings=Depends(get_bookings),  # Зависимость для получения списка бронирований
+    bookings=Depends(find_bookings),  # Зависимость для получения списка бронирований
 ):
     return templates.TemplateResponse(
         "bookings/bookings.html",  # Шаблон для страницы бронирований
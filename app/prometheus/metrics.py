@@ -0,0 +1,58 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+# Метрики пула соединений с базой данных. Регистрируются в общем реестре
+# prometheus_client и отдаются на /metrics вместе с метриками Instrumentator.
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Время получения соединения из пула (ожидание свободного слота и подключение)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Количество соединений, выданных из пула",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Количество соединений сверх pool_size (отрицательное — незаполненные слоты пула)",
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Настроенный размер пула соединений",
+)
+
+# Метрики кэшей (поиск отелей и т.п.); метка cache — имя кэша
+
+CACHE_HITS = Counter(
+    "cache_hits_total",
+    "Попадания в кэш (tier: local — память процесса, redis — общий кэш)",
+    ["cache", "tier"],
+)
+CACHE_MISSES = Counter(
+    "cache_misses_total",
+    "Промахи кэша, после которых выполнялся запрос к базе",
+    ["cache"],
+)
+CACHE_STALE = Counter(
+    "cache_stale_total",
+    "Ответы устаревшими данными с обновлением записи в фоне",
+    ["cache"],
+)
+CACHE_COALESCED = Counter(
+    "cache_coalesced_total",
+    "Запросы, дождавшиеся уже выполняющейся загрузки той же записи",
+    ["cache"],
+)
+
+# Метрики хэширования паролей (bcrypt в пуле потоков)
+
+PASSWORD_HASH_QUEUE = Gauge(
+    "password_hash_queue_depth",
+    "Операции bcrypt, ожидающие свободного потока",
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Время операции bcrypt вместе с ожиданием в очереди",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
@@ -0,0 +1,84 @@
+from functools import lru_cache
+from typing import Any, Iterable, List, Mapping, Optional, Tuple, Type, Union
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
+
+from app.compression import weak_etag
+from app.config import settings
+
+
+class TrustedRowsSerializer:
+    """
+    Сериализатор строк, полученных нашими же запросами DAO: типы значений
+    уже соответствуют колонкам, поэтому вместо проверки каждой строки моделью
+    pydantic (orm_mode) из строки берутся только поля схемы ответа.
+    Для строк из непроверенных источников используйте обычный response_model.
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.fields: Tuple[str, ...] = tuple(
+            field.alias for field in schema.__fields__.values()
+        )
+
+    def many(self, rows: Iterable[Mapping[str, Any]]) -> List[dict]:
+        fields = self.fields
+        return [{name: row[name] for name in fields} for row in rows]
+
+
+@lru_cache(maxsize=None)
+def trusted_serializer(schema: Type[BaseModel]) -> TrustedRowsSerializer:
+    return TrustedRowsSerializer(schema)
+
+
+def fast_json(
+    rows: Iterable[Mapping[str, Any]],
+    schema: Type[BaseModel],
+    response: Response,
+) -> Union[Iterable[Mapping[str, Any]], ORJSONResponse]:
+    """
+    Ответ со списком строк DAO. При FAST_JSON_RESPONSES строки сериализуются
+    через orjson без проверки моделью schema (FastAPI не проверяет готовый Response),
+    иначе возвращаются как есть и проходят обычную проверку response_model.
+    response — объект ответа обработчика: его заголовки и код переносятся в готовый ответ.
+    """
+    if not settings.FAST_JSON_RESPONSES:
+        return rows
+    fast = ORJSONResponse(trusted_serializer(schema).many(rows))
+    if response.status_code is not None:
+        fast.status_code = response.status_code
+    fast.raw_headers.extend(response.raw_headers)
+    return fast
+
+
+def render_json(rows: Iterable[Mapping[str, Any]], schema: Type[BaseModel]) -> bytes:
+    """
+    Тело ответа со списком строк DAO — те же байты, что вернул бы fast_json
+    или обычная проверка response_model (при выключенном FAST_JSON_RESPONSES).
+    Используется для тел, которые готовятся заранее и хранятся в кэше.
+    """
+    if settings.FAST_JSON_RESPONSES:
+        return ORJSONResponse(trusted_serializer(schema).many(rows)).body
+    return JSONResponse(jsonable_encoder([schema.parse_obj(row) for row in rows])).body
+
+
+def encoded_json(body: bytes, encoding: Optional[str], response: Response) -> Response:
+    """
+    Ответ клиенту, принимающему сжатие, с готовым телом JSON в кодировке encoding
+    (None — тело слишком мало и не сжато). CompressionMiddleware не сжимает его повторно.
+    Заголовки и код ответа обработчика переносятся, как и в fast_json.
+    """
+    ready = Response(body, media_type="application/json")
+    if response.status_code is not None:
+        ready.status_code = response.status_code
+    ready.raw_headers.extend(response.raw_headers)
+    # Как и в CompressionMiddleware, ETag слабый для клиента, принимающего сжатие
+    if "etag" in ready.headers:
+        ready.headers["ETag"] = weak_etag(ready.headers["etag"])
+    if encoding is not None:
+        # Несжатое тело дополнит заголовком Vary сам CompressionMiddleware
+        ready.headers["Content-Encoding"] = encoding
+        ready.headers.add_vary_header("Accept-Encoding")
+    return ready
@@ -1,13 +1,37 @@
+import asyncio
 import smtplib
 from pathlib import Path
 from PIL import Image
 from pydantic import EmailStr
 
 from app.config import settings
+from app.importer.jobs import run_import_job
 from app.tasks.celery import celery
 from app.tasks.email_templates import create_booking_confirmation_template
 from app.logger import logger
 
+# Воркер не импортирует app.main, поэтому модели регистрируются здесь:
+# без них SQLAlchemy не настроит связи между моделями (например, Bookings.user)
+from app.hotels.models import Hotels  # noqa
+from app.hotels.rooms.models import Rooms  # noqa
+from app.bookings.models import Bookings  # noqa
+from app.users.models import Users  # noqa
+from app.inventory.models import RoomInventoryDaily  # noqa
+from app.importer.models import ImportJobs  # noqa
+
+
+# Event loop процесса воркера: пул соединений с БД и клиент Redis привязаны к циклу,
+# в котором созданы их соединения, поэтому все асинхронные задачи используют один цикл
+_loop = None
+
+
+def run_async(coro):
+    """Выполняет корутину в event loop процесса воркера Celery."""
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
 
 @celery.task
 def process_pic(
@@ -48,3 +72,13 @@ def send_booking_confirmation_email(
         logger.info(f"Successfully sent email message to {email_to}")
     except Exception as e:
         logger.error(f"Failed to send email to {email_to}: {str(e)}")
+
+
+# acks_late и reject_on_worker_lost возвращают задачу в очередь, если воркер убит во время
+# импорта: повторный запуск продолжит с последней зафиксированной порции
+@celery.task(acks_late=True, reject_on_worker_lost=True)
+def import_csv(job_id: int):
+    """
+    Фоновая задача импорта CSV файла, сохраненного на диск (см. app/importer/jobs.py).
+    """
+    run_async(run_import_job(job_id))
@@ -7,10 +7,12 @@ from httpx import AsyncClient
 from sqlalchemy import insert
 
 from app.bookings.models import Bookings
+from app.cache.search import hotels_search_cache
 from app.config import settings
 from app.database import Base, async_session_maker, engine
 from app.hotels.models import Hotels
 from app.hotels.rooms.models import Rooms
+from app.inventory.dao import RoomInventoryDAO
 from app.main import app as fastapi_app
 from app.users.models import Users
 
@@ -52,6 +54,11 @@ async def prepare_database():
 
         await session.commit()
 
+    # Бронирования добавлены напрямую, поэтому пересобираем посуточную занятость
+    await RoomInventoryDAO.rebuild()
+    # Сбрасываем результаты поиска, закэшированные в Redis предыдущими прогонами
+    await hotels_search_cache.clear()
+
 
 # Взято из документации к pytest-asyncio
 # Создаем новый event loop для прогона тестов
@@ -1,6 +1,10 @@
+from datetime import date
+
 import pytest
 from httpx import AsyncClient
 
+from app.bookings.dao import BookingDAO
+
 
 @pytest.mark.parametrize("room_id,date_from,date_to,booked_rooms,status_code", [
     (4, "2030-05-01", "2030-05-15", 3, 201),
@@ -44,3 +48,58 @@ async def test_get_and_delete_booking(authenticated_ac: AsyncClient):
 
     response = await authenticated_ac.get("/api/v1/bookings")
     assert len(response.json()) == 0
+
+
+@pytest.mark.parametrize("sort", ["date_from", "-date_from", "price", "-price", "id"])
+async def test_bookings_keyset_pagination(sort, authenticated_ac: AsyncClient):
+    # Одинаковые даты и цены у разных бронирований: порядок определяется еще и id
+    await BookingDAO.add_bulk([
+        {"room_id": 11, "user_id": 1, "date_from": date(2035, 1, 1 + i % 3),
+         "date_to": date(2035, 1, 10), "price": 1000 * (i % 2 + 1)}
+        for i in range(7)
+    ])
+    everything = (await authenticated_ac.get("/api/v1/bookings", params={"sort": sort})).json()
+    assert len(everything) == 7
+
+    bookings, params = [], {"sort": sort, "limit": 3}
+    while True:
+        response = await authenticated_ac.get("/api/v1/bookings", params=params)
+        bookings += response.json()
+        if "x-next-cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["x-next-cursor"]
+    assert bookings == everything
+    key = sort.lstrip("-")
+    keys = [(booking[key], booking["id"]) for booking in bookings]
+    assert keys == sorted(keys, reverse=sort.startswith("-"))
+
+    await BookingDAO.delete(user_id=1, room_id=11)
+
+
+async def test_bookings_without_limit_not_truncated(authenticated_ac: AsyncClient):
+    # Без limit возвращаются все бронирования, а не только первая страница
+    await BookingDAO.add_bulk([
+        {"room_id": 11, "user_id": 1, "date_from": date.fromordinal(start),
+         "date_to": date.fromordinal(start + 1), "price": 1000}
+        for start in range(date(2036, 1, 1).toordinal(), date(2036, 1, 1).toordinal() + 60)
+    ])
+    response = await authenticated_ac.get("/api/v1/bookings")
+    assert len(response.json()) == 60
+    assert "x-next-cursor" not in response.headers
+
+    await BookingDAO.delete(user_id=1, room_id=11)
+
+
+@pytest.mark.parametrize("date_from,date_to", [
+    ("2030-06-10", "2030-06-10"),
+    ("2030-06-10", "2030-06-09"),
+])
+async def test_booking_without_nights_rejected(date_from, date_to, authenticated_ac: AsyncClient):
+    response = await authenticated_ac.post("/api/v1/bookings", json={
+        "room_id": 4,
+        "date_from": date_from,
+        "date_to": date_to,
+    })
+
+    assert response.status_code == 400
+    assert await BookingDAO.find_all(room_id=4, date_from=date(2030, 6, 10)) == []
@@ -1,8 +1,17 @@
+import asyncio
 from datetime import datetime
 
 import pytest
 
 from app.bookings.dao import BookingDAO
+from app.exceptions import (
+    BookingMustIncludeNight,
+    RoomFullyBooked,
+    RoomsOverbooked,
+    RoomsOverbookedInCSV,
+)
+from app.hotels.rooms.dao import RoomDAO
+from app.inventory.dao import RoomInventoryDAO
 
 
 @pytest.mark.parametrize("user_id, room_id", [
@@ -37,4 +46,97 @@ async def test_booking_crud(user_id, room_id):
     # Проверка удаления брони
     deleted_booking = await BookingDAO.find_one_or_none(id=new_booking["id"])
     assert deleted_booking is None
-    
\ No newline at end of file
+    
+
+async def test_booking_updates_inventory():
+    new_booking = await BookingDAO.add(
+        user_id=1,
+        room_id=5,
+        date_from=datetime.strptime("2031-01-10", "%Y-%m-%d"),
+        date_to=datetime.strptime("2031-01-13", "%Y-%m-%d"),
+    )
+
+    # Бронирование занимает три ночи: 10, 11 и 12 января
+    days = await RoomInventoryDAO.find_all(room_id=5)
+    assert sorted((row["day"].day, row["booked"]) for row in days) == [
+        (10, 1), (11, 1), (12, 1),
+    ]
+    assert await RoomInventoryDAO.find_mismatches() == []
+    assert await RoomInventoryDAO.find_mismatches(
+        datetime.strptime("2031-01-01", "%Y-%m-%d"),
+        datetime.strptime("2031-02-01", "%Y-%m-%d"),
+    ) == []
+
+    await BookingDAO.delete(id=new_booking["id"], user_id=1)
+
+    days = await RoomInventoryDAO.find_all(room_id=5)
+    assert all(row["booked"] == 0 for row in days)
+    assert await RoomInventoryDAO.find_mismatches() == []
+
+
+async def test_room_with_cancelled_bookings_can_be_deleted():
+    room = await RoomDAO.add(hotel_id=1, name="Номер для удаления", price=1000, quantity=1)
+    booking = await BookingDAO.add(
+        user_id=1,
+        room_id=room["id"],
+        date_from=datetime.strptime("2031-02-10", "%Y-%m-%d"),
+        date_to=datetime.strptime("2031-02-12", "%Y-%m-%d"),
+    )
+    await BookingDAO.delete(id=booking["id"])
+    # После отмены остаются строки занятости с booked = 0, они удаляются вместе с номером
+    assert await RoomInventoryDAO.find_all(room_id=room["id"]) != []
+
+    await RoomDAO.delete(id=room["id"])
+
+    assert await RoomDAO.find_one_or_none(id=room["id"]) is None
+    assert await RoomInventoryDAO.find_all(room_id=room["id"]) == []
+
+
+async def test_booking_without_nights_rejected():
+    # Без ночей проверять занятость не на что: такое бронирование отклоняется сразу
+    day = datetime.strptime("2032-03-01", "%Y-%m-%d")
+    with pytest.raises(BookingMustIncludeNight):
+        await BookingDAO.add(user_id=2, room_id=10, date_from=day, date_to=day)
+    assert await BookingDAO.find_all(room_id=10, date_from=day) == []
+
+
+async def test_concurrent_bookings_do_not_overbook():
+    # У номера 10 всего 7 мест, а бронировать одновременно пытаются 20 раз
+    results = await asyncio.gather(
+        *[
+            BookingDAO.add(
+                user_id=2,
+                room_id=10,
+                date_from=datetime.strptime("2032-03-01", "%Y-%m-%d"),
+                date_to=datetime.strptime("2032-03-05", "%Y-%m-%d"),
+            )
+            for _ in range(20)
+        ],
+        return_exceptions=True,
+    )
+
+    bookings = [result for result in results if not isinstance(result, Exception)]
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert len(bookings) == 7
+    assert all(isinstance(error, RoomFullyBooked) for error in errors)
+    assert await RoomInventoryDAO.find_mismatches() == []
+
+    for booking in bookings:
+        await BookingDAO.delete(id=booking["id"])
+
+
+async def test_add_bulk_rejects_overbooking():
+    room = await RoomDAO.add(hotel_id=1, name="Номер для массового добавления", price=1000, quantity=1)
+    bookings = [
+        {"room_id": room["id"], "user_id": 1, "price": 1000,
+         "date_from": datetime.strptime(date_from, "%Y-%m-%d"),
+         "date_to": datetime.strptime(date_to, "%Y-%m-%d")}
+        for date_from, date_to in [("2033-05-01", "2033-05-04"), ("2033-05-03", "2033-05-05")]
+    ]
+    with pytest.raises(RoomsOverbooked) as error:
+        await BookingDAO.add_bulk(bookings)
+    # Ошибка не связана с CSV: импорт сообщает о строках файла своим исключением
+    assert not isinstance(error.value, RoomsOverbookedInCSV)
+    assert await BookingDAO.find_all(room_id=room["id"]) == []
+
+    await RoomDAO.delete(id=room["id"])
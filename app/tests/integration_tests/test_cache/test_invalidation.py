@@ -0,0 +1,108 @@
+import asyncio
+from datetime import date
+
+from httpx import AsyncClient
+
+from app.bookings.dao import BookingDAO
+from app.cache.invalidation import day_tags, listen_invalidations
+from app.cache.search import SearchCache, hotels_search_cache
+
+
+async def wait_for(condition, timeout: float = 2):
+    for _ in range(int(timeout / 0.05)):
+        if condition():
+            return True
+        await asyncio.sleep(0.05)
+    return condition()
+
+
+async def test_booking_invalidates_search_cache_in_all_workers():
+    # Второй воркер: собственный кэш в памяти и собственная подписка на сброс
+    other_worker = SearchCache(hotels_search_cache.name)
+    listener = asyncio.create_task(listen_invalidations([other_worker]))
+    await asyncio.sleep(0.1)
+
+    date_from, date_to = date(2032, 2, 1), date(2032, 2, 5)
+    key = hotels_search_cache.key("invalidation", date_from, date_to)
+    unrelated_key = hotels_search_cache.key("invalidation", date(2032, 3, 1), date(2032, 3, 5))
+
+    async def load():
+        return "cached"
+
+    try:
+        for cache in (hotels_search_cache, other_worker):
+            await cache.get_or_load(key, load, tags=day_tags(date_from, date_to))
+            await cache.get_or_load(
+                unrelated_key, load, tags=day_tags(date(2032, 3, 1), date(2032, 3, 5))
+            )
+        assert key in other_worker._local
+
+        booking = await BookingDAO.add(
+            user_id=1, room_id=9, date_from=date(2032, 2, 4), date_to=date(2032, 2, 8)
+        )
+        assert booking
+
+        assert key not in hotels_search_cache._local
+        assert await wait_for(lambda: key not in other_worker._local)
+        assert await hotels_search_cache._redis_get(key) is None
+        # Записи на другие дни не затронуты
+        assert unrelated_key in other_worker._local
+        assert await hotels_search_cache._redis_get(unrelated_key) is not None
+
+        await BookingDAO.delete(id=booking["id"])
+    finally:
+        listener.cancel()
+        await hotels_search_cache.clear()
+
+
+async def test_search_reflects_booking_immediately(authenticated_ac: AsyncClient):
+    params = {"date_from": "2032-03-01", "date_to": "2032-03-05"}
+
+    async def rooms_left() -> int:
+        response = await authenticated_ac.get("/api/v1/hotels/Коми", params=params)
+        assert response.status_code == 200
+        return {hotel["id"]: hotel["rooms_left"] for hotel in response.json()}[5]
+
+    before = await rooms_left()
+    response = await authenticated_ac.post("/api/v1/bookings", json={
+        "room_id": 9,
+        "date_from": "2032-03-02",
+        "date_to": "2032-03-04",
+    })
+    assert response.status_code == 201
+    assert await rooms_left() == before - 1
+
+    await BookingDAO.delete(room_id=9, date_from=date(2032, 3, 2))
+    assert await rooms_left() == before
+
+
+async def test_booking_during_cold_load_is_not_cached():
+    date_from, date_to = date(2032, 4, 1), date(2032, 4, 5)
+    key = hotels_search_cache.key("cold-load", date_from, date_to)
+    tags = day_tags(date_from, date_to)
+    loads = []
+
+    async def load_and_book():
+        # Результат прочитан до бронирования, а бронирование зафиксировано
+        # и сброшено до того, как запись попала в кэш
+        loads.append("stale")
+        booking = await BookingDAO.add(user_id=1, room_id=9, date_from=date_from, date_to=date_to)
+        await BookingDAO.delete(id=booking["id"])
+        return "stale"
+
+    async def load():
+        loads.append("fresh")
+        return "fresh"
+
+    try:
+        assert await hotels_search_cache.get_or_load(key, load_and_book, tags=tags) == "stale"
+        # Устаревший результат не сохранен ни в памяти процесса, ни в Redis
+        assert key not in hotels_search_cache._local
+        assert await hotels_search_cache._redis_get(key) is None
+        assert await hotels_search_cache.get_or_load(key, load, tags=tags) == "fresh"
+        assert loads == ["stale", "fresh"]
+        # Следующий сброс по тегам находит запись, сохраненную после загрузки
+        await hotels_search_cache.invalidate_tags(tags[:1])
+        assert await hotels_search_cache._redis_get(key) is None
+    finally:
+        await hotels_search_cache.clear()
@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+
+from sqlalchemy import select
+
+from app.bookings.dao import BookingDAO
+from app.database import async_session_maker
+from app.exporter import writers
+from app.hotels.models import Hotels
+
+
+@pytest.mark.parametrize("chunk_size", [1000, 2])
+async def test_export_hotels_csv(chunk_size, authenticated_ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(writers, "CHUNK_SIZE", chunk_size)
+    response = await authenticated_ac.get("/api/v1/export/hotels")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == 'attachment; filename="hotels.csv"'
+
+    rows = list(csv.DictReader(io.StringIO(response.text), delimiter=";"))
+    async with async_session_maker() as session:
+        hotels = (await session.execute(select(Hotels.__table__.columns))).mappings().all()
+    assert [int(row["id"]) for row in rows] == sorted(hotel["id"] for hotel in hotels)
+    first = next(hotel for hotel in hotels if hotel["id"] == int(rows[0]["id"]))
+    # Значения в формате импорта CSV
+    assert rows[0]["services"] == json.dumps(first["services"], ensure_ascii=False)
+    assert rows[0]["location"] == first["location"]
+
+
+async def test_export_bookings_ndjson_by_period(authenticated_ac: AsyncClient):
+    await BookingDAO.add_bulk([
+        {"room_id": 3, "user_id": 1, "date_from": date(2038, 2, day),
+         "date_to": date(2038, 2, day + 3), "price": 1234}
+        for day in (1, 10, 20)
+    ])
+    response = await authenticated_ac.get("/api/v1/export/bookings", params={
+        "format": "ndjson", "date_from": "2038-02-12", "date_to": "2038-02-22",
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    # Пересекаются с периодом бронирования с 10 и с 20 февраля
+    assert [row["date_from"] for row in rows] == ["2038-02-10", "2038-02-20"]
+    # Вычисляемые колонки не экспортируются
+    assert set(rows[0]) == {"id", "room_id", "user_id", "date_from", "date_to", "price"}
+
+    await BookingDAO.delete(user_id=1, price=1234)
+
+
+@pytest.mark.parametrize("url,params,status_code", [
+    ("/api/v1/export/hotels", {"date_from": "2038-01-01"}, 400),
+    ("/api/v1/export/bookings", {"date_from": "2038-01-02", "date_to": "2038-01-01"}, 400),
+    ("/api/v1/export/users", {}, 422),
+    ("/api/v1/export/rooms", {"format": "xml"}, 422),
+])
+async def test_export_invalid_request(url, params, status_code, authenticated_ac: AsyncClient):
+    response = await authenticated_ac.get(url, params=params)
+    assert response.status_code == status_code
+
+
+async def test_export_requires_user(ac: AsyncClient):
+    response = await ac.get("/api/v1/export/bookings")
+    assert response.status_code == 401
@@ -1,6 +1,10 @@
+import asyncio
+
 import pytest
 from httpx import AsyncClient
 
+from app.hotels.dao import HotelDAO
+
 
 @pytest.mark.parametrize("location,date_from,date_to,status_code,detail", [
     ("Алтай", "2023-01-01", "2022-01-10", 400, "Дата заезда не может быть позже даты выезда"),
@@ -24,4 +28,96 @@ async def test_get_hotels_by_location_and_time(
     assert response.status_code == status_code
     if str(status_code).startswith("4"):
         assert response.json()["detail"] == detail
-        
\ No newline at end of file
+        
+
+async def fetch_pages(ac: AsyncClient, url: str, **params) -> list:
+    # Проходит все страницы по заголовку X-Next-Cursor
+    pages = []
+    while True:
+        response = await ac.get(url, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        if "x-next-cursor" not in response.headers:
+            return pages
+        params["cursor"] = response.headers["x-next-cursor"]
+
+
+@pytest.mark.parametrize("sort", ["id", "-id", "rooms_left", "-rooms_left"])
+async def test_hotels_keyset_pagination(sort, ac: AsyncClient):
+    params = {"date_from": "2023-01-01", "date_to": "2023-01-10", "sort": sort}
+    everything = (await ac.get("/api/v1/hotels/Алтай", params=params)).json()
+
+    pages = await fetch_pages(ac, "/api/v1/hotels/Алтай", limit=2, **params)
+    assert [len(page) for page in pages] == [2, 1]
+    hotels = [hotel for page in pages for hotel in page]
+    assert hotels == everything
+    key = sort.lstrip("-")
+    keys = [(hotel[key], hotel["id"]) for hotel in hotels]
+    assert keys == sorted(keys, reverse=sort.startswith("-"))
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "eyJzb3J0IjogIi1pZCIsICJhZnRlciI6IFsxXX0"])
+async def test_hotels_incorrect_cursor(cursor, ac: AsyncClient):
+    # Второй курсор получен для сортировки -id и не подходит для id
+    response = await ac.get("/api/v1/hotels/Алтай", params={
+        "date_from": "2023-01-01", "date_to": "2023-01-10", "cursor": cursor,
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Некорректный курсор страницы"
+
+
+async def test_search_ignores_case_and_like_wildcards(ac: AsyncClient):
+    params = {"date_from": "2023-01-01", "date_to": "2023-01-10"}
+    # Поиск идет и по названию отеля. Регистр проверяется на латинице: в базе
+    # с кодировкой SQL_ASCII ILIKE не сравнивает кириллицу без учета регистра
+    hotels = (await ac.get("/api/v1/hotels/Cosmos", params=params)).json()
+    assert len(hotels) >= 1
+    assert (await ac.get("/api/v1/hotels/cOSMOS", params=params)).json() == hotels
+    # % и _ ищутся как обычные символы
+    assert (await ac.get("/api/v1/hotels/%", params=params)).json() == []
+
+
+async def test_suggest_locations(ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels/suggest", params={"q": "алт"})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert all("Алтай" in location for location in response.json())
+
+    # Новый отель появляется в подсказках после перестройки индекса
+    await HotelDAO.add(
+        name="Подсказка", location="Сириус, Олимпийский проспект", services=[], rooms_quantity=1
+    )
+    await ac.get("/api/v1/hotels/suggest", params={"q": "оли"})
+    await asyncio.sleep(0.1)
+    response = await ac.get("/api/v1/hotels/suggest", params={"q": "оли"})
+    assert response.json() == ["Сириус, Олимпийский проспект"]
+
+    await HotelDAO.delete(name="Подсказка")
+
+
+@pytest.mark.parametrize("services,services_match,hotel_ids", [
+    (["Wi-Fi", "Парковка"], "all", [1, 2]),
+    (["Бассейн"], "all", [1]),
+    (["Бассейн", "Wi-Fi"], "any", [1, 2]),
+    (["Сауна"], "any", []),
+])
+async def test_hotels_services_filter(services, services_match, hotel_ids, ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels/Алтай", params={
+        "date_from": "2023-01-01", "date_to": "2023-01-10",
+        "services": services, "services_match": services_match,
+    })
+    assert response.status_code == 200
+    assert [hotel["id"] for hotel in response.json()] == hotel_ids
+
+
+@pytest.mark.parametrize("services,services_match,room_ids", [
+    (["Холодильник", "Кондиционер"], "all", [8]),
+    (["Ванная комната", "Бесплатный Wi‑Fi"], "any", [7, 8]),
+])
+async def test_rooms_services_filter(services, services_match, room_ids, ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels/4/rooms", params={
+        "date_from": "2023-01-01", "date_to": "2023-01-10",
+        "services": services, "services_match": services_match,
+    })
+    assert response.status_code == 200
+    assert sorted(room["id"] for room in response.json()) == room_ids
@@ -0,0 +1,76 @@
+import io
+
+import pytest
+from httpx import AsyncClient
+from PIL import Image
+
+from app.config import settings
+from app.images import router
+
+
+def image_bytes(image_format: str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 32), "red").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def queued(monkeypatch, tmp_path):
+    # Вместо брокера запоминаем пути изображений, отправленных на обработку
+    monkeypatch.setattr(router, "IMAGES_DIR", str(tmp_path))
+    paths = []
+    monkeypatch.setattr(router.process_pic, "delay", paths.append)
+    return paths
+
+
+@pytest.mark.parametrize("image_format", ["JPEG", "PNG", "WEBP"])
+async def test_upload_image(image_format, ac: AsyncClient, queued, tmp_path):
+    content = image_bytes(image_format)
+    response = await ac.post(
+        "/api/v1/images/hotels", params={"name": 7}, files={"file": ("hotel", content)}
+    )
+    assert response.status_code == 200
+    assert queued == [f"{tmp_path}/7.webp"]
+    # Временный файл переименован в целевой
+    assert [path.name for path in tmp_path.iterdir()] == ["7.webp"]
+    assert (tmp_path / "7.webp").read_bytes() == content
+
+
+@pytest.mark.parametrize("content,max_size,status_code", [
+    (b"GIF89a" + b"\0" * 100, 1024, 415),
+    (b"", 1024, 415),
+    (image_bytes("PNG"), 10, 413),
+    # Больше ограничения вместе с запасом на заголовки multipart: отклоняется до разбора формы
+    (b"\x89PNG\r\n\x1a\n" + b"\0" * 200 * 1024, 1024, 413),
+])
+async def test_rejected_image_is_not_saved(
+    content, max_size, status_code, ac: AsyncClient, queued, tmp_path, monkeypatch
+):
+    (tmp_path / "7.webp").write_bytes(b"old")
+    monkeypatch.setattr(settings, "IMAGE_UPLOAD_MAX_SIZE", max_size)
+    response = await ac.post(
+        "/api/v1/images/hotels", params={"name": 7}, files={"file": ("hotel.png", content)}
+    )
+    assert response.status_code == status_code
+    assert queued == []
+    # Прежнее изображение не изменилось, временных файлов не осталось
+    assert [path.name for path in tmp_path.iterdir()] == ["7.webp"]
+    assert (tmp_path / "7.webp").read_bytes() == b"old"
+
+
+async def test_body_without_content_length_is_limited(ac: AsyncClient, queued, monkeypatch):
+    monkeypatch.setattr(settings, "IMAGE_UPLOAD_MAX_SIZE", 1024)
+
+    async def body():
+        yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="h.png"\r\n\r\n'
+        yield b"\x89PNG\r\n\x1a\n"
+        for _ in range(100):
+            yield b"\0" * 1024
+        yield b"\r\n--b--\r\n"
+
+    response = await ac.post(
+        "/api/v1/images/hotels", params={"name": 7}, content=body(),
+        headers={"Content-Type": "multipart/form-data; boundary=b"},
+    )
+    assert response.status_code == 413
+    assert queued == []
@@ -0,0 +1,131 @@
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+
+from app.bookings.dao import BookingDAO
+from app.hotels.dao import HotelDAO
+from app.importer import copy
+from app.inventory.dao import RoomInventoryDAO
+
+HOTELS_CSV = (
+    "name;location;services;rooms_quantity;image_id\n"
+    "Импортный;Импорт, улица 1;['Wi-Fi', 'Парковка'];10;1\n"
+    "Импортный 2;Импорт, улица 2;[];5;2\n"
+)
+
+BOOKINGS_CSV = (
+    "room_id;user_id;date_from;date_to;price\n"
+    "10;1;2033-01-01;2033-01-05;4000\n"
+    "10;1;2033-01-03;2033-01-06;4000\n"
+    "{room_id};1;2033-01-02;2033-01-04;4000\n"
+)
+
+
+async def upload(ac: AsyncClient, table: str, content: str, **params):
+    return await ac.post(
+        f"/api/v1/import/{table}",
+        params=params,
+        files={"file": (f"{table}.csv", content.encode())},
+    )
+
+
+async def test_import_hotels(authenticated_ac: AsyncClient):
+    response = await upload(authenticated_ac, "hotels", HOTELS_CSV)
+    assert response.status_code == 201
+    assert response.json() == {"hotels": 2}
+
+    hotels = [
+        await HotelDAO.find_one_or_none(location=f"Импорт, улица {i}") for i in (1, 2)
+    ]
+    assert [(hotel["name"], hotel["services"]) for hotel in hotels] == [
+        ("Импортный", ["Wi-Fi", "Парковка"]),
+        ("Импортный 2", []),
+    ]
+    for hotel in hotels:
+        await HotelDAO.delete(id=hotel["id"])
+
+
+@pytest.mark.parametrize("atomic,status_code,imported", [
+    (True, 201, 3),
+    (True, 500, 0),
+    (False, 500, 2),
+])
+async def test_import_bookings_in_chunks(
+    atomic, status_code, imported, authenticated_ac: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(copy, "CHUNK_SIZE", 2)
+    # Номера 100500 нет: третья строка (вторая порция) нарушает внешний ключ
+    room_id = 10 if status_code == 201 else 100500
+    response = await upload(
+        authenticated_ac, "bookings", BOOKINGS_CSV.format(room_id=room_id), atomic=atomic
+    )
+    assert response.status_code == status_code
+
+    bookings = await BookingDAO.find_all(user_id=1, price=4000)
+    assert len(bookings) == imported
+    # Занятость обновлена в той же транзакции, что и импорт
+    assert not await RoomInventoryDAO.find_mismatches(date(2033, 1, 1), date(2033, 1, 7))
+
+    await BookingDAO.delete(user_id=1, price=4000)
+
+
+async def test_import_incorrect_value(authenticated_ac: AsyncClient):
+    content = BOOKINGS_CSV.format(room_id=10).replace("2033-01-06", "2033-01-32")
+    response = await upload(authenticated_ac, "bookings", content)
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        "Строка 3, колонка date_to: некорректное значение '2033-01-32'"
+    )
+    assert not await BookingDAO.find_all(user_id=1, price=4000)
+
+
+async def test_import_hotels_upsert(authenticated_ac: AsyncClient):
+    response = await upload(authenticated_ac, "hotels", HOTELS_CSV, upsert=True)
+    assert response.json() == {"hotels": 2, "inserted": 2, "updated": 0, "skipped": 0}
+
+    # Повторный импорт не создает дубликатов: одна строка изменилась, одна новая,
+    # а из двух строк с одним ключом применяется последняя
+    content = HOTELS_CSV.replace("[];5;2", "[];6;2") + (
+        "Импортный 3;Импорт, улица 3;[];1;3\n"
+        "Импортный 3;Импорт, улица 3;[];2;3\n"
+    )
+    response = await upload(authenticated_ac, "hotels", content, upsert=True)
+    assert response.status_code == 201
+    assert response.json() == {"hotels": 4, "inserted": 1, "updated": 1, "skipped": 2}
+
+    hotels = [
+        await HotelDAO.find_one_or_none(location=f"Импорт, улица {i}") for i in (1, 2, 3)
+    ]
+    assert [hotel["rooms_quantity"] for hotel in hotels] == [10, 6, 2]
+    for hotel in hotels:
+        await HotelDAO.delete(id=hotel["id"])
+
+
+async def test_import_bookings_upsert_is_not_supported(authenticated_ac: AsyncClient):
+    response = await upload(
+        authenticated_ac, "bookings", BOOKINGS_CSV.format(room_id=10), upsert=True
+    )
+    assert response.status_code == 400
+
+
+async def test_import_overbooked_bookings(authenticated_ac: AsyncClient):
+    # У номера 1 пять мест: с 1 по 4 февраля все занимает первый импорт
+    stay = "1;1;2033-02-01;2033-02-05;4000\n"
+    content = "room_id;user_id;date_from;date_to;price\n" + stay * 5
+    assert (await upload(authenticated_ac, "bookings", content)).status_code == 201
+
+    # Вместе с уже занятыми номерами не хватает мест строкам 3 и 4, строка 2 не пересекается
+    content = (
+        "room_id;user_id;date_from;date_to;price\n"
+        "1;1;2033-02-05;2033-02-07;4000\n"
+        "1;1;2033-02-04;2033-02-06;4000\n"
+        "1;1;2033-01-30;2033-02-02;4000\n"
+    )
+    response = await upload(authenticated_ac, "bookings", content)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Не хватает свободных номеров для строк 3, 4"
+    assert len(await BookingDAO.find_all(user_id=1, price=4000)) == 5
+    assert not await RoomInventoryDAO.find_mismatches(date(2033, 1, 30), date(2033, 2, 7))
+
+    await BookingDAO.delete(user_id=1, price=4000)
@@ -0,0 +1,109 @@
+import os
+
+from httpx import AsyncClient
+
+from app.bookings.dao import BookingDAO
+from app.config import settings
+from app.importer import copy, router
+from app.importer.dao import ImportJobDAO
+from app.importer.jobs import run_import_job
+
+BOOKINGS_CSV = (
+    "room_id;user_id;date_from;date_to;price\n"
+    "10;1;2034-01-01;2034-01-05;4100\n"
+    "10;1;2034-01-03;2034-01-06;4100\n"
+    "{room_id};1;2034-01-02;2034-01-04;4100\n"
+)
+
+
+async def create_job(ac: AsyncClient, content: str, monkeypatch, tmp_path) -> int:
+    # Вместо брокера запоминаем id задачи и выполняем импорт в тесте
+    monkeypatch.setattr(settings, "IMPORT_SPOOL_DIR", str(tmp_path))
+    queued = []
+    monkeypatch.setattr(router.import_csv, "delay", queued.append)
+    response = await ac.post(
+        "/api/v1/import/bookings/jobs",
+        files={"file": ("bookings.csv", content.encode())},
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "queued"
+    assert queued == [job["id"]]
+    return job["id"]
+
+
+async def test_import_job(authenticated_ac: AsyncClient, monkeypatch, tmp_path):
+    job_id = await create_job(
+        authenticated_ac, BOOKINGS_CSV.format(room_id=10), monkeypatch, tmp_path
+    )
+    await run_import_job(job_id)
+
+    job = (await authenticated_ac.get(f"/api/v1/import/jobs/{job_id}")).json()
+    assert (job["status"], job["rows_processed"], job["error"]) == ("done", 3, None)
+    assert job["rows_per_second"] > 0
+    assert len(await BookingDAO.find_all(user_id=1, price=4100)) == 3
+    # Файл удаляется после успешного импорта
+    assert not os.listdir(tmp_path)
+
+    await BookingDAO.delete(user_id=1, price=4100)
+
+
+async def test_resume_failed_job(authenticated_ac: AsyncClient, monkeypatch, tmp_path):
+    monkeypatch.setattr(copy, "CHUNK_SIZE", 2)
+    # Номера 100500 нет: вторая порция не импортируется
+    job_id = await create_job(
+        authenticated_ac, BOOKINGS_CSV.format(room_id=100500), monkeypatch, tmp_path
+    )
+    await run_import_job(job_id)
+
+    job = (await authenticated_ac.get(f"/api/v1/import/jobs/{job_id}")).json()
+    assert (job["status"], job["rows_processed"]) == ("failed", 2)
+    assert job["error"] == "Не удалось добавить запись"
+    assert len(await BookingDAO.find_all(user_id=1, price=4100)) == 2
+
+    # Причина ошибки устранена: импорт продолжается с третьей строки, а не с начала
+    [path] = tmp_path.iterdir()
+    path.write_text(BOOKINGS_CSV.format(room_id=10), encoding="utf-8")
+    response = await authenticated_ac.post(f"/api/v1/import/jobs/{job_id}/resume")
+    assert response.status_code == 202
+    await run_import_job(job_id)
+
+    job = (await authenticated_ac.get(f"/api/v1/import/jobs/{job_id}")).json()
+    assert (job["status"], job["rows_processed"]) == ("done", 3)
+    assert len(await BookingDAO.find_all(user_id=1, price=4100)) == 3
+
+    # Завершенную задачу продолжить нельзя
+    response = await authenticated_ac.post(f"/api/v1/import/jobs/{job_id}/resume")
+    assert response.status_code == 409
+
+    await BookingDAO.delete(user_id=1, price=4100)
+
+
+async def test_job_runs_in_one_worker(authenticated_ac: AsyncClient, monkeypatch, tmp_path):
+    job_id = await create_job(
+        authenticated_ac, BOOKINGS_CSV.format(room_id=10), monkeypatch, tmp_path
+    )
+    async with ImportJobDAO.claim(job_id) as job:
+        assert job["status"] == "running"
+        # Повторная доставка сообщения, пока задачу выполняет первый воркер
+        async with ImportJobDAO.claim(job_id) as other:
+            assert other is None
+        await run_import_job(job_id)
+        assert await BookingDAO.find_all(user_id=1, price=4100) == []
+
+    # Воркер завершился, не выполнив импорт: задачу можно захватить снова
+    await run_import_job(job_id)
+    job = (await authenticated_ac.get(f"/api/v1/import/jobs/{job_id}")).json()
+    assert (job["status"], job["rows_processed"]) == ("done", 3)
+    assert len(await BookingDAO.find_all(user_id=1, price=4100)) == 3
+
+    await BookingDAO.delete(user_id=1, price=4100)
+
+
+async def test_job_of_another_user(ac: AsyncClient, authenticated_ac: AsyncClient, monkeypatch, tmp_path):
+    job_id = await create_job(authenticated_ac, "room_id\n", monkeypatch, tmp_path)
+    await ac.post("/api/v1/auth/register", json={"email": "jobs@test.com", "password": "jobs"})
+    await ac.post("/api/v1/auth/login", json={"email": "jobs@test.com", "password": "jobs"})
+
+    response = await ac.get(f"/api/v1/import/jobs/{job_id}")
+    assert response.status_code == 404
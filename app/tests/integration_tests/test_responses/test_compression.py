@@ -0,0 +1,39 @@
+import pytest
+from httpx import AsyncClient
+
+from app.config import settings
+from app.hotels import router
+
+URL = "/api/v1/hotels/Республика"
+PARAMS = {"date_from": "2037-05-01", "date_to": "2037-05-10"}
+
+
+async def fail(*args, **kwargs):
+    raise AssertionError("Страница сжата повторно")
+
+
+@pytest.mark.parametrize("fast_json", [False, True])
+async def test_search_page_is_compressed_once(fast_json, ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", fast_json)
+    plain = await ac.get(URL, params=PARAMS, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert len(plain.content) >= settings.COMPRESSION_MINIMUM_SIZE
+
+    compressed = await ac.get(URL, params=PARAMS, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["vary"] == "Accept-Encoding"
+    assert compressed.headers["etag"] == f"W/{plain.headers['etag']}"
+    assert int(compressed.headers["content-length"]) < len(plain.content)
+    assert compressed.json() == plain.json()
+
+    # Повторный запрос получает сжатое тело из кэша
+    monkeypatch.setattr(router, "compress", fail)
+    again = await ac.get(URL, params=PARAMS, headers={"Accept-Encoding": "gzip"})
+    assert again.content == compressed.content
+    assert again.headers["etag"] == compressed.headers["etag"]
+
+
+async def test_small_response_is_not_compressed(ac: AsyncClient):
+    response = await ac.get("/api/v1/hotels/id/1", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,110 @@
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+
+from app.bookings.dao import BookingDAO
+from app.cache.client import redis_client
+from app.config import settings
+from app.hotels.dao import HotelDAO
+from app.hotels.rooms.dao import RoomDAO
+
+ROOMS_URL = "/api/v1/hotels/1/rooms"
+ROOMS_PARAMS = {"date_from": "2037-03-01", "date_to": "2037-03-05"}
+
+
+async def fail(*args, **kwargs):
+    raise AssertionError("Запрос к базе при совпадении ETag")
+
+
+@pytest.mark.parametrize("fast_json", [False, True])
+async def test_rooms_not_modified_until_booking(
+    fast_json, authenticated_ac: AsyncClient, monkeypatch
+):
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", fast_json)
+    response = await authenticated_ac.get(ROOMS_URL, params=ROOMS_PARAMS)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+    etag = response.headers["etag"]
+
+    # Версия доступности не изменилась: 304 без запроса к базе
+    with monkeypatch.context() as patched:
+        patched.setattr(RoomDAO, "find_all", fail)
+        response = await authenticated_ac.get(
+            ROOMS_URL, params=ROOMS_PARAMS, headers={"If-None-Match": f'"other", {etag}'}
+        )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert (response.headers["etag"], response.headers["cache-control"]) == (etag, "no-cache")
+
+    # Бронирование номера этого отеля меняет ETag
+    response = await authenticated_ac.post("/api/v1/bookings", json={
+        "room_id": 2, "date_from": "2037-03-01", "date_to": "2037-03-03",
+    })
+    assert response.status_code == 201
+    response = await authenticated_ac.get(
+        ROOMS_URL, params=ROOMS_PARAMS, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+    await BookingDAO.delete(user_id=1, room_id=2, date_from=date(2037, 3, 1))
+
+
+async def test_rooms_etag_ignores_other_hotels(authenticated_ac: AsyncClient):
+    etag = (await authenticated_ac.get(ROOMS_URL, params=ROOMS_PARAMS)).headers["etag"]
+    # Номер 11 принадлежит отелю 6
+    await BookingDAO.add(user_id=1, room_id=11, date_from=date(2037, 3, 1), date_to=date(2037, 3, 3))
+    response = await authenticated_ac.get(
+        ROOMS_URL, params=ROOMS_PARAMS, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    await BookingDAO.delete(user_id=1, room_id=11, date_from=date(2037, 3, 1))
+
+
+async def test_hotel_not_modified_until_catalog_changes(ac: AsyncClient, monkeypatch):
+    response = await ac.get("/api/v1/hotels/id/1")
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=300"
+    etag = response.headers["etag"]
+
+    with monkeypatch.context() as patched:
+        patched.setattr(HotelDAO, "find_one_or_none", fail)
+        response = await ac.get("/api/v1/hotels/id/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # ETag разных отелей различаются
+    assert (await ac.get("/api/v1/hotels/id/2")).headers["etag"] != etag
+
+    await RoomDAO.delete(name="Номер для проверки ETag")
+    response = await ac.get("/api/v1/hotels/id/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+
+async def test_hotels_search_not_modified(ac: AsyncClient):
+    url, params = "/api/v1/hotels/Алтай", {"date_from": "2037-04-01", "date_to": "2037-04-10"}
+    response = await ac.get(url, params=params)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, max-age=15, must-revalidate"
+    etag = response.headers["etag"]
+
+    response = await ac.get(url, params=params, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    # Другая страница — другой ETag
+    response = await ac.get(url, params={**params, "limit": 1}, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+async def test_etag_not_reused_after_versions_are_lost(ac: AsyncClient):
+    # Счетчик версии пропал из Redis (перезапуск, FLUSHALL, вытеснение)
+    await redis_client.delete("etag:version:catalog")
+    etag = (await ac.get("/api/v1/hotels/id/1")).headers["etag"]
+
+    await redis_client.delete("etag:version:catalog")
+    response = await ac.get("/api/v1/hotels/id/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -0,0 +1,38 @@
+from datetime import date
+
+import pytest
+from httpx import AsyncClient
+
+from app.bookings.dao import BookingDAO
+from app.config import settings
+
+
+@pytest.fixture
+async def bookings():
+    # Другие тесты удаляют бронирования тестового пользователя: создаем свои
+    await BookingDAO.add_bulk([
+        {"room_id": 11, "user_id": 1, "date_from": date(2036, 1, day),
+         "date_to": date(2036, 1, 10), "price": 3000}
+        for day in (1, 2)
+    ])
+    yield
+    await BookingDAO.delete(user_id=1, room_id=11)
+
+
+@pytest.mark.parametrize("url,params", [
+    ("/api/v1/hotels/Республика", {"date_from": "2023-01-01", "date_to": "2023-01-10", "limit": 2}),
+    ("/api/v1/hotels/1/rooms", {"date_from": "2023-01-01", "date_to": "2023-01-10"}),
+    ("/api/v1/bookings", {"limit": 1}),
+])
+async def test_fast_json_matches_validated_response(
+    url, params, authenticated_ac: AsyncClient, monkeypatch, bookings
+):
+    validated = await authenticated_ac.get(url, params=params)
+    monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+    fast = await authenticated_ac.get(url, params=params)
+
+    assert fast.status_code == validated.status_code == 200
+    assert fast.json() == validated.json()
+    assert len(fast.json()) > 0
+    # Заголовки, выставленные зависимостями (курсор следующей страницы), сохраняются
+    assert fast.headers.get("x-next-cursor") == validated.headers.get("x-next-cursor")
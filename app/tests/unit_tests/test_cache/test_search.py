@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.cache.search import SearchCache
+
+
+def metric(name: str, cache: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, {"cache": cache, **labels}) or 0
+
+
+@pytest.fixture
+async def search_cache():
+    cache = SearchCache("test_search", ttl=0.2, stale_ttl=5)
+    await cache.clear()
+    yield cache
+    await cache.clear()
+
+
+async def test_concurrent_misses_share_one_load(search_cache):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return [{"id": 1}]
+
+    coalesced = metric("cache_coalesced_total", "test_search")
+    key = search_cache.key("Алтай", "2023-01-01", "2023-01-10")
+    results = await asyncio.gather(*[search_cache.get_or_load(key, loader) for _ in range(10)])
+
+    assert results == [[{"id": 1}]] * 10
+    assert len(calls) == 1
+    assert metric("cache_coalesced_total", "test_search") == coalesced + 9
+
+    hits = metric("cache_hits_total", "test_search", tier="local")
+    assert await search_cache.get_or_load(key, loader) == [{"id": 1}]
+    assert metric("cache_hits_total", "test_search", tier="local") == hits + 1
+    assert len(calls) == 1
+
+
+async def test_redis_tier_and_stale_while_revalidate(search_cache):
+    values = iter(["first", "second"])
+
+    async def loader():
+        return next(values)
+
+    key = search_cache.key("stale")
+    assert await search_cache.get_or_load(key, loader) == "first"
+
+    # Другой процесс: пустой локальный кэш, запись берется из Redis
+    search_cache._local.clear()
+    hits = metric("cache_hits_total", "test_search", tier="redis")
+    assert await search_cache.get_or_load(key, loader) == "first"
+    assert metric("cache_hits_total", "test_search", tier="redis") == hits + 1
+
+    # После ttl отдается устаревшее значение, а запись обновляется в фоне
+    await asyncio.sleep(0.25)
+    assert await search_cache.get_or_load(key, loader) == "first"
+    await asyncio.gather(*search_cache._refreshing)
+    assert await search_cache.get_or_load(key, loader) == "second"
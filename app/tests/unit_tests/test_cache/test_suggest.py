@@ -0,0 +1,46 @@
+import asyncio
+
+from app.cache.suggest import PrefixIndex
+
+LOCATIONS = [
+    "Республика Алтай, Майминский район, село Урлу-Аспак",
+    "Республика Алтай, Турочакский район, село Артыбаш",
+    "Республика Коми, Сыктывкар, Коммунистическая улица, 67",
+]
+
+
+def test_find_by_word_prefix_ignoring_case():
+    index = PrefixIndex("test_suggest")
+    index.build(LOCATIONS)
+
+    assert index.find("алт") == LOCATIONS[:2]
+    assert index.find("  РЕСПУБЛИКА   алтай ") == LOCATIONS[:2]
+    # Слова внутри строки и после дефиса тоже находятся
+    assert index.find("аспак") == [LOCATIONS[0]]
+    assert index.find("ком") == [LOCATIONS[2]]
+    assert index.find("республика", limit=1) == [LOCATIONS[0]]
+    # Середина слова не совпадает
+    assert index.find("лтай") == []
+    assert index.find(" ") == []
+
+
+async def test_loads_once_and_rebuilds_after_invalidate():
+    index = PrefixIndex("test_suggest")
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return LOCATIONS if len(calls) == 1 else LOCATIONS + ["Сириус, Фигурная улица"]
+
+    assert await asyncio.gather(*[index.suggest("алт", loader) for _ in range(3)]) == [
+        LOCATIONS[:2]
+    ] * 3
+    assert await index.suggest("сир", loader) == []
+    assert len(calls) == 1
+
+    await index.invalidate()
+    # Пока индекс перестраивается в фоне, подсказки идут по прежнему индексу
+    assert await index.suggest("сир", loader) == []
+    await asyncio.sleep(0.01)
+    assert await index.suggest("сир", loader) == ["Сириус, Фигурная улица"]
+    assert len(calls) == 2
@@ -0,0 +1,84 @@
+import gzip
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.compression import CompressionMiddleware, choose_encoding
+
+BODY = "Республика Алтай, Майминский район, село Урлу-Аспак. " * 100
+
+
+async def text(request):
+    return PlainTextResponse(BODY, headers={"ETag": '"v1"'})
+
+
+async def small(request):
+    return PlainTextResponse("ok")
+
+
+async def image(request):
+    return Response(BODY.encode(), media_type="image/jpeg")
+
+
+async def stream(request):
+    async def lines():
+        for i in range(3):
+            yield BODY[:2000]
+    return StreamingResponse(lines(), media_type="text/csv")
+
+
+app = CompressionMiddleware(
+    Starlette(routes=[
+        Route("/text", text), Route("/small", small),
+        Route("/image", image), Route("/stream", stream),
+    ]),
+    minimum_size=500,
+)
+
+
+@pytest.mark.parametrize("accept_encoding,encoding", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("*, gzip;q=0", None),
+    ("GZIP; q=1.0", "gzip"),
+])
+def test_choose_encoding(accept_encoding, encoding, monkeypatch):
+    # Без пакета brotli выбор не зависит от его наличия
+    monkeypatch.setattr("app.compression.ENCODINGS", ("gzip",))
+    assert choose_encoding(accept_encoding) == encoding
+
+
+async def test_compresses_text_above_minimum_size():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        response = await ac.get("/text", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"v1"'
+        assert int(response.headers["content-length"]) < len(BODY.encode()) / 10
+        assert response.text == BODY
+
+        # Без Accept-Encoding тело не сжимается, но ответ зависит от этого заголовка
+        response = await ac.get("/text", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert (response.headers["vary"], response.headers["etag"]) == ("Accept-Encoding", '"v1"')
+
+        for url in ("/small", "/image"):
+            response = await ac.get(url, headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in response.headers
+
+
+async def test_compresses_stream_by_parts():
+    async with AsyncClient(app=app, base_url="http://test") as ac:
+        async with ac.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            assert response.headers["content-encoding"] == "gzip"
+            assert "content-length" not in response.headers
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    assert gzip.decompress(raw).decode() == BODY[:2000] * 3
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from app.dao.session import get_session, request_session
+from app.database import engine
+from app.hotels.dao import HotelDAO
+from app.users.dao import UserDAO
+
+
+@pytest.fixture
+def statements():
+    executed = []
+
+    def on_execute(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+async def test_load_many():
+    hotels = await HotelDAO.load_many([3, 1, 100500, 3])
+    assert [hotel and hotel["id"] for hotel in hotels] == [3, 1, None, 3]
+    assert await HotelDAO.load_many([]) == []
+
+
+async def test_find_by_id_is_batched_in_request(statements):
+    async with request_session():
+        hotels = await asyncio.gather(
+            *[HotelDAO.find_one_or_none(id=hotel_id) for hotel_id in (1, 2, 1, 100500)],
+            UserDAO.find_one_or_none(id=1),
+        )
+    # Поиски отелей объединены в один запрос, пользователь загружен отдельным
+    assert [hotel and hotel["id"] for hotel in hotels] == [1, 2, 1, None, 1]
+    selects = [statement for statement in statements if statement.startswith("SELECT")]
+    assert len(selects) == 2
+    assert any("hotels.id = ANY" in statement for statement in selects)
+
+
+async def test_nested_find_by_id_does_not_wait_for_loader():
+    async with request_session():
+        async with get_session():
+            # Задача уже владеет сессией запроса: поиск выполняется сразу, без загрузчика
+            hotel = await HotelDAO.find_one_or_none(id=1)
+    assert hotel["id"] == 1
@@ -0,0 +1,40 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from app.bookings.dao import BookingDAO
+from app.dao.session import request_session
+from app.database import engine
+from app.users.dao import UserDAO
+
+
+@pytest.fixture
+def connections():
+    # В тестах используется NullPool, поэтому каждая выдача соединения — новое подключение
+    opened = []
+
+    def on_connect(*args):
+        opened.append(1)
+
+    event.listen(engine.sync_engine, "connect", on_connect)
+    yield opened
+    event.remove(engine.sync_engine, "connect", on_connect)
+
+
+async def test_dao_calls_without_request_session(connections):
+    user = await UserDAO.find_one_or_none(email="test@test.com")
+    await BookingDAO.find_all(user_id=user["id"])
+    assert len(connections) == 2
+
+
+async def test_dao_calls_share_request_session(connections):
+    async with request_session():
+        user = await UserDAO.find_one_or_none(email="test@test.com")
+        await BookingDAO.find_all(user_id=user["id"])
+        # Параллельные вызовы внутри запроса выполняются по очереди в той же сессии
+        users = await asyncio.gather(
+            *[UserDAO.find_one_or_none(id=user["id"]) for _ in range(3)]
+        )
+    assert all(found["email"] == user["email"] for found in users)
+    assert len(connections) == 1
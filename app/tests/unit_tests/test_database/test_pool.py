@@ -0,0 +1,30 @@
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.database import InstrumentedPool
+
+
+def checkout_count():
+    return REGISTRY.get_sample_value("db_pool_checkout_seconds_count") or 0
+
+
+async def test_instrumented_pool_pgbouncer_mode():
+    # Те же параметры, что и в DEV/PROD при DB_PGBOUNCER=true, но на тестовой базе
+    engine = create_async_engine(
+        settings.TEST_DATABASE_URL,
+        poolclass=InstrumentedPool,
+        pool_size=2,
+        max_overflow=0,
+        connect_args={"statement_cache_size": 0, "prepared_statement_cache_size": 0},
+    )
+    checkouts = checkout_count()
+    try:
+        async with engine.connect() as conn:
+            assert engine.pool.checkedout() == 1
+            assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+        assert engine.pool.checkedout() == 0
+        assert checkout_count() == checkouts + 1
+    finally:
+        await engine.dispose()
@@ -1,5 +1,8 @@
 import pytest
+from sqlalchemy.exc import IntegrityError
 
+from app.bookings.dao import BookingDAO
+from app.exceptions import UpsertIsNotSupported
 from app.hotels.dao import HotelDAO
 
 
@@ -16,3 +19,81 @@ async def test_find_user_by_id(hotel_id, is_present):
         assert hotel["id"] == hotel_id
     else:
         assert not hotel
+
+
+async def test_upsert_bulk():
+    hotels = [
+        {"name": "Upsert", "location": f"Upsert, {i}", "services": ["Wi-Fi"], "rooms_quantity": 5}
+        for i in range(3)
+    ]
+    assert await HotelDAO.upsert_bulk(hotels) == {"inserted": 3, "updated": 0, "skipped": 0}
+    # Повторная загрузка тех же данных ничего не меняет
+    assert await HotelDAO.upsert_bulk(hotels) == {"inserted": 0, "updated": 0, "skipped": 3}
+
+    hotels[0]["services"] = ["Wi-Fi", "Парковка"]
+    hotels[1]["rooms_quantity"] = 6
+    assert await HotelDAO.upsert_bulk(hotels) == {"inserted": 0, "updated": 2, "skipped": 1}
+    hotel = await HotelDAO.find_one_or_none(location="Upsert, 0")
+    assert hotel["services"] == ["Wi-Fi", "Парковка"]
+
+    await HotelDAO.delete(name="Upsert")
+
+
+async def test_upsert_bulk_in_chunks():
+    hotels = [
+        {"name": "Upsert", "location": f"Upsert, {i}", "services": [], "rooms_quantity": i}
+        for i in range(5)
+    ]
+    # Повтор ключа в данных загружается один раз (последней строкой)
+    counts = await HotelDAO.upsert_bulk(hotels, {**hotels[0], "rooms_quantity": 9}, chunk_size=2)
+    assert counts == {"inserted": 5, "updated": 0, "skipped": 1}
+    assert (await HotelDAO.find_one_or_none(location="Upsert, 0"))["rooms_quantity"] == 9
+
+    await HotelDAO.delete(name="Upsert")
+
+
+async def test_upsert_bulk_requires_natural_key():
+    with pytest.raises(UpsertIsNotSupported):
+        await BookingDAO.upsert_bulk({"room_id": 1})
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+async def test_add_bulk_returns_all_ids(concurrency):
+    hotels = [
+        {"name": "Bulk", "location": f"Bulk, {i}", "services": [], "rooms_quantity": i}
+        for i in range(7)
+    ]
+    ids = await HotelDAO.add_bulk(
+        hotels[:2], *hotels[2:], chunk_size=3, concurrency=concurrency
+    )
+
+    assert len(ids) == 7
+    for hotel_id, hotel in zip(ids, hotels):
+        assert (await HotelDAO.find_one_or_none(id=hotel_id))["location"] == hotel["location"]
+    assert await HotelDAO.add_bulk([]) == []
+
+    await HotelDAO.delete(name="Bulk")
+
+
+async def test_add_bulk_raises():
+    hotel = {"name": "Bulk", "location": "Bulk", "services": [], "rooms_quantity": 1}
+    # Второй отель нарушает уникальность (name, location): не вставляется ни один
+    with pytest.raises(IntegrityError):
+        await HotelDAO.add_bulk(hotel, hotel, chunk_size=1)
+    assert not await HotelDAO.find_one_or_none(location="Bulk")
+
+
+async def test_add_bulk_concurrent_raises_after_all_chunks():
+    hotels = [
+        {"name": "Bulk", "location": f"Bulk, {i}", "services": [], "rooms_quantity": 1}
+        for i in range(7)
+    ]
+    hotels[1] = hotels[0]
+    # Порции фиксируются независимо: ошибка второй не отменяет остальные,
+    # и к моменту исключения все они уже завершены
+    with pytest.raises(IntegrityError):
+        await HotelDAO.add_bulk(hotels, chunk_size=1, concurrency=3)
+    for i in [0, *range(2, 7)]:
+        assert await HotelDAO.find_one_or_none(location=f"Bulk, {i}")
+
+    await HotelDAO.delete(name="Bulk")
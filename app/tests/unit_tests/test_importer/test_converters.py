@@ -0,0 +1,58 @@
+from datetime import date
+
+import pytest
+
+from app.bookings.models import Bookings
+from app.exceptions import CannotProcessCSV, IncorrectCSVValue
+from app.hotels.models import Hotels
+from app.hotels.rooms.models import Rooms
+from app.importer.converters import CSVRowConverter
+
+
+def test_values_follow_column_types():
+    converter = CSVRowConverter(
+        Hotels, ["name", "location", "services", "rooms_quantity", "image_id"]
+    )
+    rows = converter.convert_dicts([
+        ["1905", "Улица 1", "['Wi-Fi', 'Парковка']", "-3", ""],
+        ["Отель", "Улица 2", "[]", "10", "7"],
+    ])
+    # Числовое название остается строкой, отрицательное число становится int,
+    # пустая ячейка необязательной колонки — NULL
+    assert rows == [
+        {"name": "1905", "location": "Улица 1", "services": ["Wi-Fi", "Парковка"],
+         "rooms_quantity": -3, "image_id": None},
+        {"name": "Отель", "location": "Улица 2", "services": [],
+         "rooms_quantity": 10, "image_id": 7},
+    ]
+
+
+def test_copy_records():
+    converter = CSVRowConverter(
+        Bookings, ["room_id", "user_id", "date_from", "date_to", "price"], for_copy=True
+    )
+    assert converter.convert_batch([["1", "2", "2033-06-15", "2033-06-30", "24500"]]) == [
+        (1, 2, date(2033, 6, 15), date(2033, 6, 30), 24500)
+    ]
+    converter = CSVRowConverter(Rooms, ["hotel_id", "services"], for_copy=True)
+    assert converter.convert_batch([["1", "['Wi-Fi']"]]) == [(1, '["Wi-Fi"]')]
+
+
+@pytest.mark.parametrize("rows,line,column", [
+    ([["1", "1", "2033-06-15", "2033-06-30", "100"],
+      ["1", "1", "2033-06-15", "2033-06-31", "100"]], 11, "date_to"),
+    ([["1", "1", "2033-06-15", "2033-06-30", ""]], 10, "price"),
+    ([["1", "1", "2033-06-15", "2033-06-30"]], 10, None),
+])
+def test_incorrect_value_reports_line_and_column(rows, line, column):
+    converter = CSVRowConverter(Bookings, ["room_id", "user_id", "date_from", "date_to", "price"])
+    with pytest.raises(IncorrectCSVValue) as error:
+        converter.convert_batch(rows, first_line=10)
+    assert (error.value.line, error.value.column) == (line, column)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize("columns", [[], ["unknown"], ["total_cost"]])
+def test_unknown_or_computed_columns(columns):
+    with pytest.raises(CannotProcessCSV):
+        CSVRowConverter(Bookings, columns)
@@ -0,0 +1,62 @@
+import numpy as np
+
+from app.inventory.capacity import find_overbooked
+
+
+def brute_force(room_ids, days_from, days_to, occupancy, quantities):
+    capacity = dict(quantities.tolist())
+    booked = {}
+    for room_id, day, count in occupancy.tolist():
+        booked[room_id, day] = booked.get((room_id, day), 0) + count
+    for room_id, day_from, day_to in zip(room_ids, days_from, days_to):
+        for day in range(day_from, day_to):
+            booked[room_id, day] = booked.get((room_id, day), 0) + 1
+    return [
+        index
+        for index, (room_id, day_from, day_to) in enumerate(zip(room_ids, days_from, days_to))
+        if any(booked[room_id, day] > capacity.get(room_id, 0) for day in range(day_from, day_to))
+    ]
+
+
+def test_overbooked_with_existing_occupancy():
+    # Номер 1 — 2 места, в день 3 одно уже занято; номер 2 — 1 место
+    room_ids = np.array([1, 1, 1, 2, 2, 3])
+    days_from = np.array([0, 0, 3, 0, 2, 0])
+    days_to = np.array([2, 3, 5, 2, 4, 0])
+    occupancy = np.array([[1, 3, 1]])
+    quantities = np.array([[1, 2], [2, 1]])
+
+    overbooked = find_overbooked(room_ids, days_from, days_to, occupancy, quantities)
+    # Дни 0-1 номера 1 заняты ровно двумя бронированиями, а в день 3 занятость 2 из 2;
+    # брони номера 2 не пересекаются (выезд в день заезда), бронь без ночей не учитывается
+    assert overbooked.tolist() == []
+
+    occupancy = np.array([[1, 3, 2], [2, 2, 1]])
+    overbooked = find_overbooked(room_ids, days_from, days_to, occupancy, quantities)
+    assert overbooked.tolist() == [2, 4]
+
+
+def test_unknown_room_has_no_capacity():
+    overbooked = find_overbooked(
+        np.array([7]), np.array([0]), np.array([1]),
+        np.empty((0, 3), dtype=np.int64), np.empty((0, 2), dtype=np.int64),
+    )
+    assert overbooked.tolist() == [0]
+
+
+def test_matches_brute_force():
+    rng = np.random.default_rng(15)
+    for _ in range(50):
+        count = int(rng.integers(1, 60))
+        room_ids = rng.integers(1, 6, count)
+        days_from = rng.integers(0, 20, count)
+        days_to = days_from + rng.integers(0, 6, count)
+        occupancy = np.column_stack([
+            rng.integers(1, 6, 10), rng.integers(0, 25, 10), rng.integers(0, 3, 10)
+        ])
+        quantities = np.column_stack([np.arange(1, 5), rng.integers(1, 6, 4)])
+
+        overbooked = find_overbooked(room_ids, days_from, days_to, occupancy, quantities)
+        assert overbooked.tolist() == brute_force(
+            room_ids.tolist(), days_from.tolist(), days_to.tolist(), occupancy, quantities
+        )
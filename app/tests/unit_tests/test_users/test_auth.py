@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+from prometheus_client import REGISTRY
+
+from app.users.auth import get_password_hash, verify_password
+
+
+async def test_password_hashing_does_not_block_event_loop():
+    hashed = await get_password_hash("secret")
+    gaps = []
+
+    async def ticker():
+        last = time.perf_counter()
+        while True:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    ticking = asyncio.create_task(ticker())
+    results = await asyncio.gather(
+        verify_password("secret", hashed),
+        verify_password("wrong", hashed),
+        verify_password("secret", hashed),
+    )
+    ticking.cancel()
+
+    assert results == [True, False, True]
+    # Каждая проверка bcrypt занимает сотни миллисекунд, но event loop продолжает работать
+    assert max(gaps) < 0.1
+    assert REGISTRY.get_sample_value("password_hash_queue_depth") == 0
@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import select
+
+from app.database import async_session_maker
+from app.exceptions import UserIsNotPresentException
+from app.users.auth import create_access_token
+from app.users.cache import TokenMemo, verified_tokens
+from app.users.dao import UserDAO
+from app.users.dependencies import get_current_user
+from app.users.models import Users
+
+
+def test_token_memo_expires():
+    memo = TokenMemo(max_entries=2)
+    memo.add("a", 1, time.time() + 60)
+    memo.add("b", 2, time.time() - 1)
+    memo.add("c", 3, time.time() + 60)
+
+    assert memo.get("a") is None  # вытеснен самым старым
+    assert memo.get("b") is None  # срок действия истек
+    assert memo.get("c") == 3
+
+
+async def test_current_user_is_cached(monkeypatch):
+    user = await UserDAO.find_one_or_none(email="test@test.com")
+    token = create_access_token({"sub": str(user["id"])})
+    assert (await get_current_user(token)).email == "test@test.com"
+    assert verified_tokens.get(token) == user["id"]
+
+    async def no_db(**filter_by):
+        raise AssertionError("user must be served from cache")
+
+    monkeypatch.setattr(UserDAO, "find_one_or_none", no_db)
+    assert (await get_current_user(token)).id == user["id"]
+
+
+async def test_user_changes_invalidate_cache():
+    await UserDAO.add(email="cached@user.com", hashed_password="hash")
+    user = await UserDAO.find_one_or_none(email="cached@user.com")
+    token = create_access_token({"sub": str(user["id"])})
+    assert (await get_current_user(token)).email == "cached@user.com"
+
+    # Изменение через ORM, как в админке
+    async with async_session_maker() as session:
+        orm_user = (await session.execute(select(Users).filter_by(id=user["id"]))).scalar_one()
+        orm_user.email = "renamed@user.com"
+        await session.commit()
+    await asyncio.sleep(0.1)
+    assert (await get_current_user(token)).email == "renamed@user.com"
+
+    await UserDAO.delete(id=user["id"])
+    assert await UserDAO.find_one_or_none(id=user["id"]) is None
+    with pytest.raises(UserIsNotPresentException):
+        await get_current_user(token)
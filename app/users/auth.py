@@ -1,3 +1,6 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import jwt
 from passlib.context import CryptContext
@@ -5,24 +8,57 @@ from pydantic import EmailStr
 
 from app.config import settings
 from app.exceptions import IncorrectEmailOrPasswordException
+from app.prometheus.metrics import PASSWORD_HASH_QUEUE, PASSWORD_HASH_SECONDS
 from app.users.dao import UserDAO
 
 # Настройка контекста для хеширования паролей
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt занимает процессор на десятки миллисекунд и освобождает GIL,
+# поэтому выполняется в отдельных потоках, а не в event loop
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
 
-def get_password_hash(password: str) -> str:
+
+async def run_password_hashing(operation: str, func, *args):
+    """
+    Выполняет операцию bcrypt в пуле потоков. Пока все потоки заняты,
+    операция ждет в очереди (ее глубина — метрика password_hash_queue_depth).
+    """
+    started = time.perf_counter()
+    running = False
+
+    def run():
+        nonlocal running
+        running = True
+        PASSWORD_HASH_QUEUE.dec()
+        return func(*args)
+
+    PASSWORD_HASH_QUEUE.inc()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, run)
+    finally:
+        if not running:
+            # Запрос отменен до начала операции: она не выполнится и не покинет очередь сама
+            PASSWORD_HASH_QUEUE.dec()
+        PASSWORD_HASH_SECONDS.labels(operation).observe(time.perf_counter() - started)
+
+
+async def get_password_hash(password: str) -> str:
     """
     Хеширует пароль с использованием bcrypt.
     """
-    return pwd_context.hash(password)
+    return await run_password_hashing("hash", pwd_context.hash, password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Проверяет, совпадает ли введенный пароль с хешированным паролем.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await run_password_hashing(
+        "verify", pwd_context.verify, plain_password, hashed_password
+    )
 
 
 def create_access_token(data: dict) -> str:
@@ -46,6 +82,6 @@ async def authenticate_user(email: EmailStr, password: str):
     Возвращает объект пользователя, если аутентификация успешна, иначе вызывает исключение.
     """
     user = await UserDAO.find_one_or_none(email=email)
-    if not (user and verify_password(password, user.hashed_password)):
+    if not (user and await verify_password(password, user.hashed_password)):
         raise IncorrectEmailOrPasswordException
     return user
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.cache.search import SearchCache
+from app.config import settings
+from app.users.models import Users
+
+# Пользователи по id. В Redis хранятся, только если это явно разрешено настройкой
+users_cache = SearchCache(
+    "users",
+    ttl=settings.USER_CACHE_TTL,
+    stale_ttl=0,
+    max_entries=10_000,
+    shared=settings.USER_CACHE_REDIS,
+)
+
+
+async def invalidate_users(user_ids: Iterable[int]):
+    """Сбрасывает пользователей в кэше всех воркеров после изменения их записей."""
+    await users_cache.invalidate_keys([users_cache.key(user_id) for user_id in user_ids])
+
+
+# Изменения пользователей через ORM (админка) сбрасывают кэш после фиксации транзакции
+_invalidations: Set[asyncio.Task] = set()
+
+
+@event.listens_for(Users, "after_update")
+@event.listens_for(Users, "after_delete")
+def remember_changed_user(mapper, connection, target):
+    object_session(target).info.setdefault("changed_users", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_changed_users(session):
+    user_ids = session.info.pop("changed_users", None)
+    if user_ids:
+        task = asyncio.get_running_loop().create_task(invalidate_users(user_ids))
+        _invalidations.add(task)
+        task.add_done_callback(_invalidations.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_changed_users(session):
+    session.info.pop("changed_users", None)
+
+
+class TokenMemo:
+    """
+    Уже проверенные JWT токены: токен -> (id пользователя, exp). Повторные запросы
+    с тем же токеном не проверяют подпись заново до истечения его срока действия.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._tokens: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[int]:
+        entry = self._tokens.get(token)
+        if entry is None:
+            return None
+        user_id, expire = entry
+        if expire <= time.time():
+            # Просроченный токен проверяется заново и отклоняется jwt.decode
+            del self._tokens[token]
+            return None
+        self._tokens.move_to_end(token)
+        return user_id
+
+    def add(self, token: str, user_id: int, expire: float):
+        self._tokens[token] = (user_id, expire)
+        self._tokens.move_to_end(token)
+        while len(self._tokens) > self.max_entries:
+            self._tokens.popitem(last=False)
+
+
+verified_tokens = TokenMemo()
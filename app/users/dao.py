@@ -1,4 +1,8 @@
+from sqlalchemy import delete
+
 from app.dao.base import BaseDAO
+from app.dao.session import get_session
+from app.users.cache import invalidate_users
 from app.users.models import Users
 
 class UserDAO(BaseDAO):
@@ -6,3 +10,14 @@ class UserDAO(BaseDAO):
     Data Access Object для работы с моделью Users.
     """
     model = Users
+
+    @classmethod
+    async def delete(cls, **filter_by):
+        """
+        Удаляет пользователей и сбрасывает их записи в кэше пользователей.
+        """
+        async with get_session() as session:
+            query = delete(Users).filter_by(**filter_by).returning(Users.id)
+            user_ids = (await session.execute(query)).scalars().all()
+            await session.commit()
+        await invalidate_users(user_ids)
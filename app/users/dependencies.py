@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import Depends, Request
 from jose import ExpiredSignatureError, JWTError, jwt
 
@@ -8,7 +10,9 @@ from app.exceptions import (
     TokenExpiredException,
     UserIsNotPresentException,
 )
+from app.users.cache import users_cache, verified_tokens
 from app.users.dao import UserDAO
+from app.users.schemas import SUser
 
 
 def get_token(request: Request):
@@ -21,25 +25,43 @@ def get_token(request: Request):
     return token
 
 
+async def get_cached_user(user_id: int) -> Optional[SUser]:
+    """
+    Возвращает пользователя из кэша или из базы. Отсутствующий пользователь
+    тоже кэшируется, чтобы токены удаленных пользователей не нагружали базу.
+    """
+    async def load_user():
+        user = await UserDAO.find_one_or_none(id=user_id)
+        return dict(user) if user else None
+
+    user = await users_cache.get_or_load(users_cache.key(user_id), load_user)
+    return SUser.parse_obj(user) if user else None
+
+
 async def get_current_user(token: str = Depends(get_token)):
     """
     Получает текущего пользователя, проверяя токен.
     Если токен недействителен или пользователь не найден, вызывается соответствующее исключение.
+    Проверенные токены и пользователи кэшируются (см. app/users/cache.py).
     """
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-    except ExpiredSignatureError:
-        raise TokenExpiredException
-    except JWTError:
-        raise IncorrectTokenFormatException
-
-    user_id: str = payload.get("sub")
-    if not user_id:
-        raise UserIsNotPresentException
+    user_id = verified_tokens.get(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+        except ExpiredSignatureError:
+            raise TokenExpiredException
+        except JWTError:
+            raise IncorrectTokenFormatException
+
+        if not payload.get("sub"):
+            raise UserIsNotPresentException
+        user_id = int(payload["sub"])
+        if payload.get("exp"):
+            verified_tokens.add(token, user_id, payload["exp"])
 
-    user = await UserDAO.find_one_or_none(id=int(user_id))
+    user = await get_cached_user(user_id)
     if not user:
         raise UserIsNotPresentException
 
@@ -30,7 +30,7 @@ async def register_user(user_data: SUserAuth):  # Ожидает данные п
         raise UserAlreadyExistsException  # Выбрасываем исключение
 
     # Хешируем пароль пользователя перед сохранением
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     # Сохраняем нового пользователя в базе данных
     new_user = await UserDAO.add(email=user_data.email, hashed_password=hashed_password)
     if not new_user:  # Если не удалось добавить пользователя
@@ -3,3 +3,12 @@ from pydantic import BaseModel, EmailStr
 class SUserAuth(BaseModel):
     email: EmailStr
     password: str
+
+
+class SUser(BaseModel):
+    id: int
+    email: str
+    hashed_password: str
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,62 @@
+"""
+Бенчмарк BaseDAO.add_bulk: вставка номеров порциями через executemany
+(insertmanyvalues) в одной транзакции и параллельно на нескольких соединениях.
+
+Для каждого размера из --sizes в новый отель вставляется столько номеров,
+выводятся время и скорость: при линейном масштабировании скорость
+не падает с ростом числа строк. Созданные данные удаляются после замера.
+
+Запуск (из корня проекта):
+    python -m benchmarks.add_bulk --sizes 10000 20000 40000 --concurrency 4
+"""
+import argparse
+import asyncio
+import time
+
+from app.hotels.dao import HotelDAO
+from app.hotels.rooms.dao import RoomDAO
+from benchmarks.csv_import import PREFIX, cleanup
+
+def rooms(count: int, hotel_id: int, start: int):
+    return [
+        {
+            "hotel_id": hotel_id, "name": f"Номер {i}", "description": "", "price": 5000,
+            "services": ["Wi-Fi"], "quantity": 10, "image_id": 1,
+        }
+        for i in range(start, start + count)
+    ]
+
+
+async def main(args):
+    # Отель с префиксом бенчмарка: cleanup удалит его вместе с номерами
+    [hotel_id] = await HotelDAO.add_bulk({
+        "name": f"{PREFIX}add-bulk", "location": "Бенчмарк", "services": [],
+        "rooms_quantity": 1, "image_id": 1,
+    })
+    start = 0
+    try:
+        for size in args.sizes:
+            for concurrency in sorted({1, args.concurrency}):
+                data = rooms(size, hotel_id, start)
+                start += size
+                started = time.perf_counter()
+                ids = await RoomDAO.add_bulk(
+                    data, chunk_size=args.chunk_size, concurrency=concurrency
+                )
+                elapsed = time.perf_counter() - started
+                assert len(ids) == size
+                print(
+                    f"строк={size:>7}  concurrency={concurrency}  {elapsed:6.2f} с  "
+                    f"{size / elapsed:>8.0f} строк/с"
+                )
+    finally:
+        await cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 20_000, 40_000])
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Размер порции (по умолчанию DB_BULK_INSERT_CHUNK_SIZE)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
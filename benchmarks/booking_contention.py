@@ -0,0 +1,216 @@
+"""
+Бенчмарк конкурентных бронирований одного номера.
+
+Отправляет сотни одновременных POST /api/v1/bookings на один номер сначала
+с прежней реализацией BookingDAO.add (проверка свободных мест, запрос цены
+и вставка — три запроса без блокировок), затем с текущей и сравнивает задержки
+(p50, p99) и превышение Rooms.quantity. Занятость пересчитывается напрямую
+по таблице bookings, а не по room_inventory_daily. Завершается с кодом 1,
+если текущая реализация допустила овербукинг или ее p99 выше прежнего.
+
+Запросы обрабатываются приложением в этом же процессе. В режиме TEST движок
+работает без пула (NullPool) и задержки определяются установкой соединений,
+поэтому запускать стоит с пулом, направив основную базу на тестовую.
+С --direct BookingDAO.add вызывается напрямую: задержки не включают
+обработку HTTP-запроса, одинаковую для обеих реализаций.
+    MODE=DEV DB_NAME=booking_test DB_POOL_SIZE=10 \\
+        python -m benchmarks.booking_contention --room-id 1 --requests 300 --concurrency 100
+    MODE=DEV DB_NAME=booking_test DB_POOL_SIZE=10 \\
+        python -m benchmarks.booking_contention --room-id 1 --requests 300 --direct
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from httpx import AsyncClient
+from sqlalchemy import and_, delete, func, insert, or_, select
+
+from app.bookings.dao import BookingDAO
+from app.bookings.models import Bookings
+from app.database import async_session_maker
+from app.exceptions import RoomFullyBooked
+from app.hotels.rooms.models import Rooms
+from app.inventory.dao import RoomInventoryDAO
+from app.main import app
+
+EMAIL = "contention@bench.com"
+PASSWORD = "contention"
+
+
+async def legacy_add(cls, user_id: int, room_id: int, date_from: date, date_to: date):
+    """
+    Прежняя реализация BookingDAO.add: три запроса и проверка без блокировок.
+    Как и до появления room_inventory_daily, занятость по дням не обновляется
+    (после замера она пересобирается по таблице bookings).
+    """
+    async with async_session_maker() as session:
+        booked_rooms = (
+            select(Bookings)
+            .where(
+                and_(
+                    Bookings.room_id == room_id,
+                    or_(
+                        and_(Bookings.date_from >= date_from, Bookings.date_from <= date_to),
+                        and_(Bookings.date_from <= date_from, Bookings.date_to > date_from),
+                    ),
+                )
+            )
+            .cte("booked_rooms")
+        )
+        get_rooms_left = (
+            select((Rooms.quantity - func.count(booked_rooms.c.room_id)).label("rooms_left"))
+            .select_from(Rooms)
+            .join(booked_rooms, booked_rooms.c.room_id == Rooms.id, isouter=True)
+            .where(Rooms.id == room_id)
+            .group_by(Rooms.quantity, booked_rooms.c.room_id)
+        )
+        rooms_left = (await session.execute(get_rooms_left)).scalar()
+        if rooms_left <= 0:
+            raise RoomFullyBooked
+        price = (await session.execute(select(Rooms.price).filter_by(id=room_id))).scalar()
+        new_booking = await session.execute(
+            insert(Bookings)
+            .values(
+                room_id=room_id,
+                user_id=user_id,
+                date_from=date_from,
+                date_to=date_to,
+                price=price,
+            )
+            .returning(
+                Bookings.id,
+                Bookings.user_id,
+                Bookings.room_id,
+                Bookings.date_from,
+                Bookings.date_to,
+            )
+        )
+        await session.commit()
+        return new_booking.mappings().one()
+
+
+async def max_overbooking(room_id: int, date_from: date, date_to: date) -> int:
+    """Максимальное превышение Rooms.quantity по дням, посчитанное по таблице bookings."""
+    occupancy = RoomInventoryDAO.expected_occupancy(date_from, date_to).subquery()
+    query = (
+        select(func.coalesce(func.max(occupancy.c.booked - Rooms.quantity), 0))
+        .select_from(occupancy)
+        .join(Rooms, Rooms.id == occupancy.c.room_id)
+        .where(occupancy.c.room_id == room_id)
+    )
+    async with async_session_maker() as session:
+        return (await session.execute(query)).scalar()
+
+
+async def run(client: AsyncClient, user_id: int, args, legacy: bool) -> dict:
+    """Одновременные бронирования с выбранной реализацией; после замера данные удаляются."""
+    atomic_add = BookingDAO.add
+    if legacy:
+        BookingDAO.add = classmethod(legacy_add)
+
+    date_from = date.fromisoformat(args.date_from)
+    date_to = date_from + timedelta(days=args.nights)
+    window_to = date_to + timedelta(days=args.nights)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, statuses = [], []
+
+    async def book(i: int):
+        # Сдвигаем даты, чтобы периоды пересекались частично, а не только полностью
+        shift = timedelta(days=i % args.nights)
+        async with semaphore:
+            start = time.perf_counter()
+            if args.direct:
+                try:
+                    await BookingDAO.add(
+                        user_id, args.room_id, date_from + shift, date_to + shift
+                    )
+                    status = 201
+                except RoomFullyBooked:
+                    status = 409
+            else:
+                response = await client.post("/api/v1/bookings", json={
+                    "room_id": args.room_id,
+                    "date_from": str(date_from + shift),
+                    "date_to": str(date_to + shift),
+                })
+                status = response.status_code
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses.append(status)
+
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(*[book(i) for i in range(args.requests)])
+        elapsed = time.perf_counter() - started
+    finally:
+        BookingDAO.add = atomic_add
+
+    latencies.sort()
+    overbooked = await max_overbooking(args.room_id, date_from, window_to)
+
+    async with async_session_maker() as session:
+        await session.execute(
+            delete(Bookings).where(
+                Bookings.room_id == args.room_id,
+                Bookings.date_from >= date_from,
+                Bookings.date_from < window_to,
+            )
+        )
+        await session.commit()
+    await RoomInventoryDAO.rebuild(date_from, window_to)
+
+    return {
+        "elapsed": elapsed,
+        "statuses": {status: statuses.count(status) for status in sorted(set(statuses))},
+        "p50": statistics.median(latencies),
+        "p99": latencies[max(int(len(latencies) * 0.99) - 1, 0)],
+        "overbooked": overbooked,
+    }
+
+
+async def main(args):
+    async with AsyncClient(app=app, base_url="http://bench") as client:
+        await client.post("/api/v1/auth/register", json={"email": EMAIL, "password": PASSWORD})
+        response = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        response.raise_for_status()
+        user_id = (await client.get("/api/v1/users/me")).json()["id"]
+
+        # Прогрев: соединения пула и кэши SQLAlchemy, чтобы не учитывать их в первом замере
+        warmup = argparse.Namespace(**{**vars(args), "requests": args.concurrency})
+        await run(client, user_id, warmup, False)
+
+        results = {}
+        for name, legacy in (("legacy", True), ("atomic", False)):
+            results[name] = [await run(client, user_id, args, legacy) for _ in range(args.rounds)]
+
+    print(f"Запросов: {args.requests}, параллельно: {args.concurrency}, повторов: {args.rounds}")
+    for name, rounds in results.items():
+        for result in rounds:
+            print(
+                f"{name:>6}: {result['elapsed']:.2f} с  {result['statuses']}  "
+                f"p50={result['p50']:.1f} ms  p99={result['p99']:.1f} ms  "
+                f"превышение Rooms.quantity: {result['overbooked']}"
+            )
+    legacy_p99 = statistics.median(result["p99"] for result in results["legacy"])
+    atomic_p99 = statistics.median(result["p99"] for result in results["atomic"])
+    print(f"Медиана p99: legacy {legacy_p99:.1f} ms, atomic {atomic_p99:.1f} ms")
+
+    if any(result["overbooked"] > 0 for result in results["atomic"]) or atomic_p99 > legacy_p99:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--room-id", type=int, required=True)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--date-from", default="2035-01-01")
+    parser.add_argument("--nights", type=int, default=7)
+    parser.add_argument("--rounds", type=int, default=3, help="Повторов для каждой реализации")
+    parser.add_argument(
+        "--direct",
+        action="store_true",
+        help="Вызывать BookingDAO.add напрямую, без HTTP, авторизации и middleware",
+    )
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,94 @@
+"""
+Бенчмарк сжатия ответа поиска отелей: байты в сети и процессорное время на запрос
+без сжатия, со сжатием на каждый запрос и с готовым сжатым телом из кэша
+(compressed_pages в app/cache/search.py). brotli замеряется, если пакет установлен.
+
+Скрипт создает --hotels отелей с длинными русскими адресами в общей локации,
+затем запрашивает /api/v1/hotels/{локация}?limit=--hotels внутри процесса (без сети).
+Результат поиска берется из кэша в памяти, поэтому замеряется формирование ответа.
+Тело из кэша сжатых страниц не проверяется схемой и не сериализуется повторно,
+поэтому выигрыш по CPU включает и их (см. также benchmarks/json_response.py).
+Созданные отели удаляются после замера.
+
+Запуск (из корня проекта):
+    python -m benchmarks.compression --hotels 500 --requests 300
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from httpx import AsyncClient
+
+from app.cache.search import compressed_pages
+from app.compression import ENCODINGS
+from app.hotels.dao import HotelDAO
+from app.hotels.rooms.dao import RoomDAO
+from app.logger import logger
+from app.main import app
+from benchmarks.csv_import import PREFIX, cleanup
+
+LOCATION = "Бенчмарк сжатия"
+
+
+async def seed(count: int):
+    hotel_ids = await HotelDAO.add_bulk([
+        {
+            "name": f"{PREFIX}gzip-{i}",
+            "location": f"{LOCATION}, Республика Алтай, Майминский район, село Урлу-Аспак, улица {i}",
+            "services": ["Wi-Fi", "Парковка", "Бассейн", "Тренажёрный зал"],
+            "rooms_quantity": 10, "image_id": 1,
+        }
+        for i in range(count)
+    ])
+    await RoomDAO.add_bulk([
+        {
+            "hotel_id": hotel_id, "name": "Номер", "description": "", "price": 5000,
+            "services": ["Wi-Fi"], "quantity": 10, "image_id": 1,
+        }
+        for hotel_id in hotel_ids
+    ])
+
+
+async def measure(ac: AsyncClient, name: str, params: dict, encoding: str, requests: int,
+                  cached: bool):
+    url = f"/api/v1/hotels/{LOCATION}"
+    headers = {"Accept-Encoding": encoding}
+    # Первый запрос заполняет кэш поиска
+    response = await ac.get(url, params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    wire = response.num_bytes_downloaded
+    cpu_started, started = time.process_time(), time.perf_counter()
+    for _ in range(requests):
+        if not cached:
+            compressed_pages.clear_local()
+        await ac.get(url, params=params, headers=headers)
+    cpu = (time.process_time() - cpu_started) / requests
+    elapsed = time.perf_counter() - started
+    print(f"  {name:<26} {wire:>9} байт  {cpu * 1000:6.2f} мс CPU/запрос  "
+          f"{requests / elapsed:8.1f} запросов/с")
+
+
+async def main(args):
+    # Лог времени каждого запроса исказил бы замер
+    logger.setLevel(logging.WARNING)
+    await seed(args.hotels)
+    params = {"date_from": "2040-01-01", "date_to": "2040-01-10", "limit": args.hotels}
+    try:
+        async with AsyncClient(app=app, base_url="http://bench") as ac:
+            print(f"отелей в ответе: {args.hotels}")
+            await measure(ac, "без сжатия", params, "identity", args.requests, cached=True)
+            for encoding in reversed(ENCODINGS):
+                await measure(ac, f"{encoding} на каждый запрос", params, encoding,
+                              args.requests, cached=False)
+                await measure(ac, f"{encoding} из кэша", params, encoding,
+                              args.requests, cached=True)
+    finally:
+        await cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hotels", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,94 @@
+"""
+Микробенчмарк разбора CSV: прежнее построчное угадывание типов по значениям
+(isdigit, "date" в имени колонки, json.loads для services) против преобразования
+по типам колонок модели, выбранного один раз и применяемого к порции по колонкам.
+
+Файлы из course_helpers размножаются до --rows строк; замеряется только разбор
+в памяти, без базы данных. Прежний путь строит словари, новый — кортежи для COPY.
+
+Запуск (из корня проекта):
+    python -m benchmarks.csv_convert --rows 200000
+"""
+import argparse
+import csv
+import datetime
+import io
+import json
+import time
+from itertools import cycle, islice
+from pathlib import Path
+from typing import Tuple
+
+from app.importer.converters import CSVRowConverter
+from app.importer.copy import CHUNK_SIZE
+from app.importer.utils import TABLE_MODEL_MAP
+from app.users.models import Users  # noqa: F401 — внешний ключ bookings.user_id
+
+COURSE_HELPERS = Path(__file__).resolve().parent.parent / "course_helpers"
+
+
+def legacy_convert_row(row: dict) -> dict:
+    """Прежний convert_csv_row из app/importer/utils.py."""
+    for k, v in row.items():
+        if v.isdigit():
+            row[k] = int(v)
+        elif k == "services":
+            row[k] = json.loads(v.replace("'", '"'))
+        elif "date" in k:
+            row[k] = datetime.datetime.strptime(v, "%Y-%m-%d")
+    return row
+
+
+def scaled_csv(table: str, rows: int) -> str:
+    with open(COURSE_HELPERS / f"{table}.csv", encoding="utf-8") as file:
+        header, *body = file.read().splitlines()
+    return "\n".join([header, *islice(cycle(body), rows)]) + "\n"
+
+
+def bench_legacy(content: str) -> Tuple[float, float]:
+    started = time.perf_counter()
+    rows = list(csv.DictReader(io.StringIO(content), delimiter=";"))
+    parsed = time.perf_counter()
+    for row in rows:
+        legacy_convert_row(row)
+    return time.perf_counter() - started, time.perf_counter() - parsed
+
+
+def bench_schema(table: str, content: str) -> Tuple[float, float]:
+    started = time.perf_counter()
+    reader = csv.reader(io.StringIO(content), delimiter=";")
+    converter = CSVRowConverter(TABLE_MODEL_MAP[table].model, next(reader), for_copy=True)
+    converting = 0.0
+    while True:
+        rows = list(islice(reader, CHUNK_SIZE))
+        if not rows:
+            break
+        parsed = time.perf_counter()
+        converter.convert_batch(rows)
+        converting += time.perf_counter() - parsed
+    return time.perf_counter() - started, converting
+
+
+def report(name: str, rows: int, legacy: float, schema: float):
+    print(
+        f"  {name:<22} прежний: {rows / legacy:>9.0f} строк/с  "
+        f"по схеме: {rows / schema:>9.0f} строк/с  ускорение: {legacy / schema:4.1f}x"
+    )
+
+
+def main(args):
+    for table in TABLE_MODEL_MAP:
+        content = scaled_csv(table, args.rows)
+        legacy = [bench_legacy(content) for _ in range(args.repeat)]
+        schema = [bench_schema(table, content) for _ in range(args.repeat)]
+        print(table)
+        report("с разбором csv", args.rows, min(t for t, _ in legacy), min(t for t, _ in schema))
+        report("только преобразование", args.rows,
+               min(t for _, t in legacy), min(t for _, t in schema))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3, help="Повторов, берется лучший")
+    main(parser.parse_args())
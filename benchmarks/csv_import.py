@@ -0,0 +1,214 @@
+"""
+Бенчмарк импорта CSV: потоковый COPY порциями против прежнего пути
+(весь файл в список через исходный convert_csv_to_postgres_format и INSERT через add_bulk).
+
+Скрипт генерирует файлы hotels/rooms/bookings по --rows строк, импортирует их
+в базу из .env и выводит время, скорость и пиковую память процесса.
+Созданные отели помечаются префиксом имени и удаляются вместе с номерами
+и бронированиями после замера (если не указан --keep).
+
+С --upsert файлы отелей и номеров импортируются повторно в режиме upsert:
+неизменные строки пропускаются без записи в таблицы.
+
+Прежний путь держит весь файл в памяти, поэтому для него используется
+--legacy-rows строк.
+
+Запуск (из корня проекта):
+    python -m benchmarks.csv_import --rows 1000000
+    python -m benchmarks.csv_import --rows 1000000 --per-chunk --legacy-rows 4000
+    python -m benchmarks.csv_import --rows 1000000 --upsert --legacy-rows 0
+"""
+import argparse
+import asyncio
+import codecs
+import csv
+import datetime
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+
+from sqlalchemy import delete, func, select, text
+
+from app.bookings.models import Bookings
+from app.database import async_session_maker
+from app.hotels.models import Hotels
+from app.hotels.rooms.models import Rooms
+from app.importer.copy import copy_csv_to_table
+from app.importer.utils import TABLE_MODEL_MAP
+from app.inventory.models import RoomInventoryDaily
+from app.users.models import Users
+
+PREFIX = "bench-import-"
+FIRST_DAY = datetime.date(2040, 1, 1)
+DAYS = 365
+CLEANUP_INDEXES = [
+    ("bench_cleanup_rooms_hotel_id", "rooms", "hotel_id"),
+    ("bench_cleanup_bookings_room_id", "bookings", "room_id"),
+]
+
+
+def write_csv(path: str, header: list, rows):
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file, delimiter=";")
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def hotels_rows(count: int, start: int = 0):
+    for i in range(start, start + count):
+        yield [f"{PREFIX}{i}", f"Бенчмарк, улица {i}", "['Wi-Fi', 'Парковка']", 10, 1]
+
+
+def rooms_rows(count: int, hotel_ids: list, rnd: random.Random, start: int = 0):
+    for i in range(start, start + count):
+        yield [rnd.choice(hotel_ids), f"Номер {i}", "", 5000, "['Wi-Fi']", 10, 1]
+
+
+def bookings_rows(count: int, room_ids: list, user_id: int, rnd: random.Random):
+    for _ in range(count):
+        date_from = FIRST_DAY + datetime.timedelta(days=rnd.randint(0, DAYS))
+        date_to = date_from + datetime.timedelta(days=rnd.randint(1, 14))
+        yield [rnd.choice(room_ids), user_id, date_from, date_to, 5000]
+
+
+def legacy_convert(csv_iterable) -> list:
+    """Прежний convert_csv_to_postgres_format из app/importer/utils.py."""
+    data = []
+    for row in csv_iterable:
+        for k, v in row.items():
+            if v.isdigit():
+                row[k] = int(v)
+            elif k == "services":
+                row[k] = json.loads(v.replace("'", '"'))
+            elif "date" in k:
+                row[k] = datetime.datetime.strptime(v, "%Y-%m-%d")
+        data.append(row)
+    return data
+
+
+def peak_memory_mb() -> float:
+    # ru_maxrss в Linux в килобайтах
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def import_copy(table: str, path: str, atomic: bool) -> int:
+    with open(path, "rb") as file:
+        result = await copy_csv_to_table(TABLE_MODEL_MAP[table].model, file, atomic=atomic)
+    return result["rows"]
+
+
+async def import_upsert(table: str, path: str, atomic: bool) -> int:
+    dao = TABLE_MODEL_MAP[table]
+    with open(path, "rb") as file:
+        result = await copy_csv_to_table(dao.model, file, atomic=atomic, upsert_dao=dao)
+    print(f"         {table}: {result}")
+    return result["rows"]
+
+
+async def import_legacy(table: str, path: str) -> int:
+    with open(path, "rb") as file:
+        reader = csv.DictReader(codecs.iterdecode(file, "utf-8"), delimiter=";")
+        data = legacy_convert(reader)
+    return len(await TABLE_MODEL_MAP[table].add_bulk(data))
+
+
+async def measure(name: str, table: str, coro):
+    started = time.perf_counter()
+    rows = await coro
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<8} {table:<9} строк={rows:>8}  {elapsed:7.2f} с  "
+        f"{rows / elapsed:>9.0f} строк/с  пиковая память={peak_memory_mb():7.1f} МБ"
+    )
+
+
+async def bench_ids(model) -> list:
+    """id созданных бенчмарком отелей или их номеров."""
+    query = select(model.id).where(Hotels.name.startswith(PREFIX))
+    if model is Rooms:
+        query = query.join(Hotels, Rooms.hotel_id == Hotels.id)
+    async with async_session_maker() as session:
+        return (await session.execute(query)).scalars().all()
+
+
+async def cleanup():
+    async with async_session_maker() as session:
+        # Без индексов по внешним ключам проверка ссылок при удалении сотен тысяч строк
+        # квадратична: создаем индексы на время транзакции и удаляем их перед фиксацией
+        for name, table, column in CLEANUP_INDEXES:
+            await session.execute(text(f"CREATE INDEX {name} ON {table} ({column})"))
+        hotel_ids = select(Hotels.id).where(Hotels.name.startswith(PREFIX))
+        room_ids = select(Rooms.id).where(Rooms.hotel_id.in_(hotel_ids))
+        # На номерах бенчмарка только его бронирования, поэтому занятость удаляется целиком
+        await session.execute(
+            delete(RoomInventoryDaily).where(RoomInventoryDaily.room_id.in_(room_ids))
+        )
+        await session.execute(delete(Bookings).where(Bookings.room_id.in_(room_ids)))
+        await session.execute(delete(Rooms).where(Rooms.hotel_id.in_(hotel_ids)))
+        await session.execute(delete(Hotels).where(Hotels.id.in_(hotel_ids)))
+        for name, _, _ in CLEANUP_INDEXES:
+            await session.execute(text(f"DROP INDEX {name}"))
+        await session.commit()
+
+
+async def main(args):
+    rnd = random.Random(42)
+    atomic = not args.per_chunk
+    async with async_session_maker() as session:
+        user_id = (await session.execute(select(func.min(Users.id)))).scalar()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = {table: os.path.join(directory, f"{table}.csv") for table in TABLE_MODEL_MAP}
+        try:
+            print(f"COPY порциями, {'одна транзакция' if atomic else 'транзакция на порцию'}")
+            write_csv(path["hotels"], ["name", "location", "services", "rooms_quantity", "image_id"],
+                      hotels_rows(args.rows))
+            await measure("copy", "hotels", import_copy("hotels", path["hotels"], atomic))
+
+            hotel_ids = await bench_ids(Hotels)
+            write_csv(path["rooms"], ["hotel_id", "name", "description", "price", "services",
+                                      "quantity", "image_id"],
+                      rooms_rows(args.rows, hotel_ids, rnd))
+            await measure("copy", "rooms", import_copy("rooms", path["rooms"], atomic))
+
+            room_ids = await bench_ids(Rooms)
+            write_csv(path["bookings"], ["room_id", "user_id", "date_from", "date_to", "price"],
+                      bookings_rows(args.rows, room_ids, user_id, rnd))
+            await measure("copy", "bookings", import_copy("bookings", path["bookings"], atomic))
+
+            if args.upsert:
+                print("Повторный импорт тех же файлов в режиме upsert (без изменений)")
+                await measure("upsert", "hotels", import_upsert("hotels", path["hotels"], atomic))
+                await measure("upsert", "rooms", import_upsert("rooms", path["rooms"], atomic))
+
+            if args.legacy_rows:
+                print("Прежний путь: список в памяти и INSERT через add_bulk")
+                write_csv(path["hotels"], ["name", "location", "services", "rooms_quantity",
+                                           "image_id"],
+                          hotels_rows(args.legacy_rows, start=args.rows))
+                await measure("add_bulk", "hotels", import_legacy("hotels", path["hotels"]))
+                write_csv(path["rooms"], ["hotel_id", "name", "description", "price", "services",
+                                          "quantity", "image_id"],
+                          rooms_rows(args.legacy_rows, hotel_ids, rnd, start=args.rows))
+                await measure("add_bulk", "rooms", import_legacy("rooms", path["rooms"]))
+                write_csv(path["bookings"], ["room_id", "user_id", "date_from", "date_to", "price"],
+                          bookings_rows(args.legacy_rows, room_ids, user_id, rnd))
+                await measure("add_bulk", "bookings", import_legacy("bookings", path["bookings"]))
+        finally:
+            if not args.keep:
+                await cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=4_000,
+                        help="Строк для прежнего пути (0 — не замерять)")
+    parser.add_argument("--per-chunk", action="store_true", help="Транзакция на каждую порцию")
+    parser.add_argument("--upsert", action="store_true",
+                        help="Повторно импортировать отели и номера в режиме upsert")
+    parser.add_argument("--keep", action="store_true", help="Не удалять импортированные данные")
+    asyncio.run(main(parser.parse_args()))
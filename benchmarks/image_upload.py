@@ -0,0 +1,115 @@
+"""
+Бенчмарк загрузки изображений отелей на фоне обычных запросов к API.
+
+--uploads одновременных клиентов загружают изображения по --size-mb МБ, пока
+отдельный клиент опрашивает /api/v1/hotels/id/1. Сравнивается прежнее сохранение
+(open + shutil.copyfileobj прямо в обработчике, блокирует event loop) с save_image
+(порции в пуле потоков, атомарное переименование). Выводятся время загрузок
+задержки обычных запросов (p50, p99) за то же время и наибольшее время,
+на которое event loop был занят без переключения между задачами.
+
+Запросы выполняются внутри процесса (без сети), тело отправляется порциями
+по 64 КБ, как при получении из сети; разбор multipart в Starlette одинаков
+в обоих вариантах. Изображения пишутся во временный каталог, process_pic не вызывается.
+
+Запуск (из корня проекта):
+    python -m benchmarks.image_upload --uploads 2 --size-mb 64
+"""
+import argparse
+import asyncio
+import logging
+import shutil
+import statistics
+import tempfile
+import time
+
+from httpx import AsyncClient
+
+from app.config import settings
+from app.images import router
+from app.logger import logger
+from app.main import app
+
+
+async def legacy_save_image(file, path: str) -> str:
+    """Прежнее сохранение из add_hotel_image."""
+    with open(path, "wb+") as file_object:
+        shutil.copyfileobj(file, file_object)
+    return "image/png"
+
+
+async def probe(ac: AsyncClient, stop: asyncio.Event, latencies: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await ac.get("/api/v1/hotels/id/1")
+        assert response.status_code == 200, response.text
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+
+
+async def ticker(stop: asyncio.Event, lags: list):
+    # Насколько позже запланированного просыпается задача: время, на которое
+    # event loop был занят без переключения между задачами
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - started - 0.001)
+
+
+async def multipart(content: bytes):
+    # Тело формы порциями: между ними event loop обслуживает другие запросы
+    yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="hotel.png"\r\n\r\n'
+    for start in range(0, len(content), 64 * 1024):
+        yield content[start:start + 64 * 1024]
+        await asyncio.sleep(0)
+    yield b"\r\n--b--\r\n"
+
+
+async def run(ac: AsyncClient, name: str, content: bytes, uploads: int):
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe(ac, stop, latencies))
+    lag_meter = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(
+        ac.post(
+            "/api/v1/images/hotels", params={"name": i}, content=multipart(content),
+            headers={"Content-Type": "multipart/form-data; boundary=b"},
+        )
+        for i in range(uploads)
+    ))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await prober
+    await lag_meter
+    assert all(response.status_code == 200 for response in responses), responses[0].text
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  {name:<22} загрузки: {elapsed:6.2f} с  обычные запросы: {len(latencies):4} шт., "
+          f"p50 {statistics.median(latencies) * 1000:6.1f} мс  p99 {p99 * 1000:6.1f} мс  "
+          f"наибольшая блокировка event loop {max(lags) * 1000:6.1f} мс")
+
+
+async def main(args):
+    # Лог времени каждого запроса исказил бы замер
+    logger.setLevel(logging.WARNING)
+    content = b"\x89PNG\r\n\x1a\n" + b"\0" * (args.size_mb * 1024 * 1024 - 8)
+    settings.IMAGE_UPLOAD_MAX_SIZE = len(content)
+    router.process_pic.delay = lambda path: None
+    with tempfile.TemporaryDirectory() as images_dir:
+        router.IMAGES_DIR = images_dir
+        async with AsyncClient(app=app, base_url="http://bench") as ac:
+            await ac.get("/api/v1/hotels/id/1")
+            save_image = router.save_image
+            router.save_image = legacy_save_image
+            await run(ac, "прежнее сохранение", content, args.uploads)
+            router.save_image = save_image
+            await run(ac, "save_image", content, args.uploads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uploads", type=int, default=2)
+    parser.add_argument("--size-mb", type=int, default=64)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,85 @@
+"""
+Бенчмарк ответа поиска отелей: проверка каждой строки схемой SHotelInfo
+и кодирование стандартным json (по умолчанию) против FAST_JSON_RESPONSES
+(поля схемы из строк DAO без проверки и orjson).
+
+Скрипт создает --hotels отелей с одним номером в общей локации, затем
+запрашивает /api/v1/hotels/{локация}?limit=--hotels внутри процесса (без сети)
+и выводит запросов в секунду на один воркер. Результат поиска берется из кэша
+в памяти, поэтому замеряется в основном формирование ответа.
+Созданные отели удаляются после замера.
+
+Запуск (из корня проекта):
+    python -m benchmarks.json_response --hotels 500 --requests 300
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from httpx import AsyncClient
+
+from app.config import settings
+from app.hotels.dao import HotelDAO
+from app.hotels.rooms.dao import RoomDAO
+from app.logger import logger
+from app.main import app
+from benchmarks.csv_import import PREFIX, cleanup
+
+LOCATION = "Бенчмарк ответа"
+
+
+async def seed(count: int):
+    hotel_ids = await HotelDAO.add_bulk([
+        {
+            "name": f"{PREFIX}json-{i}", "location": f"{LOCATION}, улица {i}",
+            "services": ["Wi-Fi", "Парковка", "Бассейн"], "rooms_quantity": 10, "image_id": 1,
+        }
+        for i in range(count)
+    ])
+    await RoomDAO.add_bulk([
+        {
+            "hotel_id": hotel_id, "name": "Номер", "description": "", "price": 5000,
+            "services": ["Wi-Fi"], "quantity": 10, "image_id": 1,
+        }
+        for hotel_id in hotel_ids
+    ])
+
+
+async def measure(ac: AsyncClient, params: dict, requests: int) -> float:
+    url = f"/api/v1/hotels/{LOCATION}"
+    # Первый запрос заполняет кэш поиска
+    response = await ac.get(url, params=params)
+    assert response.status_code == 200, response.text
+    rows = len(response.json())
+    started = time.perf_counter()
+    for _ in range(requests):
+        await ac.get(url, params=params)
+    elapsed = time.perf_counter() - started
+    print(f"  отелей в ответе={rows}  {requests / elapsed:8.1f} запросов/с  "
+          f"{elapsed / requests * 1000:6.2f} мс/запрос")
+    return requests / elapsed
+
+
+async def main(args):
+    # Лог времени каждого запроса исказил бы замер
+    logger.setLevel(logging.WARNING)
+    await seed(args.hotels)
+    params = {"date_from": "2040-01-01", "date_to": "2040-01-10", "limit": args.hotels}
+    try:
+        async with AsyncClient(app=app, base_url="http://bench") as ac:
+            results = {}
+            for fast in (False, True):
+                settings.FAST_JSON_RESPONSES = fast
+                print("orjson без проверки схемой" if fast else "проверка схемой и json")
+                results[fast] = await measure(ac, params, args.requests)
+            print(f"ускорение: {results[True] / results[False]:.1f}x")
+    finally:
+        await cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--hotels", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,103 @@
+"""
+Бенчмарк задержки поиска отелей во время массового входа пользователей.
+
+Параллельно с непрерывными POST /api/v1/auth/login (bcrypt на каждый запрос)
+последовательно выполняются GET /api/v1/hotels/{location} и замеряется их задержка.
+Сначала поиск замеряется без нагрузки, затем во время шторма логинов.
+
+С флагом --inline bcrypt выполняется прямо в event loop, как до переноса
+хэширования в пул потоков, чтобы сравнить p99.
+
+Запуск (из корня проекта, используется база из .env; --url направляет запросы
+на запущенный сервер вместо обработки в этом же процессе):
+    python -m benchmarks.login_storm --location Алтай --logins 200 --concurrency 50
+    python -m benchmarks.login_storm --location Алтай --inline
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from httpx import AsyncClient
+
+from app.main import app
+from app.users import auth
+
+EMAIL = "storm@bench.com"
+PASSWORD = "storm"
+
+
+async def run_inline(operation: str, func, *args):
+    """Прежнее поведение: bcrypt блокирует event loop."""
+    return func(*args)
+
+
+async def measure_search(client: AsyncClient, path: str, params: dict, stop: asyncio.Event):
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get(path, params=params)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: list):
+    latencies = sorted(latencies)
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+    print(
+        f"{name:<22} запросов={len(latencies):5d}  "
+        f"p50={statistics.median(latencies):7.1f} ms  p99={p99:7.1f} ms"
+    )
+
+
+async def main(args):
+    if args.inline:
+        auth.run_password_hashing = run_inline
+
+    date_from = date.today() + timedelta(days=30)
+    path = f"/api/v1/hotels/{args.location}"
+    params = {"date_from": str(date_from), "date_to": str(date_from + timedelta(days=7))}
+    credentials = {"email": EMAIL, "password": PASSWORD}
+
+    client_params = {"base_url": args.url} if args.url else {"app": app, "base_url": "http://bench"}
+    async with AsyncClient(**client_params) as client:
+        await client.post("/api/v1/auth/register", json=credentials)
+        # Прогрев кэша поиска, чтобы замерять задержку event loop, а не базы
+        (await client.get(path, params=params)).raise_for_status()
+
+        stop = asyncio.Event()
+        search = asyncio.create_task(measure_search(client, path, params, stop))
+        await asyncio.sleep(args.baseline)
+        stop.set()
+        report("поиск без нагрузки", await search)
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def login():
+            async with semaphore:
+                response = await client.post("/api/v1/auth/login", json=credentials)
+                response.raise_for_status()
+
+        stop = asyncio.Event()
+        search = asyncio.create_task(measure_search(client, path, params, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*[login() for _ in range(args.logins)])
+        elapsed = time.perf_counter() - started
+        stop.set()
+
+    print(f"Реализация: {'inline' if args.inline else 'thread pool'}")
+    print(f"Логинов: {args.logins} за {elapsed:.1f} с ({args.logins / elapsed:.1f} в секунду)")
+    report("поиск во время логинов", await search)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--location", default="Алтай")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--baseline", type=float, default=3, help="Секунд замера без нагрузки")
+    parser.add_argument("--url", help="Адрес запущенного сервера, например http://localhost:8000")
+    parser.add_argument("--inline", action="store_true", help="bcrypt в event loop, как раньше")
+    asyncio.run(main(parser.parse_args()))